@@ -0,0 +1,38 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_block_edits.py
+import time
+
+from common import build_ir
+
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_opt import dead_code_elimination, optimize_ssa
+
+SIZES = (10_000, 50_000, 100_000)
+
+
+def straight_line(n: int) -> str:
+    # Um único bloco com ~n instruções (um alloca por variável), quase todas
+    # mortas: b nunca é lido, e com ele morrem as variáveis v
+    m = n // 7
+    names = ', '.join(f'v{k}' for k in range(m))
+    body = ''.join(f'v{k} = a * {k}; b = v{k} + 1;\n' for k in range(m))
+    return f'programa p inicio inteiro a, b, {names}; leia(a); {body} escreva(a); fim.'
+
+
+if __name__ == '__main__':
+    print(f'{"instruções":>10} {"mem2reg+SSA":>12} {"DCE":>10} {"otimização":>11}')
+    for n in SIZES:
+        source = straight_line(n)
+        ir = build_ir(source)
+        size = sum(len(bb.body_instrs) for bb in ir.bb_sequence)
+        start = time.perf_counter()
+        ssa = SSA(ir)
+        t_ssa = time.perf_counter() - start
+        start = time.perf_counter()
+        dead_code_elimination(ssa)
+        t_dce = time.perf_counter() - start
+        ssa = SSA(build_ir(source))
+        start = time.perf_counter()
+        optimize_ssa(ssa)
+        t_opt = time.perf_counter() - start
+        print(f'{size:>10} {t_ssa * 1000:>10.1f}ms {t_dce * 1000:>8.1f}ms '
+              f'{t_opt * 1000:>9.1f}ms')
@@ -0,0 +1,67 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_dominators.py
+import random
+from functools import partial
+
+from common import build_ir, synthetic_cfg, timed
+
+from dlc.inter.dominators import Dominators
+from dlc.inter.ssa import SSA
+
+SIZES = (1_000, 2_000, 10_000, 50_000, 100_000)
+# O algoritmo por conjuntos é quadrático em memória: só nos CFGs pequenos
+ITERATIVE_MAX = 2_000
+
+
+if __name__ == '__main__':
+    algorithms = Dominators.ALGORITHMS
+    print(f'{"blocos":>8} ' + ' '.join(f'{a:>12}' for a in algorithms))
+    for n in SIZES:
+        blocks = synthetic_cfg(n)
+        cells = []
+        reference = None
+        for algorithm in algorithms:
+            if algorithm == 'iterative' and n > ITERATIVE_MAX:
+                cells.append(f'{"-":>12}')
+                continue
+            t = timed(partial(Dominators, blocks[0], blocks, algorithm), repeat=1)
+            idom = Dominators(blocks[0], blocks, algorithm).idom
+            assert reference is None or idom == reference
+            reference = idom
+            cells.append(f'{t * 1000:>10.1f}ms')
+        print(f'{n:>8} ' + ' '.join(cells))
+
+    # Construção completa da SSA em um programa DL com se/enquanto aninhados
+    body = ''.join(f'se (a > {k}) inicio enquanto (a < {k}) inicio '
+                   f'se (a % 2 == 0) a = a + 1 senao a = a + 3; fim; fim '
+                   f'senao a = a - 1;\n' for k in range(300))
+    source = f'programa p inicio inteiro a; leia(a); {body} escreva(a); fim.'
+    print(f'\nSSA de um programa com {len(build_ir(source).bb_sequence)} blocos:')
+    for algorithm in algorithms:
+        ir = build_ir(source)
+        t = timed(partial(SSA, ir, dom_algorithm=algorithm), repeat=1)
+        print(f'  {algorithm:<10} {t * 1000:>8.1f}ms')
+
+    # Edições no CFG: atualização incremental x recálculo a cada edição
+    n, edits = 10_000, 200
+    print(f'\n{edits} edições de arestas em um CFG de {n} blocos:')
+    blocks = synthetic_cfg(n)
+    rng = random.Random(0)
+    doms = Dominators(blocks[0], blocks)
+    incremental = full = 0.0
+    for k in range(edits):
+        a = rng.choice(blocks[:-1])
+        if k % 2 and a.successors:
+            b = rng.choice(a.successors)
+            a.successors.remove(b)
+            b.predecessors.remove(a)
+            incremental += timed(partial(doms.delete_edge, a, b), repeat=1)
+        else:
+            b = rng.choice(blocks[1:])
+            if b in a.successors:
+                continue
+            a.add_successor(b)
+            incremental += timed(partial(doms.insert_edge, a, b), repeat=1)
+        full += timed(lambda: Dominators(blocks[0], blocks), repeat=1)
+    doms.verify()
+    print(f'  incremental {incremental * 1000:>8.1f}ms')
+    print(f'  recálculo   {full * 1000:>8.1f}ms')
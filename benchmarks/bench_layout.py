@@ -0,0 +1,35 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_layout.py
+# Desvios tomados (arestas executadas cujo destino não é o bloco seguinte)
+# na ordem original, com o posicionamento estático e com o guiado por perfil
+from itertools import pairwise
+
+from common import build_ir, programs
+
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import InterpreterIO
+from dlc.inter.ir import IR
+from dlc.inter.layout import layout_blocks
+from dlc.inter.profiler import Profile
+
+INPUTS = ['97']
+
+
+def taken_jumps(ir: IR, profile: Profile) -> int:
+    after = dict(pairwise(ir.bb_sequence))
+    return sum(n for (a, b), n in profile.edge_counts.items() if after.get(a) is not b)
+
+
+if __name__ == '__main__':
+    print(f'{"programa":<10} {"original":>10} {"estático":>10} {"perfil":>10}')
+    for path in programs():
+        ir = build_ir(path.read_text(), 'ssa-opt')
+        interpreter = Interpreter(ir, InterpreterIO(INPUTS, []), profile=True)
+        interpreter.interpret()
+        profile = interpreter.profile
+        assert profile is not None
+        original = taken_jumps(ir, profile)
+        layout_blocks(ir)
+        static = taken_jumps(ir, profile)
+        layout_blocks(ir, profile)
+        guided = taken_jumps(ir, profile)
+        print(f'{path.stem:<10} {original:>10} {static:>10} {guided:>10}')
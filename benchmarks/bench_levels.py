@@ -0,0 +1,30 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_levels.py
+from functools import partial
+
+from common import LEVELS, build_ir, programs, timed
+
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import InterpreterIO
+from dlc.inter.ir import IR
+
+INPUTS = ['97']
+
+
+def run(ir: IR) -> Interpreter:
+    interpreter = Interpreter(ir, InterpreterIO(INPUTS, []))
+    interpreter.interpret()
+    return interpreter
+
+
+if __name__ == '__main__':
+    print(f'{"programa":<12} ' + ' '.join(f'{level:>12}' for level in LEVELS)
+          + f' {"ssa/tac":>8}')
+    for path in programs():
+        source = path.read_text()
+        times = []
+        for level in LEVELS:
+            ir = build_ir(source, level)
+            times.append(timed(partial(run, ir)))
+        print(f'{path.stem:<12} '
+              + ' '.join(f'{t * 1000:>10.1f}ms' for t in times)
+              + f' {times[1] / times[0]:>8.2f}')
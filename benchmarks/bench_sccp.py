@@ -0,0 +1,65 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_sccp.py
+# optimize_ssa (SCCP) contra o laço anterior de passes locais, que só
+# avança um elo da cadeia de constantes por rodada: tempo e instruções que
+# sobram na IR
+from functools import partial
+
+from common import build_ir, programs, timed
+
+from dlc.inter.ir import IR
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_opt import (
+    branch_folding,
+    constant_folding,
+    copy_propagation,
+    dead_code_elimination,
+    merge_blocks,
+    optimize_ssa,
+    phi_simplification,
+    unreachable_code_elimination,
+)
+
+CHAINS = (100, 200, 400, 800)
+
+
+def optimize_iterative(ssa: SSA) -> None:
+    passes = (copy_propagation, constant_folding, branch_folding,
+              unreachable_code_elimination, phi_simplification,
+              dead_code_elimination, merge_blocks)
+    changed = True
+    while changed:
+        changed = False
+        for opt in passes:
+            changed |= opt(ssa)
+
+
+def size(ir: IR) -> int:
+    return sum(len(bb.phi_instrs) + len(bb.body_instrs) for bb in ir.bb_sequence)
+
+
+def chain(n: int) -> str:
+    # Cada elo depende do anterior; os desvios só se resolvem com o valor
+    # de a, e o laço mantém b constante pela PHI do cabeçalho
+    body = ''.join(f'a = a * 3 + {k}; se (a % 2 == 0) b = b + a senao b = b - a;\n'
+                   for k in range(n))
+    return (f'programa p inicio inteiro a, b, c, i; a = 1; b = 0; c = 7; i = 0;'
+            f'{body} enquanto (i < b) inicio se (c == 7) c = 7 senao c = i; '
+            f'i = i + 1; fim; escreva(b); escreva(c); fim.')
+
+
+def compare(name: str, source: str) -> None:
+    row = []
+    for optimize in (optimize_iterative, optimize_ssa):
+        # Só a otimização é medida; ela altera a SSA, então roda uma vez
+        ssa = SSA(build_ir(source))
+        t = timed(partial(optimize, ssa), repeat=1)
+        row.append(f'{t * 1000:>10.1f}ms {size(ssa.ir):>7}')
+    print(f'{name:<10} ' + ' '.join(row))
+
+
+if __name__ == '__main__':
+    print(f'{"programa":<10} {"laço":>12} {"instrs":>7} {"sccp":>12} {"instrs":>7}')
+    for path in programs():
+        compare(path.stem, path.read_text())
+    for n in CHAINS:
+        compare(f'cadeia{n}', chain(n))
@@ -0,0 +1,50 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_ssa_modes.py
+import time
+
+from common import build_ir, programs
+
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_opt import optimize_ssa
+
+
+def phi_count(ssa: SSA) -> int:
+    return sum(len(bb.phi_instrs) for bb in ssa.ir.bb_sequence)
+
+
+def nested_program(n: int) -> str:
+    # Variáveis locais a cada bloco (t) e variáveis globais (a, s)
+    body = ''.join(f'se (a > {k}) inicio t = a * 2; s = s + t; '
+                   f'enquanto (a < {k}) inicio t = a + 1; a = t; fim; fim '
+                   f'senao inicio t = a - 1; a = t; fim;\n' for k in range(n))
+    return (f'programa p inicio inteiro a, s, t; leia(a); s = 0; {body} '
+            f'escreva(s); fim.')
+
+
+def measure(source: str, mode: str, repeat: int = 3) -> tuple[float, float]:
+    # Melhores tempos de construção da SSA e de otimização, separados
+    best_build = best_opt = float('inf')
+    for _ in range(repeat):
+        ir = build_ir(source)
+        start = time.perf_counter()
+        ssa = SSA(ir, mode=mode)
+        middle = time.perf_counter()
+        optimize_ssa(ssa)
+        end = time.perf_counter()
+        best_build = min(best_build, middle - start)
+        best_opt = min(best_opt, end - middle)
+    return best_build, best_opt
+
+
+if __name__ == '__main__':
+    workloads = [(path.stem, path.read_text()) for path in programs()]
+    workloads.append(('aninhado', nested_program(400)))
+    print(f'{"programa":<10} {"modo":<12} {"phis":>6} {"otim.":>6} '
+          f'{"construção":>11} {"otimização":>11}')
+    for name, source in workloads:
+        for mode in SSA.MODES:
+            ssa = SSA(build_ir(source), mode=mode)
+            phis = phi_count(ssa)
+            optimize_ssa(ssa)
+            t_build, t_opt = measure(source, mode)
+            print(f'{name:<10} {mode:<12} {phis:>6} {phi_count(ssa):>6} '
+                  f'{t_build * 1000:>9.1f}ms {t_opt * 1000:>9.1f}ms')
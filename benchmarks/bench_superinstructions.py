@@ -0,0 +1,43 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_superinstructions.py
+from collections import Counter
+from functools import partial
+
+from common import LEVELS, build_ir, programs, timed
+
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import InterpreterIO
+from dlc.inter.ir import IR
+
+INPUTS = ['97']
+
+
+def run(level_ir: IR, superinstructions: bool, profile: bool = False) -> Interpreter:
+    interpreter = Interpreter(level_ir, InterpreterIO(INPUTS, []), profile=profile,
+                              superinstructions=superinstructions)
+    interpreter.interpret()
+    return interpreter
+
+
+if __name__ == '__main__':
+    pairs: Counter[tuple[str, str]] = Counter()
+    print(f'{"programa":<12} {"nível":<8} {"despachos":>10} {"fundidos":>10} '
+          f'{"redução":>8} {"tempo":>9} {"fundido":>9}')
+    for path in programs():
+        source = path.read_text()
+        for level in LEVELS:
+            ir = build_ir(source, level)
+            base = run(ir, False, profile=True)
+            assert base.profile is not None
+            for (a, b), n in base.profile.op_pairs(20):
+                pairs[(a.name, b.name)] += n
+            fused = run(ir, True)
+            t_base = timed(partial(run, ir, False))
+            t_fused = timed(partial(run, ir, True))
+            reduction = 1 - fused.instr_count / base.instr_count
+            print(f'{path.stem:<12} {level:<8} {base.instr_count:>10} '
+                  f'{fused.instr_count:>10} {reduction:>8.0%} '
+                  f'{t_base * 1000:>7.1f}ms {t_fused * 1000:>7.1f}ms')
+
+    print('\nPares de operadores mais executados (todos os níveis):')
+    for (a, b), n in pairs.most_common(10):
+        print(f'  {a:>8} -> {b:<8} {n:>10}')
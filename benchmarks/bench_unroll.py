@@ -0,0 +1,98 @@
+# Uso: PYTHONPATH=src python benchmarks/bench_unroll.py
+# Nível 1 (ssa-opt) contra o nível 2 (ssa-opt2, com desenrolamento): tamanho
+# da IR, instruções executadas e tempo no interpretador e, havendo gcc, tempo
+# do executável gerado pelo backend x64 com uma entrada maior
+import shutil
+import subprocess
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from common import build_ir, programs, timed
+
+from dlc.codegen.codegen_x64 import CodeGeneratorX64
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import InterpreterIO
+from dlc.inter.ir import IR
+from dlc.inter.layout import layout_blocks
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_opt import optimize_ssa
+
+# Laços cujo tamanho vem da entrada: (fonte, entrada do interpretador,
+# entrada do executável)
+KERNELS = {
+    'soma': ('programa p inicio inteiro s, i, n; leia(n); s = 0; i = 0; '
+             'enquanto (i < n) inicio s = s + i * 3; i = i + 1; fim; escreva(s); fim.',
+             '2000', '400000000'),
+    'regressivo': ('programa p inicio inteiro s, i, n; leia(n); s = 0; i = n; '
+                   'enquanto (i > 0) inicio s = s + i % 7; i = i - 1; fim; '
+                   'escreva(s); fim.',
+                   '2000', '200000000'),
+    'primeira': ('programa p inicio inteiro s, i, n, f; leia(n); s = 0; i = 0; f = 1; '
+                 'enquanto (i < n) inicio se (f == 1) s = s + 100 senao s = s + i; '
+                 'f = 0; i = i + 1; fim; escreva(s); fim.',
+                 '2000', '200000000'),
+    'constante': ('programa p inicio inteiro s, i, k, n; leia(n); s = 0; k = 0; '
+                  'enquanto (k < n) inicio i = 0; '
+                  'enquanto (i < 8) inicio s = s + i * k; i = i + 1; fim; '
+                  'k = k + 1; fim; escreva(s); fim.',
+                  '300', '30000000'),
+}
+
+
+def size(ir: IR) -> int:
+    return sum(len(bb.phi_instrs) + len(bb.body_instrs) + 1 for bb in ir.bb_sequence)
+
+
+def optimized(source: str, level: int) -> SSA:
+    ssa = SSA(build_ir(source))
+    optimize_ssa(ssa, level=level)
+    return ssa
+
+
+def interpret(ir: IR, inputs: str) -> int:
+    interpreter = Interpreter(ir, InterpreterIO([inputs], []))
+    interpreter.interpret()
+    return interpreter.instr_count
+
+
+def native(ssa: SSA, inputs: str, workdir: Path) -> float:
+    layout_blocks(ssa.ir)
+    asm, exe = workdir / 'p.s', workdir / 'p'
+    asm.write_text('\n'.join(CodeGeneratorX64(ssa).code))
+    subprocess.run(['gcc', str(asm), '-o', str(exe), '-lm'], check=True)
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([str(exe)], input=inputs + '\n', capture_output=True, text=True,
+                       check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(name: str, source: str, inputs: str, native_inputs: str | None,
+            workdir: Path | None) -> None:
+    row = []
+    for level in (1, 2):
+        ssa = optimized(source, level)
+        t = timed(partial(interpret, ssa.ir, inputs), repeat=1)
+        cell = f'{size(ssa.ir):>6} {interpret(ssa.ir, inputs):>9} {t * 1000:>8.1f}ms'
+        if workdir is not None and native_inputs is not None:
+            cell += f' {native(ssa, native_inputs, workdir) * 1000:>8.1f}ms'
+        row.append(cell)
+    print(f'{name:<11} ' + '   '.join(row))
+
+
+if __name__ == '__main__':
+    gcc = shutil.which('gcc') is not None
+    header = f'{"instrs":>6} {"execução":>9} {"interp.":>10}' + \
+        (f' {"nativo":>10}' if gcc else '')
+    print(f'{"":<11} {"nível 1":^{len(header)}}   {"nível 2":^{len(header)}}')
+    print(f'{"programa":<11} {header}   {header}')
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp) if gcc else None
+        for path in programs():
+            compare(path.stem, path.read_text(), '97', None, None)
+        for name, (source, inputs, native_inputs) in KERNELS.items():
+            compare(name, source, inputs, native_inputs, workdir)
@@ -0,0 +1,61 @@
+import contextlib
+import io
+import random
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.ir import IR
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_opt import optimize_ssa
+from dlc.lex.lexer import Lexer
+from dlc.semantic.checker import Checker
+from dlc.syntax.parser import Parser
+
+PROGRAMS = Path(__file__).parent / 'programs'
+LEVELS = ('tac', 'ssa', 'ssa-opt', 'ssa-opt2')
+
+
+def build_ir(source: str, level: str = 'tac') -> IR:
+    # Avisos do checker (variáveis não usadas etc.) não interessam aqui
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = Parser(Lexer(io.StringIO(source)))
+        Checker(parser.ast)
+    ir = IR(parser.ast)
+    if level == 'tac':
+        return ir
+    ssa = SSA(ir)
+    if level.startswith('ssa-opt'):
+        optimize_ssa(ssa, level=2 if level == 'ssa-opt2' else 1)
+    return ssa.ir
+
+
+def programs() -> list[Path]:
+    return sorted(PROGRAMS.glob('*.dl'))
+
+
+def timed(fn: Callable[[], Any], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_cfg(n: int, seed: int = 0) -> list[BasicBlock]:
+    # Cadeia de n blocos com desvios para frente (se/senao) e arestas de
+    # retorno (enquanto), aninhados como nos programas DL grandes; o
+    # primeiro bloco é a entrada
+    rng = random.Random(seed)
+    blocks = [BasicBlock() for _ in range(n)]
+    for k in range(n - 1):
+        blocks[k].add_successor(blocks[k + 1])
+        r = rng.random()
+        if r < 0.3 and k + 2 < n:
+            blocks[k].add_successor(blocks[min(n - 1, k + rng.randint(2, 8))])
+        elif r < 0.45 and k > 0:
+            blocks[k].add_successor(blocks[max(1, k - rng.randint(1, 30))])
+    return blocks
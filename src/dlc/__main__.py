@@ -11,6 +11,7 @@ from pathlib import Path
 from dlc.codegen.codegen_x64 import CodeGeneratorX64
 from dlc.inter.interpreter import Interpreter
 from dlc.inter.ir import IR
+from dlc.inter.layout import layout_blocks
 from dlc.inter.ssa import SSA
 from dlc.inter.ssa_opt import optimize_ssa
 from dlc.lex.lexer import Lexer
@@ -117,6 +118,7 @@ if __name__ == '__main__':
 
 
     # #Geração de código x64
+    layout_blocks(ssa.ir)
     cgx64 = CodeGeneratorX64(ssa)
     #print(cgx64.reg_alloc)
     #print(cgx64.mem_alloc)
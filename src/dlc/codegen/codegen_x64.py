@@ -1,3 +1,5 @@
+from itertools import pairwise
+
 from dlc.codegen.interference_graph import InterferenceGraph
 from dlc.codegen.live_analysis import LivenessAnalysis
 from dlc.inter.basic_block import BasicBlock
@@ -114,9 +116,17 @@ class CodeGeneratorX64:
     
 
 
-    def __resolve_phis(self, current_bb: BasicBlock, target_label: Label) -> None:
+    def __jump(self, current_bb: BasicBlock, target_label: Label) -> list[str]:
+        target_bb = self.ssa.ir.bb_from_label(target_label)
+        if self.__next_bb.get(current_bb) is target_bb:
+            return []
+        return [f'\tjmp {self.__resolve_arg(target_label)}']
+
+
+    def __resolve_phis(self, current_bb: BasicBlock, target_label: Label) -> list[str]:
         target_bb = self.ssa.ir.bb_from_label(target_label)
         copies: list[tuple[str, str, Type]] = []
+        code: list[str] = []
 
         # 1. Coletar cópias
         for instr in target_bb.phi_instrs:
@@ -130,9 +140,9 @@ class CodeGeneratorX64:
                     copies.append((dest, src, phi_temp.type))
 
         if not copies:
-            return
+            return code
 
-        self.code.append(f'\t# --- Resolvendo PHIs para {target_label} ---')
+        code.append(f'\t# --- Resolvendo PHIs para {target_label} ---')
         while copies:
             progress = False
             # 2. procurar cópia segura
@@ -140,8 +150,12 @@ class CodeGeneratorX64:
 
                 if dest not in [s for _, s, _ in copies]:
                     instr_mov = self.MOVE[v_type]
-                    self.code.append(f'\t{instr_mov} {dest}, {src}')
                     copies.remove((dest, src, v_type))
+                    # Não há mov de memória para memória: passa pelo acumulador
+                    if dest.startswith('[') and src.startswith('['):
+                        code.append(f'\t{instr_mov} {self.ACC_REG[v_type]}, {src}')
+                        src = self.ACC_REG[v_type]
+                    code.append(f'\t{instr_mov} {dest}, {src}')
                     progress = True
                     break
 
@@ -152,8 +166,9 @@ class CodeGeneratorX64:
             dest, src, v_type = copies.pop(0)
             instr_mov = self.MOVE[v_type]
             tmp = self.PHI_REG[v_type]
-            self.code.append(f'\t{instr_mov} {tmp}, {src}')
+            code.append(f'\t{instr_mov} {tmp}, {src}')
             copies.append((dest, tmp, v_type))
+        return code
 
 
 
@@ -230,6 +245,9 @@ class CodeGeneratorX64:
         ])
 
         current_bb = None
+        # Bloco emitido logo após cada bloco: desvios para ele viram queda direta
+        sequence = ssa.ir.bb_sequence
+        self.__next_bb = dict(pairwise(sequence))
 
         # Gerar código para cada instrução
         for instr in ssa.ir:
@@ -251,8 +269,8 @@ class CodeGeneratorX64:
                     self.code.append(f'\t{result}:')
                 
                 case Operator.GOTO:
-                    self.__resolve_phis(current_bb, instr.result)
-                    self.code.append(f'\tjmp {result}')
+                    self.code.extend(self.__resolve_phis(current_bb, instr.result))
+                    self.code.extend(self.__jump(current_bb, instr.result))
 
 
 
@@ -263,20 +281,36 @@ class CodeGeneratorX64:
 
                     label_true = self.__resolve_arg(instr.arg2)
                     label_false = self.__resolve_arg(instr.result)
-
-                    internal_label_false = f".L_if_false_{len(self.code)}"
-
-                    # se cond == 0 → FALSE
-                    self.code.append(f'\tje {internal_label_false}')
-
-                    # TRUE
-                    self.__resolve_phis(current_bb, instr.arg2)
-                    self.code.append(f'\tjmp {label_true}')
-
-                    # FALSE
-                    self.code.append(f'{internal_label_false}:')
-                    self.__resolve_phis(current_bb, instr.result)
-                    self.code.append(f'\tjmp {label_false}')
+                    phis_true = self.__resolve_phis(current_bb, instr.arg2)
+                    phis_false = self.__resolve_phis(current_bb, instr.result)
+
+                    # Aresta sem cópias desvia direto para o destino; o
+                    # desvio incondicional some se o destino é o próximo bloco
+                    if not phis_true and not phis_false and \
+                            not self.__jump(current_bb, instr.arg2):
+                        self.code.append(f'\tje {label_false}')
+                    elif not phis_true:
+                        self.code.append(f'\tjne {label_true}')
+                        self.code.extend(phis_false)
+                        self.code.extend(self.__jump(current_bb, instr.result))
+                    elif not phis_false:
+                        self.code.append(f'\tje {label_false}')
+                        self.code.extend(phis_true)
+                        self.code.extend(self.__jump(current_bb, instr.arg2))
+                    else:
+                        internal_label_false = f".L_if_false_{len(self.code)}"
+
+                        # se cond == 0 → FALSE
+                        self.code.append(f'\tje {internal_label_false}')
+
+                        # TRUE
+                        self.code.extend(phis_true)
+                        self.code.append(f'\tjmp {label_true}')
+
+                        # FALSE
+                        self.code.append(f'{internal_label_false}:')
+                        self.code.extend(phis_false)
+                        self.code.extend(self.__jump(current_bb, instr.result))
 
 
 
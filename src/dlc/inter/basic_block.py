@@ -20,6 +20,9 @@ class BasicBlock:
         #links
         self.successors: list[BasicBlock] = []
         self.predecessors: list[BasicBlock] = []
+        #pending edits (applied by compact)
+        self.__tombstones: set[Instr] = set()
+        self.__prepended: list[Instr] = []
 
     def add_successor(self, bb: BasicBlock) -> None:
         if bb not in self.successors:
@@ -27,6 +30,27 @@ class BasicBlock:
         if self not in bb.predecessors:
             bb.predecessors.append(self)
 
+    def discard(self, instr: Instr) -> None:
+        # Remoção adiada de uma PHI ou instrução do corpo: vira lápide até
+        # compact(), que remove todas as lápides em uma única passada
+        self.__tombstones.add(instr)
+
+    def prepend(self, instr: Instr) -> None:
+        # Inserção adiada no início do corpo, à frente das já adiadas
+        # (mesmo efeito de body_instrs.insert(0, instr)); as lápides não a
+        # atingem, então discard + prepend move a instrução
+        self.__prepended.append(instr)
+
+    def compact(self) -> None:
+        if self.__tombstones:
+            dead = self.__tombstones
+            self.phi_instrs[:] = [i for i in self.phi_instrs if i not in dead]
+            self.body_instrs[:] = [i for i in self.body_instrs if i not in dead]
+            dead.clear()
+        if self.__prepended:
+            self.body_instrs[:0] = reversed(self.__prepended)
+            self.__prepended.clear()
+
     def __iter__(self) -> Generator[Instr, None, None]:
         if self.label_instr:
             yield self.label_instr
@@ -0,0 +1,516 @@
+import heapq
+import itertools
+from collections.abc import Collection, Sequence
+
+from dlc.inter.basic_block import BasicBlock
+
+
+class Dominators:
+    # Árvore de dominadores de um CFG. Os algoritmos produzem apenas idom;
+    # conjuntos de dominadores e a relação de dominância derivam da árvore.
+    #   'chk'        Cooper, Harvey e Kennedy: interseção de dois dedos sobre
+    #                a numeração em pós-ordem reversa (padrão)
+    #   'semi-nca'   semidominadores de Lengauer-Tarjan (com compressão de
+    #                caminhos) seguidos do ancestral comum mais próximo
+    #   'iterative'  conjuntos completos até o ponto fixo (referência, O(n²))
+    #
+    # Depois de construída, a árvore acompanha as edições do CFG: quem muda
+    # as arestas chama insert_edge/delete_edge/merge_block/delete_block, e
+    # idom, tree e as profundidades são corrigidos só na região afetada.
+    # Pós-ordem reversa, numeração da árvore, conjuntos e fronteira são
+    # refeitos sob demanda. Com verify=True cada edição é conferida contra
+    # um recálculo completo.
+
+    ALGORITHMS = ('chk', 'semi-nca', 'iterative')
+
+    def __init__(self, entry: BasicBlock, blocks: Sequence[BasicBlock],
+                 algorithm: str = 'chk', verify: bool = False) -> None:
+        if algorithm not in Dominators.ALGORITHMS:
+            raise RuntimeError(f'Algoritmo de dominadores desconhecido: {algorithm}')
+        self.entry = entry
+        self.__blocks: dict[BasicBlock, None] = dict.fromkeys(blocks)
+        self.algorithm = algorithm
+        self.verify_updates = verify
+        self.__rpo: list[BasicBlock] | None = None
+        self.__rpo_number: dict[BasicBlock, int] | None = None
+        # Dominador imediato (None para a entrada e blocos inalcançáveis)
+        self.idom: dict[BasicBlock, BasicBlock | None]
+        match algorithm:
+            case 'chk':
+                self.idom = self.__chk()
+            case 'semi-nca':
+                self.idom = self.__semi_nca()
+            case 'iterative':
+                self.idom = self.__iterative()
+        # Filhos na árvore, na ordem de blocks
+        self.tree: dict[BasicBlock, list[BasicBlock]] = {bb: [] for bb in blocks}
+        for bb in blocks:
+            parent = self.idom.get(bb)
+            if parent is not None:
+                self.tree[parent].append(bb)
+        # Profundidade na árvore (só blocos alcançáveis)
+        self.__depth: dict[BasicBlock, int] = {entry: 0}
+        self.__set_depths(entry)
+        # Intervalos de pré/pós-ordem na árvore: dominates() em O(1)
+        self.__pre: dict[BasicBlock, int] = {}
+        self.__post: dict[BasicBlock, int] = {}
+        self.__numbered = False
+        self.__sets: dict[BasicBlock, set[BasicBlock]] | None = None
+        self.__frontier: dict[BasicBlock, set[BasicBlock]] | None = None
+
+
+    @staticmethod
+    def reverse_postorder(entry: BasicBlock,
+                          region: Collection[BasicBlock] | None = None
+                          ) -> list[BasicBlock]:
+        # Com region, a busca não sai dos blocos da região
+        order: list[BasicBlock] = []
+        visited = {entry}
+        stack = [(entry, iter(entry.successors))]
+        while stack:
+            bb, succs = stack[-1]
+            succ = next(succs, None)
+            if succ is None:
+                order.append(bb)
+                stack.pop()
+            elif succ not in visited and (region is None or succ in region):
+                visited.add(succ)
+                stack.append((succ, iter(succ.successors)))
+        order.reverse()
+        return order
+
+
+    @property
+    def blocks(self) -> list[BasicBlock]:
+        return list(self.__blocks)
+
+
+    @property
+    def rpo(self) -> list[BasicBlock]:
+        # Blocos alcançáveis em pós-ordem reversa
+        if self.__rpo is None:
+            self.__rpo = Dominators.reverse_postorder(self.entry)
+        return self.__rpo
+
+
+    @property
+    def rpo_number(self) -> dict[BasicBlock, int]:
+        if self.__rpo_number is None:
+            self.__rpo_number = {bb: k for k, bb in enumerate(self.rpo)}
+        return self.__rpo_number
+
+
+    def __chk(self) -> dict[BasicBlock, BasicBlock | None]:
+        result: dict[BasicBlock, BasicBlock | None] = dict.fromkeys(self.__blocks)
+        result.update(Dominators.__chk_region(self.rpo))
+        return result
+
+
+    @staticmethod
+    def __chk_region(rpo: list[BasicBlock]) -> dict[BasicBlock, BasicBlock | None]:
+        # idom dos blocos de rpo, com rpo[0] como raiz (predecessores fora de
+        # rpo são ignorados)
+        number = {bb: k for k, bb in enumerate(rpo)}
+        preds = [[number[p] for p in bb.predecessors if p in number]
+                 for bb in rpo]
+        idom = [-1] * len(rpo)
+        idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for b in range(1, len(rpo)):
+                new_idom = -1
+                for p in preds[b]:
+                    if idom[p] == -1:
+                        continue
+                    if new_idom == -1:
+                        new_idom = p
+                        continue
+                    # Sobe pelos dois caminhos até se encontrarem
+                    f1, f2 = p, new_idom
+                    while f1 != f2:
+                        while f1 > f2:
+                            f1 = idom[f1]
+                        while f2 > f1:
+                            f2 = idom[f2]
+                    new_idom = f1
+                if idom[b] != new_idom:
+                    idom[b] = new_idom
+                    changed = True
+        result: dict[BasicBlock, BasicBlock | None] = {rpo[0]: None}
+        for b in range(1, len(rpo)):
+            result[rpo[b]] = rpo[idom[b]]
+        return result
+
+
+    def __semi_nca(self) -> dict[BasicBlock, BasicBlock | None]:
+        # Numeração em pré-ordem da DFS e pais na árvore da DFS
+        vertex = [self.entry]
+        number = {self.entry: 0}
+        parent = [-1]
+        stack = [(self.entry, iter(self.entry.successors))]
+        while stack:
+            bb, succs = stack[-1]
+            succ = next(succs, None)
+            if succ is None:
+                stack.pop()
+            elif succ not in number:
+                number[succ] = len(vertex)
+                vertex.append(succ)
+                parent.append(number[bb])
+                stack.append((succ, iter(succ.successors)))
+        n = len(vertex)
+        semi = list(range(n))
+        label = list(range(n))
+        ancestor = [-1] * n
+
+        # Semidominadores em pré-ordem reversa; eval() devolve o vértice de
+        # menor semi no caminho já ligado, comprimindo-o sem recursão
+        for w in range(n - 1, 0, -1):
+            for pred in vertex[w].predecessors:
+                v = number.get(pred)
+                if v is None:
+                    continue
+                if ancestor[v] != -1:
+                    path = []
+                    u = v
+                    while ancestor[ancestor[u]] != -1:
+                        path.append(u)
+                        u = ancestor[u]
+                    for u in reversed(path):
+                        a = ancestor[u]
+                        if semi[label[a]] < semi[label[u]]:
+                            label[u] = label[a]
+                        ancestor[u] = ancestor[a]
+                    v = label[v]
+                if semi[v] < semi[w]:
+                    semi[w] = semi[v]
+            ancestor[w] = parent[w]
+
+        # idom(w) é o ancestral de parent(w) mais próximo com número <= semi(w)
+        idom = parent[:]
+        for w in range(1, n):
+            while idom[w] > semi[w]:
+                idom[w] = idom[idom[w]]
+        result: dict[BasicBlock, BasicBlock | None] = dict.fromkeys(self.__blocks)
+        for w in range(1, n):
+            result[vertex[w]] = vertex[idom[w]]
+        return result
+
+
+    def __iterative(self) -> dict[BasicBlock, BasicBlock | None]:
+        reachable = set(self.rpo)
+        dom = {self.entry: {self.entry}}
+        for bb in self.rpo[1:]:
+            dom[bb] = set(reachable)
+
+        changed = True
+        while changed:
+            changed = False
+            for bb in self.rpo[1:]:
+                new_dom = set(reachable)
+                for p in bb.predecessors:
+                    if p in reachable:
+                        new_dom &= dom[p]
+                new_dom.add(bb)
+
+                if new_dom != dom[bb]:
+                    dom[bb] = new_dom
+                    changed = True
+
+        idom: dict[BasicBlock, BasicBlock | None] = dict.fromkeys(self.__blocks)
+        for bb in self.rpo[1:]:
+            strict_doms = dom[bb] - {bb}
+            # idom is the strict dominator that is not dominated by any other
+            for d in strict_doms:
+                if all(d == other or d not in dom[other] for other in strict_doms):
+                    idom[bb] = d
+                    break
+        return idom
+
+
+    def __set_depths(self, root: BasicBlock) -> None:
+        # Profundidades da subárvore de root a partir da de root
+        depth = self.__depth
+        stack = [root]
+        while stack:
+            bb = stack.pop()
+            for child in self.tree[bb]:
+                depth[child] = depth[bb] + 1
+                stack.append(child)
+
+
+    def __number_tree(self) -> None:
+        self.__pre.clear()
+        self.__post.clear()
+        clock = 0
+        self.__pre[self.entry] = clock
+        stack = [(self.entry, iter(self.tree[self.entry]))]
+        while stack:
+            bb, children = stack[-1]
+            child = next(children, None)
+            clock += 1
+            if child is None:
+                self.__post[bb] = clock
+                stack.pop()
+            else:
+                self.__pre[child] = clock
+                stack.append((child, iter(self.tree[child])))
+        self.__numbered = True
+
+
+    def dominates(self, a: BasicBlock, b: BasicBlock) -> bool:
+        if not self.__numbered:
+            self.__number_tree()
+        if a not in self.__pre or b not in self.__pre:
+            return False
+        return self.__pre[a] <= self.__pre[b] and self.__post[b] <= self.__post[a]
+
+
+    def dominators(self, bb: BasicBlock) -> set[BasicBlock]:
+        # Conjunto de dominadores de bb: caminho de idom até a entrada
+        doms: set[BasicBlock] = set()
+        if bb not in self.__depth:
+            return doms
+        runner: BasicBlock | None = bb
+        while runner is not None:
+            doms.add(runner)
+            runner = self.idom[runner]
+        return doms
+
+
+    def nca(self, a: BasicBlock, b: BasicBlock) -> BasicBlock:
+        # Ancestral comum mais próximo na árvore (a e b alcançáveis)
+        depth = self.__depth
+        while depth[a] > depth[b]:
+            a = self.idom[a]  # type: ignore[assignment]
+        while depth[b] > depth[a]:
+            b = self.idom[b]  # type: ignore[assignment]
+        while a is not b:
+            a = self.idom[a]  # type: ignore[assignment]
+            b = self.idom[b]  # type: ignore[assignment]
+        return a
+
+
+    @property
+    def sets(self) -> dict[BasicBlock, set[BasicBlock]]:
+        # Todos os conjuntos de uma vez (O(n²) de memória); só sob demanda
+        if self.__sets is None:
+            self.__sets = {bb: self.dominators(bb) for bb in self.__blocks}
+        return self.__sets
+
+
+    def frontier(self) -> dict[BasicBlock, set[BasicBlock]]:
+        if self.__frontier is not None:
+            return self.__frontier
+        df: dict[BasicBlock, set[BasicBlock]] = {bb: set() for bb in self.__blocks}
+        for bb in self.rpo:
+            preds = [p for p in bb.predecessors if p in self.__depth]
+            if len(preds) >= 2:
+                for pred in preds:
+                    runner: BasicBlock | None = pred
+                    while runner is not None and runner != self.idom[bb]:
+                        df[runner].add(bb)
+                        runner = self.idom[runner]
+        self.__frontier = df
+        return df
+
+
+    # Atualizações incrementais: chamadas depois da edição no CFG
+
+    def insert_edge(self, a: BasicBlock, b: BasicBlock) -> None:
+        if b not in self.__blocks:
+            self.__blocks[b] = None
+            self.tree[b] = []
+            self.idom[b] = None
+        if a in self.__depth:
+            if b in self.__depth:
+                self.__insert_reachable(a, b)
+            else:
+                self.__insert_unreachable(a, b)
+        self.__changed()
+
+
+    def delete_edge(self, a: BasicBlock, b: BasicBlock) -> None:
+        # Aresta saindo de bloco inalcançável, ou de retorno (b domina a),
+        # não muda a árvore
+        if a in self.__depth and b is not self.entry and not self.__is_ancestor(b, a):
+            # b segue alcançável se algum predecessor não depende dele
+            if any(p in self.__depth and not self.__is_ancestor(b, p)
+                   for p in b.predecessors):
+                self.__recompute(self.nca(a, b))
+            else:
+                self.__delete_unreachable(b)
+        self.__changed()
+
+
+    def merge_block(self, bb: BasicBlock, succ: BasicBlock) -> None:
+        # succ (único sucessor de bb, que é seu único predecessor) foi
+        # absorvido por bb: os filhos de succ passam a ser filhos de bb
+        if succ in self.__depth:
+            assert self.idom[succ] is bb
+            self.tree[bb].remove(succ)
+            for child in self.tree[succ]:
+                self.idom[child] = bb
+            self.tree[bb].extend(self.tree[succ])
+            del self.__depth[succ]
+            self.__set_depths(bb)
+        del self.tree[succ]
+        del self.idom[succ]
+        del self.__blocks[succ]
+        self.__changed()
+
+
+    def delete_block(self, bb: BasicBlock) -> None:
+        # Só blocos inalcançáveis saem do CFG
+        assert bb not in self.__depth
+        del self.tree[bb]
+        del self.idom[bb]
+        del self.__blocks[bb]
+        self.__changed()
+
+
+    def rebuild(self, blocks: Sequence[BasicBlock]) -> None:
+        # Recálculo completo para edições em lote (muitas arestas de uma vez
+        # custariam uma região recalculada cada); idom e tree continuam
+        # sendo os mesmos dicionários
+        self.__blocks = dict.fromkeys(blocks)
+        fresh = Dominators(self.entry, blocks, self.algorithm)
+        self.idom.clear()
+        self.idom.update(fresh.idom)
+        self.tree.clear()
+        self.tree.update(fresh.tree)
+        self.__depth.clear()
+        self.__depth.update(fresh.__depth)
+        self.__changed()
+
+
+    def verify(self) -> None:
+        fresh = Dominators(self.entry, self.blocks)
+        wrong = [bb for bb in fresh.idom if self.idom.get(bb, bb) is not fresh.idom[bb]]
+        if len(fresh.idom) != len(self.idom) or wrong or \
+                any(set(self.tree.get(bb, ())) != set(fresh.tree[bb])
+                    for bb in fresh.tree):
+            raise RuntimeError(f'Árvore de dominadores inconsistente: {wrong}')
+        if len(fresh.__depth) != len(self.__depth) or \
+                any(self.__depth.get(bb) != depth
+                    for bb, depth in fresh.__depth.items()):
+            raise RuntimeError('Profundidades da árvore de dominadores inconsistentes')
+
+
+    def __changed(self) -> None:
+        self.__rpo = None
+        self.__rpo_number = None
+        self.__numbered = False
+        self.__sets = None
+        self.__frontier = None
+        if self.verify_updates:
+            self.verify()
+
+
+    def __is_ancestor(self, a: BasicBlock, b: BasicBlock) -> bool:
+        # a domina b, subindo de b (sem depender da numeração da árvore)
+        depth = self.__depth
+        while depth[b] > depth[a]:
+            b = self.idom[b]  # type: ignore[assignment]
+        return a is b
+
+
+    def __set_idom(self, bb: BasicBlock, new_idom: BasicBlock | None) -> None:
+        old = self.idom[bb]
+        if old is not new_idom:
+            if old is not None:
+                self.tree[old].remove(bb)
+            if new_idom is not None:
+                self.tree[new_idom].append(bb)
+            self.idom[bb] = new_idom
+
+
+    def __insert_reachable(self, a: BasicBlock, b: BasicBlock) -> None:
+        # Busca por profundidade (DBS, Georgiadis et al.): w é afetado se
+        # depth(w) > depth(nca) + 1 e algum caminho b ⇝ w só passa por blocos
+        # de profundidade >= depth(w); todo afetado passa a ter idom = nca
+        depth = self.__depth
+        nca = self.nca(a, b)
+        limit = depth[nca] + 1
+        if depth[b] <= limit:
+            return
+        affected = [b]
+        visited = {b}
+        counter = itertools.count()
+        heap = [(-depth[b], next(counter), b)]
+        while heap:
+            _, _, z = heapq.heappop(heap)
+            level = depth[z]
+            stack = [z]
+            while stack:
+                v = stack.pop()
+                for w in v.successors:
+                    if w in visited or w not in depth:
+                        continue
+                    visited.add(w)
+                    if depth[w] > level:
+                        stack.append(w)
+                    elif depth[w] > limit:
+                        affected.append(w)
+                        heapq.heappush(heap, (-depth[w], next(counter), w))
+        for w in affected:
+            self.__set_idom(w, nca)
+        self.__set_depths(nca)
+
+
+    def __insert_unreachable(self, a: BasicBlock, b: BasicBlock) -> None:
+        # Blocos que só b alcança entram abaixo de a; as arestas deles para
+        # blocos já alcançáveis são inseridas uma a uma
+        region: set[BasicBlock] = set()
+        stack = [b]
+        while stack:
+            bb = stack.pop()
+            if bb not in region and bb not in self.__depth:
+                region.add(bb)
+                stack.extend(bb.successors)
+        idom = Dominators.__chk_region(Dominators.reverse_postorder(b, region))
+        idom[b] = a
+        for bb, parent in idom.items():
+            self.__set_idom(bb, parent)
+        self.__depth[b] = self.__depth[a] + 1
+        self.__set_depths(b)
+        for bb in region:
+            for succ in bb.successors:
+                if succ not in region:
+                    self.__insert_reachable(bb, succ)
+
+
+    def __delete_unreachable(self, b: BasicBlock) -> None:
+        # A subárvore de b ficou inalcançável; os blocos onde ela desaguava
+        # podem ganhar dominadores, então a região sob o ancestral comum
+        # deles com idom(b) é recalculada
+        dead = [b]
+        for bb in dead:
+            dead.extend(self.tree[bb])
+        dead_set = set(dead)
+        root = self.idom[b]
+        assert root is not None
+        for bb in dead:
+            for succ in bb.successors:
+                if succ not in dead_set and succ in self.__depth:
+                    root = self.nca(root, succ)
+        for bb in dead:
+            self.__set_idom(bb, None)
+        for bb in dead:
+            del self.__depth[bb]
+        self.__recompute(root)
+
+
+    def __recompute(self, root: BasicBlock) -> None:
+        # Dominadores refeitos só na subárvore de root: todo caminho até ela
+        # passa por root, então o resto do grafo não interfere
+        region = [root]
+        for bb in region:
+            region.extend(self.tree[bb])
+        idom = Dominators.__chk_region(Dominators.reverse_postorder(root, set(region)))
+        for bb in region[1:]:
+            self.__set_idom(bb, idom.get(bb))
+            if bb not in idom:
+                self.__depth.pop(bb, None)
+        self.__set_depths(root)
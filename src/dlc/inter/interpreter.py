@@ -1,14 +1,26 @@
-from collections.abc import Callable
+import asyncio
+from collections.abc import Callable, Generator
 from ctypes import c_double, c_int32
 from typing import cast
 
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.instr import Instr
+from dlc.inter.interpreter_io import AsyncInterpreterIO, InterpreterIO
 from dlc.inter.ir import IR
 from dlc.inter.operand import Const, Label, Operand, Temp
 from dlc.inter.operator import Operator
 from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.profiler import Profile
+from dlc.inter.snapshot import Snapshot
 from dlc.inter.ssa_operand import TempVersion
+from dlc.inter.superinstr import Code, SuperInstr, SuperOp, fuse_superinstructions
 from dlc.semantic.type import Type
 
+# Cópias paralelas (destinos, origens) executadas ao percorrer cada aresta,
+# indexadas por bloco destino e depois por predecessor
+EdgeCopies = dict[BasicBlock, dict[BasicBlock,
+                  tuple[tuple[Operand, ...], tuple[Operand, ...]]]]
+
 
 class Interpreter:
 
@@ -37,11 +49,36 @@ class Interpreter:
         Operator.CONVERT: lambda a: float(a)
     }
     
-    def __init__(self, ir: IR) -> None:
+    # Pedidos do motor de execução ao driver
+    READ = 'read'
+    FLUSH = 'flush'
+    TICK = 'tick'
+
+    def __init__(self, ir: IR, io: InterpreterIO|None=None,
+                 profile: bool=False, superinstructions: bool=False,
+                 budget: int|None=None, sample_every: int|None=None,
+                 sampler: Callable[[BasicBlock], None]|None=None) -> None:
         self.ir = ir
+        # Entrada/saída (padrão: console)
+        self.io = io if io is not None else InterpreterIO()
+        # Quantidade de instruções executadas
+        self.instr_count = 0
+        # Perfil de execução (contagens por bloco, aresta e operador)
+        self.profile = Profile(ir) if profile else None
+        # Fusão de sequências frequentes antes da execução
+        self.superinstructions = superinstructions
+        # Orçamento de instruções por chamada de interpret(): esgotado, a
+        # execução é suspensa na entrada do próximo bloco
+        self.budget = budget
+        # Amostragem do bloco corrente a cada sample_every instruções
+        self.sample_every = sample_every
+        self.samples: list[BasicBlock] = []
+        self.sampler = sampler if sampler is not None else self.samples.append
         
     @staticmethod
-    def __normalize(value: Operand.RUNTIME_TYPES) -> Operand.RUNTIME_TYPES:
+    def normalize(value: Operand.RUNTIME_TYPES) -> Operand.RUNTIME_TYPES:
+        # Inteiros de 32 bits com wraparound e reais de precisão dupla
+        # (também usada pelos passes que avaliam operações em tempo de compilação)
         if isinstance(value, bool):
             return value
         elif isinstance(value, int):
@@ -50,41 +87,174 @@ class Interpreter:
             return c_double(value).value
 
 
-    def interpret(self) -> None:
-        mem: dict[Operand, Operand.RUNTIME_TYPES|None] = {}
+    def interpret(self, snapshot: Snapshot|None=None) -> Snapshot|None:
+        # Retorna None ao terminar ou um Snapshot se o orçamento acabou
+        engine = self.__execute(snapshot, None)
+        try:
+            request = next(engine)
+            while True:
+                match request:
+                    case (Interpreter.READ, type_):
+                        try:
+                            value = self.io.read(type_)
+                        except (ValueError, EOFError) as e:
+                            request = engine.throw(e)
+                            continue
+                        request = engine.send(value)
+                    case _:
+                        request = next(engine)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            self.io.flush()
+
+
+    async def interpret_async(self, snapshot: Snapshot|None=None,
+                              yield_every: int=10_000) -> Snapshot|None:
+        # READ aguarda a fonte assíncrona e PRINT escreve no destino
+        # assíncrono; a cada yield_every instruções o laço de eventos
+        # recupera o controle, então muitas sessões dividem uma thread
+        io = self.io
+        assert isinstance(io, AsyncInterpreterIO)
+        engine = self.__execute(snapshot, yield_every)
+        try:
+            request = next(engine)
+            while True:
+                match request:
+                    case (Interpreter.READ, type_):
+                        await io.aflush()
+                        try:
+                            value = await io.aread(type_)
+                        except (ValueError, EOFError) as e:
+                            request = engine.throw(e)
+                            continue
+                        request = engine.send(value)
+                    case (Interpreter.FLUSH, _):
+                        await io.aflush()
+                        request = next(engine)
+                    case _:
+                        await asyncio.sleep(0)
+                        request = next(engine)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            await io.aflush()
+
 
-        def get_value(arg: Operand) -> Operand.RUNTIME_TYPES | None:
-            if arg.is_temp or arg.is_temp_version:
-                return mem.get(arg)
-            elif arg.is_const:
-                arg = cast(Const, arg)
-                return arg.value
-            return None
+    def __prepare(self) -> tuple[Code, EdgeCopies]:
+        # Código executado por bloco (rótulos não geram despacho)
+        code = {bb: [instr for instr in bb if instr.op != Operator.LABEL]
+                for bb in self.ir.bb_sequence}
+        fused = fuse_superinstructions(code) if self.superinstructions else dict(code)
+        # As PHIs saem do código e viram cópias paralelas por aresta (uma
+        # PhiInstr convertida em MOVE pelo otimizador continua no código)
+        copies = Interpreter.__edge_copies(fused)
+        return {bb: [instr for instr in instrs if instr.op != Operator.PHI]
+                for bb, instrs in fused.items()}, copies
+
+
+    @staticmethod
+    def __edge_copies(code: Code) -> EdgeCopies:
+        # Para cada aresta (pred, succ): destinos e origens das PHIs de succ.
+        # Caminho ausente (valor indefinido no predecessor) copia EMPTY
+        copies: EdgeCopies = {}
+        for bb, instrs in code.items():
+            phis = [cast(PhiInstr, instr) for instr in instrs
+                    if instr.op == Operator.PHI]
+            if not phis:
+                continue
+            dests = tuple(phi.result for phi in phis)
+            copies[bb] = {pred: (dests, tuple(phi.paths.get(pred, Operand.EMPTY)
+                                              for phi in phis))
+                          for pred in bb.predecessors}
+        return copies
+
+
+    def __stop(self, bb: BasicBlock, instrs: list[Instr | SuperInstr],
+               failed: Instr | SuperInstr) -> None:
+        # Erro no meio do bloco: as instruções depois da que falhou não
+        # executaram, mas já estavam em instr_count
+        executed = next(i for i, instr in enumerate(instrs) if instr is failed) + 1
+        self.instr_count -= len(instrs) - executed
+        if self.profile is not None:
+            self.profile.stopped = (bb, executed)
+
+
+    def __execute(self, snapshot: Snapshot|None, tick_every: int|None) \
+            -> Generator[tuple[str, Type|None], Operand.RUNTIME_TYPES, Snapshot|None]:
+        # Motor de execução compartilhado pelos modos síncrono e assíncrono:
+        # suspende-se apenas para pedir entradas (READ), esvaziar a saída
+        # (FLUSH) ou ceder a vez (TICK)
+        io = self.io
+        code, copies = self.__prepare()
+        if self.profile is not None:
+            self.profile = Profile(self.ir, code)
+
+        # Constantes ficam pré-carregadas na memória: toda leitura de
+        # operando é um único acesso ao dicionário
+        mem: dict[Operand, Operand.RUNTIME_TYPES|None] = {Operand.EMPTY: None}
+        for instrs in code.values():
+            for instr in instrs:
+                for arg in (instr.arg1, instr.arg2):
+                    if isinstance(arg, Const):
+                        mem[arg] = arg.value
+        for edges in copies.values():
+            for _, srcs in edges.values():
+                for arg in srcs:
+                    if isinstance(arg, Const):
+                        mem[arg] = arg.value
+
+        block_counts = self.profile.block_counts if self.profile else None
+        edge_counts = self.profile.edge_counts if self.profile else None
 
         bb_prev = None
         bb = self.ir.bb_entry
+        if snapshot is not None:
+            bb, bb_prev, values = snapshot.resolve(self.ir)
+            mem.update(values)
+            self.instr_count = snapshot.instr_count
+
+        budget_end = self.instr_count + self.budget if self.budget is not None else None
+        sample_every = self.sample_every
+        next_sample = self.instr_count + sample_every if sample_every else None
+        next_tick = self.instr_count + tick_every if tick_every else None
+
         while bb:
             bb_next = None
-            for instr in bb:
+            if budget_end is not None and self.instr_count >= budget_end:
+                return Snapshot.capture(bb, bb_prev, mem, self.instr_count)
+            if next_sample is not None and self.instr_count >= next_sample:
+                assert sample_every
+                self.sampler(bb)
+                next_sample += sample_every * \
+                    ((self.instr_count - next_sample) // sample_every + 1)
+            if next_tick is not None and self.instr_count >= next_tick:
+                yield (Interpreter.TICK, None)
+                next_tick = self.instr_count + cast(int, tick_every)
+            if block_counts is not None and edge_counts is not None:
+                block_counts[bb] = block_counts.get(bb, 0) + 1
+                if bb_prev:
+                    edge = (bb_prev, bb)
+                    edge_counts[edge] = edge_counts.get(edge, 0) + 1
+            # PHIs de bb: todas as origens são lidas antes de qualquer escrita
+            if bb in copies and bb_prev in copies[bb]:
+                dests, srcs = copies[bb][bb_prev]
+                for dest, value in zip(dests, [mem.get(src) for src in srcs],
+                                       strict=True):
+                    mem[dest] = value
+            instrs = code[bb]
+            self.instr_count += len(instrs)
+            for instr in instrs:
                 op = instr.op
                 result = instr.result
-                value1 = get_value(instr.arg1)
-                value2 = get_value(instr.arg2)
+                value1 = mem.get(instr.arg1)
+                value2 = mem.get(instr.arg2)
                 
                 match op:
-                    case Operator.PHI:
-                        if bb_prev:
-                            instr = cast(PhiInstr, instr)
-                            value = get_value( instr.paths[bb_prev] )
-                            mem[result] = value
                     case Operator.ALLOCA:
                         mem[result] = None
-                    case Operator.STORE:
+                    case Operator.STORE | Operator.LOAD | Operator.MOVE:
                         mem[result] = value1
-                    case Operator.LOAD:
-                        mem[result] = mem[instr.arg1]
-                    case Operator.LABEL:
-                        continue
                     case Operator.IF:
                         if bool(value1):
                             label = cast(Label, instr.arg2)
@@ -95,31 +265,26 @@ class Interpreter:
                     case Operator.GOTO:
                         label = cast(Label, instr.result)
                         bb_next = self.ir.bb_from_label(label)
+                    case SuperOp.CMP_BRANCH:
+                        instr = cast(SuperInstr, instr)
+                        if value1 is not None and value2 is not None and \
+                                Interpreter.OP_BINARY[instr.base_op](value1, value2):
+                            bb_next = self.ir.bb_from_label(instr.label_true)
+                        else:
+                            bb_next = self.ir.bb_from_label(instr.label_false)
                     case Operator.PRINT:
                         assert(value1 is not None)
-                        if isinstance(value1, float):
-                            print(f'output: {value1:.4f}')
-                        else:
-                            print(f'output: {int(value1)}')
+                        if io.write(value1):
+                            yield (Interpreter.FLUSH, None)
                     case Operator.READ:
                         try:
                             assert(isinstance(result, (Temp, TempVersion)))
-                            i = input('input: ')
-                            match result.type:
-                                case Type.BOOL:
-                                    i = bool(int(i))
-                                case Type.INT:
-                                    i = int(i)
-                                case Type.REAL:
-                                    i = float(i)
-                                case _:
-                                    raise RuntimeError('Não é um tipo válido!')
-                            mem[result] = i
-                        except ValueError:
-                            print('Entrada de dados inválida! Interpretação encerrada.')
-                            return
-                    case Operator.MOVE:
-                        mem[result] = value1
+                            mem[result] = yield (Interpreter.READ, result.type)
+                        except (ValueError, EOFError):
+                            io.error('Entrada de dados inválida! '
+                                     'Interpretação encerrada.')
+                            self.__stop(bb, instrs, instr)
+                            return None
                     case _:
                         try:
                             if value1 is not None:
@@ -129,11 +294,13 @@ class Interpreter:
                                     value = Interpreter.OP_BINARY[op](value1, value2)
                                 else:
                                     raise RuntimeError('Operador não existe!')
-                                mem[result] = Interpreter.__normalize(value)
+                                mem[result] = Interpreter.normalize(value)
                         except ZeroDivisionError:
-                            print('Divisão por zero!')
-                            return
+                            io.error('Divisão por zero!')
+                            self.__stop(bb, instrs, instr)
+                            return None
 
             # BB transition
             bb_prev = bb
             bb = bb_next
+        return None
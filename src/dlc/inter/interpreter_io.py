@@ -0,0 +1,182 @@
+import asyncio
+import sys
+from collections import deque
+from collections.abc import Generator, Iterable, Iterator
+from typing import Any, TextIO
+
+from dlc.inter.operand import Operand
+from dlc.semantic.type import Type
+
+
+class InterpreterIO:
+
+    BUFFER_SIZE = 4096
+
+    def __init__(self, inputs: Iterable[Any] | TextIO | None = None,
+                 outputs: list[str] | TextIO | None = None,
+                 prompt: str | None = 'input: ',
+                 buffer_size: int = BUFFER_SIZE) -> None:
+        # Entradas: console (None), arquivo/stream texto, iterável ou array NumPy
+        self.__inputs: Iterator[Any] | None = None
+        if inputs is not None:
+            if hasattr(inputs, 'read'):
+                self.__inputs = InterpreterIO.__tokens(inputs) # type: ignore
+            elif hasattr(inputs, 'ravel'):
+                self.__inputs = iter(inputs.ravel().tolist()) # type: ignore
+            else:
+                self.__inputs = iter(inputs) # type: ignore
+        # Saídas: lista recebe os valores formatados; streams (e o console,
+        # quando None) recebem linhas 'output: <valor>' em escritas grandes
+        self.outputs = outputs
+        self.prompt = prompt
+        self.buffer_size = buffer_size
+        self.__buffer: list[str] = []
+        self.errors: list[str] = []
+
+
+    @staticmethod
+    def __tokens(stream: TextIO) -> Generator[str, None, None]:
+        for line in stream:
+            yield from line.split()
+
+
+    @staticmethod
+    def format(value: Operand.RUNTIME_TYPES) -> str:
+        if isinstance(value, float):
+            return f'{value:.4f}'
+        return f'{int(value)}'
+
+
+    @staticmethod
+    def convert(raw: str | Operand.RUNTIME_TYPES, type: Type) -> Operand.RUNTIME_TYPES:
+        match type:
+            case Type.BOOL:
+                return bool(int(raw))
+            case Type.INT:
+                return int(raw)
+            case Type.REAL:
+                return float(raw)
+            case _:
+                raise RuntimeError('Não é um tipo válido!')
+
+
+    def read(self, type: Type) -> Operand.RUNTIME_TYPES:
+        if self.__inputs is None:
+            self.flush()
+            raw = input(self.prompt or '')
+        else:
+            raw = next(self.__inputs, None)
+            if raw is None:
+                raise EOFError('Entradas esgotadas')
+        return InterpreterIO.convert(raw, type)
+
+
+    def write(self, value: Operand.RUNTIME_TYPES) -> bool:
+        # Retorna True quando o chamador deve esvaziar o buffer (modo
+        # assíncrono); aqui o esvaziamento é feito na própria escrita
+        if isinstance(self.outputs, list):
+            self.outputs.append(InterpreterIO.format(value))
+            return False
+        self.__buffer.append(f'output: {InterpreterIO.format(value)}')
+        if len(self.__buffer) >= self.buffer_size:
+            self.flush()
+        return False
+
+
+    def error(self, msg: str) -> None:
+        self.errors.append(msg)
+        if not isinstance(self.outputs, list):
+            self.__buffer.append(msg)
+            self.flush()
+
+
+    def flush(self) -> None:
+        if not self.__buffer:
+            return
+        stream = sys.stdout if self.outputs is None else self.outputs
+        assert not isinstance(stream, list)
+        stream.write('\n'.join(self.__buffer) + '\n')
+        self.__buffer.clear()
+        stream.flush()
+
+
+
+class AsyncInterpreterIO(InterpreterIO):
+    # E/S para Interpreter.interpret_async: entradas de uma asyncio.Queue
+    # (None encerra) ou de um StreamReader; saídas para uma asyncio.Queue
+    # (valores formatados), um StreamWriter (linhas 'output: <valor>') ou
+    # uma lista. Nada aqui bloqueia o laço de eventos.
+
+    def __init__(self,
+                 inputs: asyncio.Queue[Any] | asyncio.StreamReader | Iterable[Any],
+                 outputs: asyncio.Queue[str] | asyncio.StreamWriter | list[str],
+                 prompt: str | None = None,
+                 buffer_size: int = InterpreterIO.BUFFER_SIZE) -> None:
+        super().__init__(inputs if not AsyncInterpreterIO.__is_async(inputs) else (),
+                         outputs if isinstance(outputs, list) else None,
+                         prompt, buffer_size)
+        self.async_inputs = inputs if AsyncInterpreterIO.__is_async(inputs) else None
+        self.async_outputs = outputs if not isinstance(outputs, list) else None
+        self.__tokens: deque[str] = deque()
+        self.__buffer: list[str] = []
+
+
+    @staticmethod
+    def __is_async(inputs: object) -> bool:
+        return isinstance(inputs, (asyncio.Queue, asyncio.StreamReader))
+
+
+    async def aread(self, type: Type) -> Operand.RUNTIME_TYPES:
+        inputs = self.async_inputs
+        if inputs is None:
+            return self.read(type)
+        if self.prompt and isinstance(self.async_outputs, asyncio.StreamWriter):
+            self.async_outputs.write(self.prompt.encode())
+            await self.async_outputs.drain()
+        if isinstance(inputs, asyncio.Queue):
+            raw = await inputs.get()
+            if raw is None:
+                raise EOFError('Entradas esgotadas')
+            return InterpreterIO.convert(raw, type)
+        while not self.__tokens:
+            line = await inputs.readline()
+            if not line:
+                raise EOFError('Entradas esgotadas')
+            self.__tokens.extend(line.decode().split())
+        return InterpreterIO.convert(self.__tokens.popleft(), type)
+
+
+    def write(self, value: Operand.RUNTIME_TYPES) -> bool:
+        if self.async_outputs is None:
+            return super().write(value)
+        if isinstance(self.async_outputs, asyncio.Queue):
+            self.__buffer.append(InterpreterIO.format(value))
+        else:
+            self.__buffer.append(f'output: {InterpreterIO.format(value)}\n')
+        return len(self.__buffer) >= self.buffer_size
+
+
+    def error(self, msg: str) -> None:
+        if self.async_outputs is None:
+            return super().error(msg)
+        self.errors.append(msg)
+        if isinstance(self.async_outputs, asyncio.StreamWriter):
+            self.__buffer.append(msg + '\n')
+
+
+    def flush(self) -> None:
+        # Sem E/S síncrona: o conteúdo é entregue por aflush()
+        pass
+
+
+    async def aflush(self) -> None:
+        if not self.__buffer:
+            return
+        outputs = self.async_outputs
+        if isinstance(outputs, asyncio.Queue):
+            for value in self.__buffer:
+                await outputs.put(value)
+        elif isinstance(outputs, asyncio.StreamWriter):
+            outputs.write(''.join(self.__buffer).encode())
+            await outputs.drain()
+        self.__buffer.clear()
@@ -52,6 +52,10 @@ class IR(Visitor[Operand]):
         self.label_bb_map: defaultdict[Label, BasicBlock] = defaultdict(BasicBlock)
         self.bb_sequence: list[BasicBlock] = []
         self.__comments: dict[Instr, str] = {}
+        # Análises do CFG (dominadores, laços...) valem até a próxima mudança
+        # de arestas ou blocos, sinalizada por invalidate_cfg()
+        self.cfg_version = 0
+        self.analyses: dict[str, object] = {}
         # Entry Basic Block
         L0 = Label()
         self.bb_entry = BasicBlock()
@@ -71,15 +75,23 @@ class IR(Visitor[Operand]):
         return self.label_bb_map[label]
 
 
+    def invalidate_cfg(self) -> None:
+        self.cfg_version += 1
+        if self.analyses:
+            self.analyses.clear()
+
+
     def add_instr(self, instr: Instr, comment: str|None=None) -> None:
         match instr.op:
             case Operator.LABEL:
+                self.invalidate_cfg()
                 label = cast(Label, instr.result)
                 new_bb = self.label_bb_map[label]
                 new_bb.label_instr = instr
                 self.bb_sequence.append(new_bb)
                 self.__bb_current = new_bb
             case Operator.GOTO | Operator.IF:
+                self.invalidate_cfg()
                 for arg in (instr.arg2, instr.result):
                     if arg.is_label:
                         label = cast(Label, arg)
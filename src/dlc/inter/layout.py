@@ -0,0 +1,96 @@
+import heapq
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.ir import IR
+from dlc.inter.loops import LoopForest
+from dlc.inter.profiler import Profile
+
+# Posicionamento de blocos (Pettis-Hansen): a ordem de bb_sequence passa a
+# favorecer a queda direta (fall-through) nas arestas mais frequentes.
+#   1. arestas em ordem decrescente de peso unem cadeias quando a origem é
+#      o fim de uma cadeia e o destino o início de outra; em empates vence a
+#      aresta de retorno, o que leva o teste do laço para o fim do corpo
+#      (o corpo cai no cabeçalho, que desvia para trás ou cai na saída)
+#   2. as cadeias são emitidas a partir da entrada, sempre a mais ligada às
+#      já emitidas; a cadeia do bloco final (sem desvio) fica por último
+# Os pesos vêm das contagens de arestas de um Profile ou, sem ele, de uma
+# estimativa estática: frequência 8^profundidade do laço, dividida entre os
+# sucessores, e arestas de saída de laço 8 vezes menos prováveis.
+
+LOOP_WEIGHT = 8
+
+
+def edge_weights(ir: IR, profile: Profile | None = None) \
+        -> dict[tuple[BasicBlock, BasicBlock], float]:
+    if profile is not None:
+        return {(bb, succ): float(profile.edge_counts.get((bb, succ), 0))
+                for bb in ir.bb_sequence for succ in bb.successors}
+    forest = LoopForest.of(ir)
+    weights: dict[tuple[BasicBlock, BasicBlock], float] = {}
+    for bb in ir.bb_sequence:
+        depth = forest.depth(bb)
+        freq = float(LOOP_WEIGHT ** depth)
+        for succ in bb.successors:
+            weight = freq / len(bb.successors)
+            if forest.depth(succ) < depth:
+                weight /= LOOP_WEIGHT
+            weights[(bb, succ)] = weight
+    return weights
+
+
+def layout_blocks(ir: IR, profile: Profile | None = None) -> None:
+    order = {bb: k for k, bb in enumerate(ir.bb_sequence)}
+    weights = edge_weights(ir, profile)
+    dominates = LoopForest.of(ir).dominators.dominates
+
+    # 1. Cadeias
+    chain_of = {bb: [bb] for bb in ir.bb_sequence}
+    edges = sorted(weights, key=lambda e: (-weights[e], not dominates(e[1], e[0]),
+                                           order[e[0]], order[e[1]]))
+    for a, b in edges:
+        chain_a, chain_b = chain_of[a], chain_of[b]
+        if chain_a is chain_b or chain_a[-1] is not a or chain_b[0] is not b \
+                or b is ir.bb_entry:
+            continue
+        chain_a.extend(chain_b)
+        for bb in chain_b:
+            chain_of[bb] = chain_a
+
+    # O bloco final não pode ficar no meio: se a cadeia da entrada chegou
+    # até ele, ele volta a ser uma cadeia à parte
+    entry_chain = chain_of[ir.bb_entry]
+    if len(entry_chain) > 1 and entry_chain[-1].goto_instr is None:
+        last = entry_chain.pop()
+        chain_of[last] = [last]
+
+    # 2. Ordem das cadeias
+    chains = {id(chain): chain for chain in chain_of.values()}
+    final = dict.fromkeys(key for key, chain in chains.items()
+                          if chain[-1].goto_instr is None)
+    score: dict[int, float] = dict.fromkeys(chains, 0.0)
+    heap = [(0.0, order[chain[0]], key) for key, chain in chains.items()]
+    heapq.heapify(heap)
+    placed: set[int] = set()
+    sequence: list[BasicBlock] = []
+
+    def place(chain: list[BasicBlock]) -> None:
+        placed.add(id(chain))
+        sequence.extend(chain)
+        for bb in chain:
+            for succ in bb.successors:
+                key = id(chain_of[succ])
+                if key not in placed:
+                    score[key] += weights[(bb, succ)]
+                    heapq.heappush(heap, (-score[key], order[chain_of[succ][0]], key))
+
+    place(chain_of[ir.bb_entry])
+    while heap:
+        neg_score, _, key = heapq.heappop(heap)
+        chain = chains[key]
+        if key in placed or -neg_score != score[key] or key in final:
+            continue
+        place(chain)
+    for key in final:
+        if key not in placed:
+            place(chains[key])
+    ir.bb_sequence = sequence
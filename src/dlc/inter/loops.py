@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+from typing import cast
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.dominators import Dominators
+from dlc.inter.instr import Instr
+from dlc.inter.ir import IR
+from dlc.inter.operand import Const, Operand
+from dlc.inter.operator import Operator
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.ssa_operand import TempVersion
+
+
+class TripCount:
+    # Candidato a contagem de iterações: o laço continua enquanto
+    # iv <op> bound, com iv = init na entrada e iv = iv + step a cada volta
+
+    INVERSE = {Operator.LT: Operator.GE, Operator.LE: Operator.GT,
+               Operator.GT: Operator.LE, Operator.GE: Operator.LT,
+               Operator.EQ: Operator.NE, Operator.NE: Operator.EQ}
+    SWAPPED = {Operator.LT: Operator.GT, Operator.LE: Operator.GE,
+               Operator.GT: Operator.LT, Operator.GE: Operator.LE,
+               Operator.EQ: Operator.EQ, Operator.NE: Operator.NE}
+
+    def __init__(self, iv: TempVersion, init: Operand, step: Operand,
+                 op: Operator, bound: Operand, compare: Instr | None = None) -> None:
+        self.iv = iv
+        self.init = init
+        self.step = step
+        self.op = op
+        self.bound = bound
+        # Comparação que decide a saída (op pode estar invertido em relação a ela)
+        self.compare = compare
+
+
+    @property
+    def count(self) -> int | None:
+        # Número de execuções do corpo, quando init, step e bound são constantes
+        if not all(isinstance(arg, Const) and isinstance(arg.value, int)
+                   and not isinstance(arg.value, bool)
+                   for arg in (self.init, self.step, self.bound)):
+            return None
+        init = cast(int, cast(Const, self.init).value)
+        step = cast(int, cast(Const, self.step).value)
+        bound = cast(int, cast(Const, self.bound).value)
+        if step == 0:
+            return None
+        match self.op:
+            case Operator.LT if step > 0:
+                return max(0, -((init - bound) // step))
+            case Operator.LE if step > 0:
+                return max(0, (bound - init) // step + 1)
+            case Operator.GT if step < 0:
+                return max(0, -((bound - init) // -step))
+            case Operator.GE if step < 0:
+                return max(0, (init - bound) // -step + 1)
+            case Operator.NE if (bound - init) % step == 0 and \
+                    (bound - init) // step >= 0:
+                return (bound - init) // step
+        return None
+
+
+    def __str__(self) -> str:
+        return (f'{self.iv} = {self.init}; {self.iv} {self.op} {self.bound}; '
+                f'{self.iv} += {self.step}')
+
+
+
+class InductionVariable:
+    # Variável de indução básica: PHI do cabeçalho que vale init na entrada
+    # e next = iv + step (step constante) ao voltar pelo laço
+    def __init__(self, phi: PhiInstr, init: Operand, step: Const,
+                 next: TempVersion, increment: Instr) -> None:
+        self.phi = phi
+        self.iv = cast(TempVersion, phi.result)
+        self.init = init
+        self.step = step
+        self.next = next
+        self.increment = increment
+
+
+    def __str__(self) -> str:
+        return f'{self.iv} = {self.init}; {self.iv} += {self.step}'
+
+
+
+class Loop:
+    def __init__(self, header: BasicBlock) -> None:
+        self.header = header
+        self.blocks: set[BasicBlock] = {header}
+        # Origens das arestas de retorno
+        self.latches: list[BasicBlock] = []
+        self.parent: Loop | None = None
+        self.children: list[Loop] = []
+        # Único predecessor externo do cabeçalho que só desvia para ele
+        self.preheader: BasicBlock | None = None
+        # Arestas (de dentro, para fora) do laço
+        self.exits: list[tuple[BasicBlock, BasicBlock]] = []
+        self.trip_count: TripCount | None = None
+        # Variáveis de indução básicas, por PHI do cabeçalho
+        self.ivs: dict[TempVersion, InductionVariable] = {}
+
+
+    @property
+    def depth(self) -> int:
+        depth, loop = 1, self.parent
+        while loop is not None:
+            depth, loop = depth + 1, loop.parent
+        return depth
+
+
+    def __contains__(self, bb: BasicBlock) -> bool:
+        return bb in self.blocks
+
+
+    def __repr__(self) -> str:
+        return f'<Loop: {self.header}, {len(self.blocks)} blocks>'
+
+
+
+class LoopForest:
+    # Laços naturais do CFG e sua floresta de aninhamento. Fica guardada em
+    # ir.analyses até a próxima mudança no CFG (IR.invalidate_cfg)
+
+    def __init__(self, ir: IR, dominators: Dominators | None = None) -> None:
+        self.ir = ir
+        self.cfg_version = ir.cfg_version
+        self.dominators = dominators if dominators is not None \
+            else Dominators(ir.bb_entry, ir.bb_sequence)
+        # Laços por cabeçalho, em ordem de pós-ordem reversa dos cabeçalhos
+        self.loops: dict[BasicBlock, Loop] = {}
+        # Laço mais interno de cada bloco
+        self.loop_of: dict[BasicBlock, Loop] = {}
+        self.roots: list[Loop] = []
+        # Definições das versões SSA e seus blocos (IR em TAC não tem candidatos)
+        self.__defs: dict[Operand, Instr] = {}
+        self.__def_block: dict[Operand, BasicBlock] = {}
+        for bb in ir.bb_sequence:
+            for instr in bb:
+                if isinstance(instr.result, TempVersion):
+                    self.__defs[instr.result] = instr
+                    self.__def_block[instr.result] = bb
+        self.__find_loops()
+        self.__build_forest()
+        for loop in self.loops.values():
+            self.__find_preheader(loop)
+            self.__find_exits(loop)
+            self.__find_ivs(loop)
+            loop.trip_count = self.__find_trip_count(loop)
+
+
+    @staticmethod
+    def of(ir: IR) -> LoopForest:
+        forest = ir.analyses.get('loops')
+        if not isinstance(forest, LoopForest):
+            forest = LoopForest(ir)
+            ir.analyses['loops'] = forest
+        return forest
+
+
+    @property
+    def valid(self) -> bool:
+        return self.cfg_version == self.ir.cfg_version
+
+
+    def depth(self, bb: BasicBlock) -> int:
+        loop = self.loop_of.get(bb)
+        return loop.depth if loop else 0
+
+
+    def __find_loops(self) -> None:
+        # Aresta de retorno: destino domina a origem
+        dominates = self.dominators.dominates
+        for bb in self.dominators.rpo:
+            for succ in bb.successors:
+                if dominates(succ, bb):
+                    loop = self.loops.setdefault(succ, Loop(succ))
+                    loop.latches.append(bb)
+        for loop in self.loops.values():
+            worklist = list(loop.latches)
+            while worklist:
+                bb = worklist.pop()
+                if bb not in loop.blocks:
+                    loop.blocks.add(bb)
+                    worklist.extend(bb.predecessors)
+        order = self.dominators.rpo_number
+        self.loops = dict(sorted(self.loops.items(), key=lambda e: order[e[0]]))
+
+
+    def __build_forest(self) -> None:
+        # Do maior para o menor: o pai é o menor laço que contém o cabeçalho
+        by_size = sorted(self.loops.values(), key=lambda loop: -len(loop.blocks))
+        for loop in by_size:
+            parent = self.loop_of.get(loop.header)
+            if parent is not None:
+                loop.parent = parent
+                parent.children.append(loop)
+            else:
+                self.roots.append(loop)
+            for bb in loop.blocks:
+                self.loop_of[bb] = loop
+
+
+    def __find_preheader(self, loop: Loop) -> None:
+        outside = [p for p in loop.header.predecessors if p not in loop.blocks]
+        if len(outside) == 1 and len(outside[0].successors) == 1:
+            loop.preheader = outside[0]
+
+
+    def __find_exits(self, loop: Loop) -> None:
+        for bb in self.ir.bb_sequence:
+            if bb in loop.blocks:
+                loop.exits.extend((bb, succ) for succ in bb.successors
+                                  if succ not in loop.blocks)
+
+
+    def __find_ivs(self, loop: Loop) -> None:
+        # PHIs com um caminho de fora e outro de dentro do laço, este
+        # incrementado por uma constante
+        defs = self.__defs
+        for instr in loop.header.phi_instrs:
+            phi = cast(PhiInstr, instr)
+            inits = [v for p, v in phi.paths.items() if p not in loop.blocks]
+            nexts = [v for p, v in phi.paths.items() if p in loop.blocks]
+            if len(inits) != 1 or len(nexts) != 1 or \
+                    len(phi.paths) != len(loop.header.predecessors):
+                continue
+            next_value = self.__through_moves(nexts[0], defs)
+            step = self.__step(phi.result, next_value, defs)
+            if isinstance(step, Const) and isinstance(next_value, TempVersion):
+                loop.ivs[cast(TempVersion, phi.result)] = InductionVariable(
+                    phi, self.__through_moves(inits[0], defs), step,
+                    next_value, defs[next_value])
+
+
+    def __find_trip_count(self, loop: Loop) -> TripCount | None:
+        # Laço com uma única saída por um IF sobre iv <op> bound, em que iv é
+        # uma variável de indução básica
+        if len(loop.exits) != 1 or len(loop.latches) != 1:
+            return None
+        bb, target = loop.exits[0]
+        branch = bb.goto_instr
+        if branch is None or branch.op != Operator.IF:
+            return None
+        defs = self.__defs
+        cond = self.__through_moves(branch.arg1, defs)
+        cmp = defs.get(cond)
+        if cmp is None or cmp.op not in TripCount.INVERSE:
+            return None
+        op = cmp.op
+        if self.ir.bb_from_label(branch.arg2) is target:  # type: ignore[arg-type]
+            op = TripCount.INVERSE[op]
+        left = self.__through_moves(cmp.arg1, defs)
+        right = self.__through_moves(cmp.arg2, defs)
+        for iv, bound, rel in ((left, right, op), (right, left, TripCount.SWAPPED[op])):
+            ind = loop.ivs.get(cast(TempVersion, iv))
+            if ind is not None and self.__invariant(bound, loop):
+                return TripCount(ind.iv, ind.init, ind.step, rel, bound, cmp)
+        return None
+
+
+    @staticmethod
+    def __through_moves(arg: Operand, defs: dict[Operand, Instr]) -> Operand:
+        seen: set[Operand] = set()
+        while arg in defs and defs[arg].op == Operator.MOVE and arg not in seen:
+            seen.add(arg)
+            arg = defs[arg].arg1
+        return arg
+
+
+    def __invariant(self, arg: Operand, loop: Loop) -> bool:
+        return isinstance(arg, Const) or (isinstance(arg, TempVersion) and
+                                          self.__def_block.get(arg) not in loop.blocks)
+
+
+    def __step(self, iv: Operand, next_value: Operand,
+               defs: dict[Operand, Instr]) -> Operand | None:
+        instr = defs.get(next_value)
+        if instr is None or instr.op not in (Operator.SUM, Operator.SUB):
+            return None
+        arg1 = self.__through_moves(instr.arg1, defs)
+        arg2 = self.__through_moves(instr.arg2, defs)
+        if arg1 is iv and isinstance(arg2, Const):
+            if instr.op == Operator.SUB:
+                return Const(arg2.type, -arg2.value)
+            return arg2
+        if arg2 is iv and isinstance(arg1, Const) and instr.op == Operator.SUM:
+            return arg1
+        return None
@@ -104,5 +104,8 @@ class Empty(Operand):
     def __repr__(self) -> str:
         return str(self)
 
+    def __reduce__(self) -> tuple[object, tuple[type, str]]:
+        return (getattr, (Operand, 'EMPTY'))
+
 
 Operand.EMPTY = Empty()
\ No newline at end of file
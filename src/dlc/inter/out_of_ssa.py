@@ -0,0 +1,218 @@
+from collections.abc import Callable
+from typing import cast
+
+from dlc.codegen.live_analysis import LivenessAnalysis
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.instr import Instr
+from dlc.inter.operand import Label, Operand, Temp
+from dlc.inter.operator import Operator
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_operand import TempVersion
+from dlc.semantic.type import Type
+
+# Saída da SSA: as PHIs viram cópias nas arestas, e a IR resultante não tem
+# PHIs (pode ir para qualquer backend ou para o interpretador).
+#   1. cópias de uma aresta vão para o fim do predecessor, se ele tiver um
+#      único sucessor, ou para o início do sucessor, se ele tiver um único
+#      predecessor; só as demais arestas (críticas) ganham um bloco novo
+#   2. a cópia paralela de cada aresta é sequencializada com o mínimo de
+#      MOVEs: um por cópia e um temporário extra por ciclo
+#   3. cópias cuja origem e destino não interferem são coalescidas
+
+Copy = tuple[Operand, Operand]
+
+
+def edge_copies(pred: BasicBlock, bb: BasicBlock) -> list[Copy]:
+    # Cópia paralela (destino, origem) da aresta pred -> bb; caminhos
+    # ausentes (valor indefinido) e cópias de uma variável nela mesma saem
+    copies: list[Copy] = []
+    for instr in bb.phi_instrs:
+        phi = cast(PhiInstr, instr)
+        src = phi.paths.get(pred)
+        if src is not None and src is not phi.result:
+            copies.append((phi.result, src))
+    return copies
+
+
+def is_var(arg: Operand) -> bool:
+    return isinstance(arg, (Temp, TempVersion))
+
+
+def sequentialize(copies: list[Copy],
+                  new_temp: Callable[[Type], Operand]) -> list[Copy]:
+    # Destinos que ninguém mais lê são escritos primeiro; o que sobra são
+    # ciclos, quebrados salvando um destino em um temporário
+    pending = {dest: src for dest, src in copies if is_var(src)}
+    readers: dict[Operand, int] = {}
+    for src in pending.values():
+        readers[src] = readers.get(src, 0) + 1
+    location: dict[Operand, Operand] = {}
+    moves: list[Copy] = []
+    ready = [dest for dest in pending if readers.get(dest, 0) == 0]
+    while pending:
+        while ready:
+            dest = ready.pop()
+            src = pending.pop(dest)
+            moves.append((dest, location.get(src, src)))
+            readers[src] -= 1
+            if readers[src] == 0 and src in pending:
+                ready.append(src)
+        if pending:
+            dest = next(iter(pending))
+            temp = new_temp(cast(TempVersion, dest).type)
+            moves.append((temp, dest))
+            location[dest] = temp
+            ready.append(dest)
+    # Constantes por último: seus destinos podem ser origens de outras cópias
+    moves.extend((dest, src) for dest, src in copies if not is_var(src))
+    return moves
+
+
+def retarget(pred: BasicBlock, old: BasicBlock, new: BasicBlock) -> None:
+    # Desvios de pred para old passam a ir para new (os predecessores de
+    # old e new ficam a cargo de quem chama)
+    assert pred.goto_instr is not None
+    assert old.label_instr is not None and new.label_instr is not None
+    old_label, new_label = old.label_instr.result, new.label_instr.result
+    instr = pred.goto_instr
+    if instr.arg2 is old_label:
+        instr.arg2 = new_label
+    if instr.result is old_label:
+        instr.result = new_label
+    pred.successors[pred.successors.index(old)] = new
+
+
+def split_edge(ssa: SSA, pred: BasicBlock, bb: BasicBlock) -> BasicBlock:
+    assert bb.label_instr is not None
+    EMPTY = Operand.EMPTY
+    label = Label()
+    edge = ssa.ir.label_bb_map[label]
+    edge.label_instr = Instr(Operator.LABEL, EMPTY, EMPTY, label)
+    edge.goto_instr = Instr(Operator.GOTO, EMPTY, EMPTY, bb.label_instr.result)
+    edge.successors = [bb]
+    edge.predecessors = [pred]
+    retarget(pred, bb, edge)
+    bb.predecessors[bb.predecessors.index(pred)] = edge
+    for instr in bb.phi_instrs:
+        phi = cast(PhiInstr, instr)
+        if pred in phi.paths:
+            phi.paths[edge] = phi.paths.pop(pred)
+    return edge
+
+
+def lower_phis(ssa: SSA) -> dict[BasicBlock, BasicBlock]:
+    # Retorna os blocos criados, mapeados para o predecessor de origem
+    split: dict[BasicBlock, BasicBlock] = {}
+    def new_temp(type: Type) -> Operand:
+        return TempVersion(Temp(type), 1)
+    for bb in list(ssa.ir.bb_sequence):
+        if not bb.phi_instrs:
+            continue
+        for pred in list(bb.predecessors):
+            copies = edge_copies(pred, bb)
+            if not copies:
+                continue
+            moves = [Instr(Operator.MOVE, src, Operand.EMPTY, dest)
+                     for dest, src in sequentialize(copies, new_temp)]
+            if len(pred.successors) == 1:
+                pred.body_instrs.extend(moves)
+            elif len(bb.predecessors) == 1:
+                for move in reversed(moves):
+                    bb.prepend(move)
+            else:
+                edge = split_edge(ssa, pred, bb)
+                edge.body_instrs.extend(moves)
+                split[edge] = pred
+        for instr in bb.phi_instrs:
+            bb.discard(instr)
+        bb.compact()
+
+    if split:
+        # Blocos de aresta entram logo após o predecessor de origem
+        after: dict[BasicBlock, list[BasicBlock]] = {}
+        for edge, pred in split.items():
+            after.setdefault(pred, []).append(edge)
+        sequence: list[BasicBlock] = []
+        for bb in ssa.ir.bb_sequence:
+            sequence.append(bb)
+            sequence.extend(after.get(bb, []))
+        ssa.ir.bb_sequence = sequence
+        ssa.ir.invalidate_cfg()
+    return split
+
+
+def coalesce_copies(ssa: SSA) -> int:
+    # Coalescimento agressivo: o grafo de interferência não liga o destino
+    # de um MOVE à sua origem, e variáveis unidas herdam as interferências
+    liveness = LivenessAnalysis(ssa, (Type.BOOL, Type.INT, Type.REAL))
+    interference: dict[TempVersion, set[TempVersion]] = {}
+    copies: list[Instr] = []
+    for bb in ssa.ir.bb_sequence:
+        live = set(liveness.live_out[bb])
+        instrs = bb.body_instrs + ([bb.goto_instr] if bb.goto_instr else [])
+        for instr in reversed(instrs):
+            res = instr.result
+            is_copy = instr.op == Operator.MOVE and isinstance(instr.arg1, TempVersion)
+            if isinstance(res, TempVersion):
+                for v in live:
+                    if v is not res and not (is_copy and v is instr.arg1):
+                        interference.setdefault(res, set()).add(v)
+                        interference.setdefault(v, set()).add(res)
+                live.discard(res)
+                if is_copy:
+                    copies.append(instr)
+            for arg in (instr.arg1, instr.arg2):
+                if isinstance(arg, TempVersion):
+                    live.add(arg)
+
+    parent: dict[TempVersion, TempVersion] = {}
+    def find(v: TempVersion) -> TempVersion:
+        while v in parent:
+            v = parent[v]
+        return v
+
+    merged = 0
+    for instr in copies:
+        dest = find(cast(TempVersion, instr.result))
+        src = find(cast(TempVersion, instr.arg1))
+        if dest is src or dest in interference.get(src, set()):
+            continue
+        parent[dest] = src
+        neighbors = interference.pop(dest, set())
+        interference.setdefault(src, set()).update(neighbors)
+        for n in neighbors:
+            interference[n].discard(dest)
+            interference[n].add(src)
+        merged += 1
+
+    if merged:
+        for bb in ssa.ir.bb_sequence:
+            for instr in bb:
+                for attr in ('arg1', 'arg2', 'result'):
+                    arg = getattr(instr, attr)
+                    if isinstance(arg, TempVersion) and arg in parent:
+                        setattr(instr, attr, find(arg))
+                if instr.op == Operator.MOVE and instr.arg1 is instr.result:
+                    bb.discard(instr)
+            bb.compact()
+    return merged
+
+
+def out_of_ssa(ssa: SSA, coalesce: bool = True) -> None:
+    split = lower_phis(ssa)
+    if coalesce:
+        coalesce_copies(ssa)
+    # Blocos de aresta que ficaram vazios após o coalescimento são desfeitos
+    removed: set[BasicBlock] = set()
+    for edge, pred in split.items():
+        if not edge.body_instrs:
+            succ = edge.successors[0]
+            retarget(pred, edge, succ)
+            succ.predecessors[succ.predecessors.index(edge)] = pred
+            assert edge.label_instr is not None
+            del ssa.ir.label_bb_map[cast(Label, edge.label_instr.result)]
+            removed.add(edge)
+    if removed:
+        ssa.ir.bb_sequence = [bb for bb in ssa.ir.bb_sequence if bb not in removed]
+        ssa.ir.invalidate_cfg()
@@ -0,0 +1,141 @@
+import io
+import os
+import pickle
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import InterpreterIO
+from dlc.inter.ir import IR
+from dlc.inter.operand import Operand
+
+JobInput = str | os.PathLike[str] | Iterable[str | Operand.RUNTIME_TYPES]
+
+
+class RunResult:
+    def __init__(self, index: int, outputs: list[str],
+                 instr_count: int, wall_time: float) -> None:
+        self.index = index
+        self.outputs = outputs
+        self.instr_count = instr_count
+        self.wall_time = wall_time
+
+    def __repr__(self) -> str:
+        return (f'<RunResult {self.index}: {len(self.outputs)} outputs, '
+                f'{self.instr_count} instrs, {self.wall_time:.6f}s>')
+
+
+
+# O pickle padrão segue os links entre blocos (sucessores, predecessores,
+# caminhos de PHIs) recursivamente e estoura a pilha em CFGs com poucas
+# centenas de blocos. Os blocos são serializados como referências
+# persistentes e o conteúdo de cada um é gravado depois, em sequência.
+class _IRPickler(pickle.Pickler):
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.block_ids: dict[BasicBlock, int] = {}
+        self.blocks: list[BasicBlock] = []
+
+    def persistent_id(self, obj: object) -> int | None:
+        if isinstance(obj, BasicBlock):
+            if obj not in self.block_ids:
+                self.block_ids[obj] = len(self.blocks)
+                self.blocks.append(obj)
+            return self.block_ids[obj]
+        return None
+
+
+class _IRUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file)
+        self.blocks: list[BasicBlock] = []
+
+    def persistent_load(self, pid: int) -> BasicBlock:
+        while pid >= len(self.blocks):
+            self.blocks.append(BasicBlock.__new__(BasicBlock))
+        return self.blocks[pid]
+
+
+def dumps_ir(ir: IR) -> bytes:
+    buffer = io.BytesIO()
+    pickler = _IRPickler(buffer)
+    pickler.dump(ir)
+    # O memo é compartilhado entre os dumps; a lista pode crescer no laço
+    i = 0
+    while i < len(pickler.blocks):
+        pickler.dump(vars(pickler.blocks[i]))
+        i += 1
+    pickler.dump(None)
+    return buffer.getvalue()
+
+
+def loads_ir(data: bytes) -> IR:
+    unpickler = _IRUnpickler(io.BytesIO(data))
+    ir = unpickler.load()
+    i = 0
+    while (state := unpickler.load()) is not None:
+        unpickler.persistent_load(i).__dict__.update(state)
+        i += 1
+    return ir
+
+
+
+# IR desserializada uma única vez por processo trabalhador
+_worker_ir: IR | None = None
+
+
+def _init_worker(ir_bytes: bytes) -> None:
+    global _worker_ir
+    _worker_ir = loads_ir(ir_bytes)
+
+
+def _read_tokens(path: str | os.PathLike[str]) -> list[str]:
+    with open(path) as file:
+        return file.read().split()
+
+
+def _run_job(job: tuple[int, JobInput]) -> RunResult:
+    index, job_input = job
+    assert _worker_ir is not None
+    if isinstance(job_input, (str, os.PathLike)):
+        job_input = _read_tokens(job_input)
+    outputs: list[str] = []
+    interpreter = Interpreter(_worker_ir, InterpreterIO(job_input, outputs))
+    start = time.perf_counter()
+    interpreter.interpret()
+    wall_time = time.perf_counter() - start
+    return RunResult(index, outputs, interpreter.instr_count, wall_time)
+
+
+
+class ParallelInterpreter:
+
+    def __init__(self, ir: IR, max_workers: int | None = None) -> None:
+        # A IR (normalmente já otimizada) é serializada uma única vez
+        self.ir_bytes = dumps_ir(ir)
+        self.max_workers = max_workers
+
+
+    def run(self, jobs: Sequence[JobInput], chunksize: int = 1) -> list[RunResult]:
+        # Caminhos (str/Path) são lidos no trabalhador; outros iteráveis
+        # são materializados para poderem ser enviados ao processo
+        tasks: list[tuple[int, JobInput]] = []
+        for i, job in enumerate(jobs):
+            if not isinstance(job, (str, os.PathLike)):
+                job = list(job)
+            tasks.append((i, job))
+
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(self.ir_bytes,)) as executor:
+            # map preserva a ordem dos jobs: resultado determinístico
+            return list(executor.map(_run_job, tasks, chunksize=chunksize))
+
+
+    def run_files(self, directory: str | os.PathLike[str],
+                  pattern: str = '*') -> list[RunResult]:
+        paths = sorted(p for p in Path(directory).glob(pattern) if p.is_file())
+        return self.run(paths)
@@ -0,0 +1,115 @@
+import json
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from itertools import pairwise
+from typing import Any, cast
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.ir import IR
+from dlc.inter.loops import LoopForest
+from dlc.inter.operand import Label
+
+
+class Profile:
+
+    def __init__(self, ir: IR,
+                 code: Mapping[BasicBlock, Sequence[Any]] | None = None) -> None:
+        self.ir = ir
+        # Instruções efetivamente despachadas por bloco (padrão: as da IR)
+        self.code: Mapping[BasicBlock, Sequence[Any]] = code if code is not None \
+            else {bb: list(bb) for bb in ir.bb_sequence}
+        # Contadores preenchidos pelo interpretador (por entrada em bloco)
+        self.block_counts: dict[BasicBlock, int] = {}
+        self.edge_counts: dict[tuple[BasicBlock, BasicBlock], int] = {}
+        # Bloco em que a execução parou por erro e quantas das suas
+        # instruções executaram (até a que falhou)
+        self.stopped: tuple[BasicBlock, int] | None = None
+        # Histograma estático de operadores de cada bloco: as execuções por
+        # operador saem de block_counts sem custo por instrução
+        self.__block_ops: dict[BasicBlock, Counter[Any]] = \
+            {bb: Counter(instr.op for instr in instrs)
+             for bb, instrs in self.code.items()}
+
+
+    @staticmethod
+    def label_of(bb: BasicBlock) -> str:
+        assert bb.label_instr is not None
+        return cast(Label, bb.label_instr.result).name
+
+
+    @property
+    def op_counts(self) -> dict[Any, int]:
+        counts: Counter[Any] = Counter()
+        for bb, n in self.block_counts.items():
+            for op, k in self.__block_ops.get(bb, Counter()).items():
+                counts[op] += n * k
+        if self.stopped is not None:
+            bb, executed = self.stopped
+            for instr in self.code.get(bb, [])[executed:]:
+                counts[instr.op] -= 1
+        return dict((+counts).most_common())
+
+
+    @property
+    def instr_count(self) -> int:
+        return sum(self.op_counts.values())
+
+
+    def op_pairs(self, n: int = 10) -> list[tuple[tuple[Any, Any], int]]:
+        # Pares de operadores adjacentes executados dentro de um bloco
+        # (candidatos a superinstruções)
+        counts: Counter[tuple[Any, Any]] = Counter()
+        for bb, k in self.block_counts.items():
+            instrs = self.code.get(bb, [])
+            for a, b in pairwise(instrs):
+                counts[(a.op, b.op)] += k
+        if self.stopped is not None:
+            bb, executed = self.stopped
+            tail = self.code.get(bb, [])[max(executed - 1, 0):]
+            for a, b in pairwise(tail):
+                counts[(a.op, b.op)] -= 1
+        return (+counts).most_common(n)
+
+
+    def top_blocks(self, n: int = 10) -> list[tuple[BasicBlock, int]]:
+        return sorted(self.block_counts.items(), key=lambda e: -e[1])[:n]
+
+
+    def hot_loops(self, n: int = 5) -> list[tuple[BasicBlock, set[BasicBlock], int]]:
+        # Laços naturais (cabeçalho, blocos, execuções do cabeçalho)
+        loops = LoopForest.of(self.ir).loops
+        hot = [(h, loop.blocks, self.block_counts.get(h, 0))
+               for h, loop in loops.items()]
+        hot.sort(key=lambda loop: -loop[2])
+        return hot[:n]
+
+
+    def to_dict(self) -> dict[str, Any]:
+        label = Profile.label_of
+        return {
+            'instructions': self.instr_count,
+            'blocks': {label(bb): n for bb, n in self.block_counts.items()},
+            'edges': {f'{label(a)}->{label(b)}': n
+                      for (a, b), n in self.edge_counts.items()},
+            'ops': {str(op.name): n for op, n in self.op_counts.items()},
+            'loops': [{'header': label(h),
+                       'blocks': sorted((label(bb) for bb in body),
+                                        key=lambda name: int(name[1:])),
+                       'count': count}
+                      for h, body, count in self.hot_loops(len(self.block_counts))],
+        }
+
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+    def report(self, n: int = 10) -> str:
+        lines = [f'{"Bloco":<8} | {"Label":<6} | {"Execuções":>10}']
+        lines.append('-' * 32)
+        for bb, count in self.top_blocks(n):
+            lines.append(f'{str(bb):<8} | {Profile.label_of(bb):<6} | {count:>10}')
+        for header, body, count in self.hot_loops():
+            lines.append(f'laço {Profile.label_of(header)}: {len(body)} blocos, '
+                         f'{count} execuções do cabeçalho')
+        return '\n'.join(lines)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.ir import IR
+from dlc.inter.operand import Operand, Temp
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.profiler import Profile
+from dlc.inter.ssa_operand import TempVersion
+
+
+class Snapshot:
+    # Estado de uma execução suspensa na entrada de um bloco (antes das PHIs),
+    # identificado apenas por nomes para poder ser retomado em outro processo
+    # sobre a mesma IR (por exemplo, a enviada pelo ParallelInterpreter)
+
+    def __init__(self, block: str, prev_block: str | None,
+                 values: dict[str, Operand.RUNTIME_TYPES | None],
+                 instr_count: int = 0) -> None:
+        self.block = block
+        self.prev_block = prev_block
+        self.values = values
+        self.instr_count = instr_count
+
+
+    @staticmethod
+    def capture(bb: BasicBlock, bb_prev: BasicBlock | None,
+                mem: dict[Operand, Operand.RUNTIME_TYPES | None],
+                instr_count: int) -> Snapshot:
+        values = {str(var): value for var, value in mem.items()
+                  if isinstance(var, (Temp, TempVersion))}
+        prev = Profile.label_of(bb_prev) if bb_prev else None
+        return Snapshot(Profile.label_of(bb), prev, values, instr_count)
+
+
+    def resolve(self, ir: IR) -> tuple[BasicBlock, BasicBlock | None,
+                                       dict[Operand, Operand.RUNTIME_TYPES | None]]:
+        blocks = {label.name: bb for label, bb in ir.label_bb_map.items()}
+        variables: dict[str, Operand] = {}
+        for instr in ir:
+            args = [instr.result, instr.arg1, instr.arg2]
+            if isinstance(instr, PhiInstr):
+                args.extend(instr.paths.values())
+            for arg in args:
+                if isinstance(arg, (Temp, TempVersion)):
+                    variables[str(arg)] = arg
+        try:
+            bb = blocks[self.block]
+            bb_prev = blocks[self.prev_block] if self.prev_block else None
+            mem = {variables[name]: value for name, value in self.values.items()
+                   if name in variables}
+        except KeyError as e:
+            raise RuntimeError(f'Snapshot incompatível com a IR: {e}') from e
+        return bb, bb_prev, mem
+
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'block': self.block,
+            'prev_block': self.prev_block,
+            'instr_count': self.instr_count,
+            'values': self.values,
+        }
+
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+    @staticmethod
+    def from_json(text: str) -> Snapshot:
+        data = json.loads(text)
+        return Snapshot(data['block'], data['prev_block'],
+                        data['values'], data['instr_count'])
+
+
+    def __repr__(self) -> str:
+        return (f'<Snapshot: {self.block} (from {self.prev_block}), '
+                f'{len(self.values)} values>')
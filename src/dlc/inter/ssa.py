@@ -1,95 +1,67 @@
 from dlc.inter.basic_block import BasicBlock
+from dlc.inter.dominators import Dominators
 from dlc.inter.ir import IR
-from dlc.inter.operand import Temp
+from dlc.inter.operand import Operand, Temp
 from dlc.inter.operator import Operator
 from dlc.inter.phi_instr import PhiInstr
 from dlc.inter.ssa_operand import TempVersion
 
 
 class SSA:
-    def __init__(self, ir: IR) -> None:
+    # Posicionamento das PHIs:
+    #   'minimal'      variáveis com mais de um ponto de definição, em toda a
+    #                  fronteira de dominância iterada
+    #   'semi-pruned'  só nomes globais (usados em algum bloco antes de serem
+    #                  definidos nele); nomes locais a um bloco não ganham PHI
+    #   'pruned'       só onde a variável está viva na entrada do bloco
+    MODES = ('minimal', 'semi-pruned', 'pruned')
+
+    def __init__(self, ir: IR, dom_algorithm: str = 'chk',
+                 mode: str = 'minimal') -> None:
+        if mode not in SSA.MODES:
+            raise RuntimeError(f'Modo de SSA desconhecido: {mode}')
         self.ir = ir
+        self.mode = mode
         # Replace ALLOCA/STORE
         self.__mem2reg()
-        # Dominators
-        self.dom: dict[BasicBlock, set[BasicBlock]]
-        self.__compute_dominators()
-        # Immediate dominators
-        self.idom: dict[BasicBlock, BasicBlock|None]
-        self.__compute_idom()
-        # Dominator Tree
-        self.dom_tree: dict[BasicBlock, list[BasicBlock]]
-        self.__build_dom_tree()
-        # Dominance Frontier
-        self.df: dict[BasicBlock, set[BasicBlock]]
-        self.__compute_dominance_frontier()
+        # Dominators (idom e árvore; conjuntos e fronteira sob demanda). Os
+        # passes que editam o CFG os mantêm atualizados
+        self.dominators = Dominators(ir.bb_entry, ir.bb_sequence, dom_algorithm)
+        self.idom: dict[BasicBlock, BasicBlock|None] = self.dominators.idom
+        self.dom_tree: dict[BasicBlock, list[BasicBlock]] = self.dominators.tree
         # Phi insertion
         self.phi_map: dict[BasicBlock, dict[Temp, PhiInstr]]
         self.__insert_phi()
         # Rename
         self.__rename()
-        self.__remove_trivial_phis()
+        # Nos modos podados toda PHI está viva: um caminho ausente significa
+        # valor indefinido naquela aresta, e a PHI é mantida
+        if mode == 'minimal':
+            self.__remove_trivial_phis()
 
 
     def __str__(self) -> str:
         return str(self.ir)
 
 
+    @property
+    def dom(self) -> dict[BasicBlock, set[BasicBlock]]:
+        return self.dominators.sets
+
+
+    @property
+    def df(self) -> dict[BasicBlock, set[BasicBlock]]:
+        return self.dominators.frontier()
+
+
     def __mem2reg(self) -> None: 
         for bb in self.ir.bb_sequence:
-            for instr in bb.body_instrs[:]:
+            for instr in bb.body_instrs:
                 if instr.op == Operator.ALLOCA:
-                    bb.body_instrs.remove(instr)
+                    bb.discard(instr)
                 elif instr.op in (Operator.STORE, Operator.LOAD):
                     instr.op = Operator.MOVE
-
-
-    def __compute_dominators(self) -> None:
-        self.dom = {self.ir.bb_entry: {self.ir.bb_entry}}
-        for bb in self.ir.bb_sequence[1:]:
-            self.dom[bb] = set(self.ir.bb_sequence)
-
-        changed = True
-        while changed:
-            changed = False
-            for bb in self.ir.bb_sequence[1:]:
-                new_dom = set(self.ir.bb_sequence)
-                for p in bb.predecessors:
-                    new_dom &= self.dom[p]
-                new_dom.add(bb)
-
-                if new_dom != self.dom[bb]:
-                    self.dom[bb] = new_dom
-                    changed = True
-    
-
-    def __compute_idom(self) -> None:
-        self.idom = {self.ir.bb_entry: None}
-        for bb in self.ir.bb_sequence[1:]:
-            strict_doms = self.dom[bb] - {bb}
-            # idom is the strict dominator that is not dominated by any other
-            for d in strict_doms:
-                if all(d == other or d not in self.dom[other] for other in strict_doms):
-                    self.idom[bb] = d
-                    break
-
-
-    def __build_dom_tree(self) -> None:
-        self.dom_tree = {bb: [] for bb in self.ir.bb_sequence}
-        for bb in self.ir.bb_sequence:
-            idom_bb = self.idom[bb]
-            if idom_bb is not None:
-                self.dom_tree[idom_bb].append(bb)
-
-    
-    def __compute_dominance_frontier(self) -> None:
-        self.df = {bb: set() for bb in self.ir.bb_sequence}
-        for bb in self.ir.bb_sequence:
-            if len(bb.predecessors) >= 2:
-                for runner in bb.predecessors:
-                    while runner is not None and runner != self.idom[bb]:
-                        self.df[runner].add(bb)
-                        runner = self.idom[runner]
+            bb.compact()
 
 
     def __insert_phi(self) -> None:
@@ -101,16 +73,27 @@ class SSA:
                 if isinstance(instr.result, Temp):
                     defsites.setdefault(instr.result, set()).add(bb)
 
-        # Ganha PHI qualquer variável com mais de um ponto de definição (defsite)
-        phi_vars = [v for v, sites in defsites.items() if len(sites) > 1]
+        live_in: dict[BasicBlock, set[Temp]] = {}
+        if self.mode == 'minimal':
+            # Ganha PHI qualquer variável com mais de um ponto de definição (defsite)
+            phi_vars = [v for v, sites in defsites.items() if len(sites) > 1]
+        else:
+            upward_exposed = self.__upward_exposed()
+            global_names = set().union(*upward_exposed.values())
+            phi_vars = [v for v in defsites if v in global_names]
+            if self.mode == 'pruned':
+                live_in = self.__live_in(upward_exposed)
 
         # Inserção iterada
         self.phi_map = {bb: {} for bb in self.ir.bb_sequence}
+        df = self.df
         for v in phi_vars:
             worklist = list(defsites[v])
             while worklist:
                 n = worklist.pop()
-                for y in self.df[n]:
+                for y in df[n]:
+                    if self.mode == 'pruned' and v not in live_in[y]:
+                        continue
                     if v not in self.phi_map[y]:
                         self.phi_map[y][v] = PhiInstr()
                         # Se y não era um local de definição, adicione ao worklist
@@ -118,6 +101,49 @@ class SSA:
                             worklist.append(y)
 
 
+    def __upward_exposed(self) -> dict[BasicBlock, set[Temp]]:
+        # Temporários lidos no bloco antes de qualquer definição nele
+        exposed: dict[BasicBlock, set[Temp]] = {}
+        for bb in self.ir.bb_sequence:
+            uses: set[Temp] = set()
+            defs: set[Temp] = set()
+            for instr in bb:
+                for arg in (instr.arg1, instr.arg2):
+                    if isinstance(arg, Temp) and arg not in defs:
+                        uses.add(arg)
+                if isinstance(instr.result, Temp):
+                    defs.add(instr.result)
+            exposed[bb] = uses
+        return exposed
+
+
+    def __live_in(self, upward_exposed: dict[BasicBlock, set[Temp]]) \
+            -> dict[BasicBlock, set[Temp]]:
+        # Vivacidade por lista de trabalho, percorrendo os blocos de trás
+        # para frente: IN = USE ∪ (OUT - DEF)
+        defs: dict[BasicBlock, set[Temp]] = {
+            bb: {instr.result for instr in bb.body_instrs
+                 if isinstance(instr.result, Temp)}
+            for bb in self.ir.bb_sequence}
+        live_in = {bb: set(uses) for bb, uses in upward_exposed.items()}
+        worklist = list(self.dominators.rpo)
+        pending = set(worklist)
+        while worklist:
+            bb = worklist.pop()
+            pending.discard(bb)
+            live_out: set[Temp] = set()
+            for succ in bb.successors:
+                live_out |= live_in[succ]
+            new_in = upward_exposed[bb] | (live_out - defs[bb])
+            if new_in != live_in[bb]:
+                live_in[bb] = new_in
+                for pred in bb.predecessors:
+                    if pred not in pending:
+                        pending.add(pred)
+                        worklist.append(pred)
+        return live_in
+
+
     def __rename(self) -> None:
         # Inicializa pilhas e contadores para cada variável
         self.stack: dict[Temp, list[TempVersion]] = {}
@@ -135,10 +161,22 @@ class SSA:
                 self.stack.setdefault(temp, [])
                 self.counter.setdefault(temp, 0)
 
-        self.__rename_block(self.ir.bb_entry)
-
-
-    def __rename_block(self, bb: BasicBlock) -> None:
+        # Percurso em profundidade da árvore de dominadores com pilha
+        # explícita: (bloco, None) renomeia o bloco; (bloco, definidos)
+        # desempilha as versões que ele criou, depois de todos os filhos
+        work: list[tuple[BasicBlock, list[Temp]|None]] = [(self.ir.bb_entry, None)]
+        while work:
+            bb, defined_here = work.pop()
+            if defined_here is not None:
+                for temp in reversed(defined_here):
+                    self.stack[temp].pop()
+                continue
+            work.append((bb, self.__rename_block(bb)))
+            for child in reversed(self.dom_tree.get(bb, [])):
+                work.append((child, None))
+
+
+    def __rename_block(self, bb: BasicBlock) -> list[Temp]:
         defined_here: list[Temp] = []
 
         # PHIs
@@ -173,21 +211,25 @@ class SSA:
                 if self.stack[temp]:
                     phi_instr.add_path(bb, self.stack[temp][-1])
 
-        # DFS
-        for child in self.dom_tree.get(bb, []):
-            self.__rename_block(child)
-
-        # POP
-        for temp in reversed(defined_here):
-            self.stack[temp].pop()
+        return defined_here
 
 
     def __remove_trivial_phis(self) -> None:
+        # PHIs de um só caminho saem quando ninguém usa o resultado; as
+        # usadas ficam (os outros caminhos têm valor indefinido), senão os
+        # usos apontariam para uma versão que não é definida
+        used: set[Operand] = set()
+        for instr in self.ir:
+            if isinstance(instr, PhiInstr):
+                used.update(instr.paths.values())
+            else:
+                used.update((instr.arg1, instr.arg2))
         for bb in self.ir.bb_sequence:
-            for phi_instr in bb.phi_instrs[:]:
+            for phi_instr in bb.phi_instrs:
                 assert( isinstance(phi_instr, PhiInstr))
-                if len(phi_instr.paths) == 1:
-                    bb.phi_instrs.remove(phi_instr)
+                if len(phi_instr.paths) == 1 and phi_instr.result not in used:
+                    bb.discard(phi_instr)
+            bb.compact()
 
 
 
@@ -1,27 +1,895 @@
+import math
+from collections.abc import Callable
 from typing import cast
 
 from dlc.inter.basic_block import BasicBlock
+from dlc.inter.instr import Instr
 from dlc.inter.interpreter import Interpreter
-from dlc.inter.operand import Const, Label, Operand
+from dlc.inter.loops import Loop, LoopForest, TripCount
+from dlc.inter.operand import Const, Label, Operand, Temp
 from dlc.inter.operator import Operator
+from dlc.inter.out_of_ssa import retarget
 from dlc.inter.phi_instr import PhiInstr
 from dlc.inter.ssa import SSA
 from dlc.inter.ssa_operand import TempVersion
+from dlc.inter.unroll import UnrollCost, unroll_loops
+from dlc.inter.verifier import verify_ssa
+from dlc.semantic.type import Type
 
 
 @staticmethod
-def optimize_ssa(ssa: SSA) -> None:
-    changed = True
+def optimize_ssa(ssa: SSA, verify: bool = False, level: int = 1,
+                 cost: UnrollCost | None = None) -> None:
+    # Com verify, a SSA passa pelo verificador barato após cada passe. O
+    # nível 2 desenrola os laços (limitados por cost) depois do primeiro
+    # ponto fixo e otimiza de novo as cópias
+    passes = (sparse_conditional_constant_propagation, algebraic_simplification,
+              jump_threading, global_value_numbering, loop_invariant_code_motion,
+              strength_reduction, copy_propagation, phi_simplification,
+              aggressive_dead_code_elimination, merge_blocks)
+    # A SSA recebida é conferida antes, para que um erro dela não seja
+    # atribuído ao primeiro passe
+    if verify:
+        _verify(ssa, 'Antes da otimização')
+    _fixpoint(ssa, passes, verify)
+    if level >= 2 and _run(ssa, lambda ssa: unroll_loops(ssa, cost),
+                           'unroll_loops', verify):
+        _fixpoint(ssa, passes, verify)
+
 
+def _fixpoint(ssa: SSA, passes: tuple[Callable[[SSA], bool], ...],
+              verify: bool) -> None:
+    changed = True
     while changed:
         changed = False
-        changed |= copy_propagation(ssa)
-        changed |= constant_folding(ssa)
-        changed |= branch_folding(ssa)
-        changed |= unreachable_code_elimination(ssa)
-        changed |= phi_simplification(ssa)
-        changed |= dead_code_elimination(ssa)
-        changed |= merge_blocks(ssa)
+        for opt in passes:
+            changed |= _run(ssa, opt, opt.__name__, verify)
+
+
+def _run(ssa: SSA, opt: Callable[[SSA], bool], name: str, verify: bool) -> bool:
+    changed = opt(ssa)
+    if verify:
+        _verify(ssa, f'Após {name}')
+    return changed
+
+
+def _verify(ssa: SSA, stage: str) -> None:
+    try:
+        verify_ssa(ssa)
+    except RuntimeError as e:
+        raise RuntimeError(f'{stage}: {e}') from e
+
+
+# Reticulado da propagação de constantes: TOP (ainda sem valor), um valor
+# constante ou BOTTOM (não constante)
+_TOP = object()
+_BOTTOM = object()
+
+
+def _meet(a: object, b: object) -> object:
+    if a is _TOP:
+        return b
+    if b is _TOP or a is b or (type(a) is type(b) and a == b):
+        return a
+    return _BOTTOM
+
+
+def _fits(value: object, type: Type) -> bool:
+    if isinstance(value, bool):
+        return type.is_boolean
+    if isinstance(value, int):
+        return type.is_integral
+    return type.is_float
+
+
+@staticmethod
+def sparse_conditional_constant_propagation(ssa: SSA) -> bool:
+    # SCCP (Wegman-Zadeck): uma lista de arestas do CFG que passam a ser
+    # executáveis e outra de usos SSA cujas definições mudaram de valor.
+    # PHIs só consideram os caminhos por arestas executáveis, então
+    # constantes atravessam laços e desvios que nunca são tomados. Ao
+    # final, usos de constantes são substituídos, definições viram MOVEs,
+    # IFs com um só lado executável viram GOTOs e blocos não executáveis
+    # saem da IR. A aritmética segue a do interpretador (inteiros de 32
+    # bits); divisões por zero ficam para a execução
+    ir = ssa.ir
+    uses: dict[Operand, list[tuple[Instr, BasicBlock]]] = {}
+    for bb in ir.bb_sequence:
+        for instr in bb:
+            args = cast(PhiInstr, instr).paths.values() if instr.op == Operator.PHI \
+                else (instr.arg1, instr.arg2)
+            for arg in args:
+                if isinstance(arg, TempVersion):
+                    uses.setdefault(arg, []).append((instr, bb))
+
+    values: dict[Operand, object] = {}
+    executable: set[BasicBlock] = set()
+    edges: set[tuple[BasicBlock | None, BasicBlock]] = set()
+    cfg_worklist: list[tuple[BasicBlock | None, BasicBlock]] = [(None, ir.bb_entry)]
+    ssa_worklist: list[tuple[Instr, BasicBlock]] = []
+
+    def lookup(arg: Operand) -> object:
+        if isinstance(arg, Const):
+            return arg.value
+        if isinstance(arg, TempVersion):
+            return values.get(arg, _TOP)
+        return _BOTTOM
+
+    def evaluate(instr: Instr, bb: BasicBlock) -> object:
+        op = instr.op
+        if op == Operator.PHI:
+            value: object = _TOP
+            for pred, arg in cast(PhiInstr, instr).paths.items():
+                if (pred, bb) in edges:
+                    value = _meet(value, lookup(arg))
+            return value
+        if op == Operator.MOVE:
+            return lookup(instr.arg1)
+        if op in Interpreter.OP_UNARY:
+            args = (lookup(instr.arg1),)
+        elif op in Interpreter.OP_BINARY:
+            args = (lookup(instr.arg1), lookup(instr.arg2))
+        else:
+            return _BOTTOM
+        if _BOTTOM in args:
+            return _BOTTOM
+        if _TOP in args:
+            return _TOP
+        try:
+            if op in Interpreter.OP_UNARY:
+                value = Interpreter.OP_UNARY[op](*args)  # type: ignore[arg-type]
+            else:
+                value = Interpreter.OP_BINARY[op](*args)  # type: ignore[arg-type]
+        except ZeroDivisionError:
+            return _BOTTOM
+        value = Interpreter.normalize(value)
+        assert isinstance(instr.result, TempVersion)
+        return value if _fits(value, instr.result.type) else _BOTTOM
+
+    def branch(bb: BasicBlock, label: Operand) -> None:
+        edge = (bb, ir.bb_from_label(cast(Label, label)))
+        if edge not in edges:
+            edges.add(edge)
+            cfg_worklist.append(edge)
+
+    def visit(instr: Instr, bb: BasicBlock) -> None:
+        if instr.op == Operator.GOTO:
+            branch(bb, instr.result)
+        elif instr.op == Operator.IF:
+            cond = lookup(instr.arg1)
+            if cond is _BOTTOM or cond:
+                branch(bb, instr.arg2)
+            if cond is _BOTTOM or not cond:
+                branch(bb, instr.result)
+        elif isinstance(instr.result, TempVersion):
+            # O valor só desce no reticulado: TOP, constante, BOTTOM
+            old = values.get(instr.result, _TOP)
+            new = _meet(old, evaluate(instr, bb))
+            if new is not old:
+                values[instr.result] = new
+                ssa_worklist.extend(uses.get(instr.result, []))
+
+    # 1. Propagação
+    while True:
+        while cfg_worklist or ssa_worklist:
+            while cfg_worklist:
+                _, bb = cfg_worklist.pop()
+                if bb in executable:
+                    for instr in bb.phi_instrs:
+                        visit(instr, bb)
+                else:
+                    executable.add(bb)
+                    for instr in bb:
+                        visit(instr, bb)
+            while ssa_worklist:
+                instr, bb = ssa_worklist.pop()
+                if bb in executable:
+                    visit(instr, bb)
+        # IFs sobre valores indefinidos (TOP até o fim) seguem os dois lados
+        for bb in executable:
+            instr = bb.goto_instr
+            if instr and instr.op == Operator.IF and lookup(instr.arg1) is _TOP:
+                branch(bb, instr.arg2)
+                branch(bb, instr.result)
+        if not cfg_worklist:
+            break
+
+    # 2. Reescrita das instruções
+    changed = False
+    for bb in ir.bb_sequence:
+        if bb not in executable:
+            continue
+        for instr in bb:
+            value = values.get(instr.result, _TOP)
+            if value is not _TOP and value is not _BOTTOM:
+                res = cast(TempVersion, instr.result)
+                if instr.op == Operator.MOVE and isinstance(instr.arg1, Const):
+                    continue
+                if instr.op == Operator.PHI:
+                    cast(PhiInstr, instr).paths.clear()
+                    bb.discard(instr)
+                    bb.prepend(instr)
+                instr.op = Operator.MOVE
+                instr.arg1 = Const(res.type, cast(Operand.RUNTIME_TYPES, value))
+                instr.arg2 = Operand.EMPTY
+                changed = True
+                continue
+            if instr.op == Operator.PHI:
+                continue
+            for attr in ('arg1', 'arg2'):
+                arg = getattr(instr, attr)
+                value = values.get(arg, _TOP)
+                if value is not _TOP and value is not _BOTTOM:
+                    value = cast(Operand.RUNTIME_TYPES, value)
+                    setattr(instr, attr, Const(arg.type, value))
+                    changed = True
+        bb.compact()
+
+    # 3. Arestas e blocos não executáveis
+    cfg_changed = False
+    for bb in ir.bb_sequence:
+        instr = bb.goto_instr
+        if bb not in executable or not instr or instr.op != Operator.IF:
+            continue
+        for keep_label, dead_label in ((instr.arg2, instr.result),
+                                       (instr.result, instr.arg2)):
+            bb_dead = ir.bb_from_label(cast(Label, dead_label))
+            if (bb, bb_dead) not in edges:
+                bb_dead.predecessors.remove(bb)
+                bb.successors.remove(bb_dead)
+                for phi in bb_dead.phi_instrs:
+                    cast(PhiInstr, phi).paths.pop(bb, None)
+                instr.op = Operator.GOTO
+                instr.arg1 = Operand.EMPTY
+                instr.arg2 = Operand.EMPTY
+                instr.result = keep_label
+                cfg_changed = True
+                break
+    live: list[BasicBlock] = []
+    for bb in ir.bb_sequence:
+        if bb in executable:
+            live.append(bb)
+            continue
+        for succ in bb.successors:
+            succ.predecessors.remove(bb)
+            for phi in succ.phi_instrs:
+                cast(PhiInstr, phi).paths.pop(bb, None)
+        cfg_changed = True
+    if cfg_changed:
+        # Arestas removidas em lote: um único recálculo dos dominadores
+        ir.bb_sequence = live
+        ssa.dominators.rebuild(live)
+        ir.invalidate_cfg()
+    return changed or cfg_changed
+
+
+
+
+# Operações em que a ordem dos operandos não importa, e comparações que
+# se equivalem com os operandos trocados
+_COMMUTATIVE = {Operator.SUM, Operator.MUL, Operator.EQ, Operator.NE}
+_MIRRORED = {Operator.GT: Operator.LT, Operator.GE: Operator.LE}
+
+
+@staticmethod
+def global_value_numbering(ssa: SSA) -> bool:
+    # Numeração de valores com escopo na árvore de dominadores: cada
+    # expressão (op, arg1, arg2, tipo) vista em um bloco vale nos blocos que
+    # ele domina, onde uma repetição passa a usar o resultado já calculado.
+    # PHIs cujos caminhos trazem todos o mesmo valor são esse valor, e PHIs
+    # do mesmo bloco com os mesmos caminhos são a mesma PHI. Cópias entre
+    # versões somem, com seus usos passando para a origem
+    leader: dict[Operand, Operand] = {}
+    table: dict[tuple[object, ...], Operand] = {}
+    changed = False
+
+    def number(arg: Operand) -> object:
+        if isinstance(arg, Const):
+            return ('const', arg.type.name, repr(arg.value))
+        return leader.get(arg, arg)
+
+    def key(instr: Instr) -> tuple[object, ...] | None:
+        op = instr.op
+        res = instr.result
+        if not isinstance(res, TempVersion) or \
+                op not in Interpreter.OP_UNARY and op not in Interpreter.OP_BINARY:
+            return None
+        arg1, arg2 = number(instr.arg1), number(instr.arg2)
+        if op in _MIRRORED:
+            op, arg1, arg2 = _MIRRORED[op], arg2, arg1
+        if op in _COMMUTATIVE and str(arg1) > str(arg2):
+            arg1, arg2 = arg2, arg1
+        return (op, arg1, arg2, res.type)
+
+    def phi_key(instr: Instr, bb: BasicBlock) -> tuple[object, ...] | Operand | None:
+        paths = cast(PhiInstr, instr).paths
+        if len(paths) != len(bb.predecessors):
+            return None
+        values = {number(v) for v in paths.values()} - {instr.result}
+        if len(values) == 1:
+            return cast(Operand, values.pop())
+        return (bb,) + tuple(number(paths[p]) for p in bb.predecessors)
+
+    # 1. Árvore de dominadores em pré-ordem; ao sair de um bloco, as
+    # expressões que ele acrescentou saem da tabela
+    tree = ssa.dominators.tree
+    stack: list[tuple[BasicBlock, list[tuple[object, ...]] | None]] = \
+        [(ssa.ir.bb_entry, None)]
+    while stack:
+        bb, added = stack.pop()
+        if added is not None:
+            for k in added:
+                del table[k]
+            continue
+        added = []
+        stack.append((bb, added))
+        for instr in bb.phi_instrs:
+            k = phi_key(instr, bb)
+            if isinstance(k, Operand):
+                leader[instr.result] = k
+            elif k is not None and k in table:
+                leader[instr.result] = table[k]
+            elif k is not None:
+                table[k] = instr.result
+                added.append(k)
+            else:
+                continue
+            if instr.result in leader:
+                bb.discard(instr)
+                changed = True
+        for instr in bb.body_instrs + ([bb.goto_instr] if bb.goto_instr else []):
+            for attr in ('arg1', 'arg2'):
+                arg = getattr(instr, attr)
+                if arg in leader:
+                    setattr(instr, attr, leader[arg])
+                    changed = True
+            # Cópias têm o número da origem
+            if instr.op == Operator.MOVE and isinstance(instr.arg1, TempVersion) and \
+                    isinstance(instr.result, TempVersion):
+                leader[instr.result] = instr.arg1
+                bb.discard(instr)
+                changed = True
+                continue
+            k = key(instr)
+            if k is None:
+                continue
+            if k in table:
+                leader[instr.result] = table[k]
+                bb.discard(instr)
+                changed = True
+            else:
+                table[k] = instr.result
+                added.append(k)
+        bb.compact()
+        stack.extend((child, None) for child in reversed(tree[bb]))
+
+    # 2. Caminhos das PHIs (arestas de retorno trazem valores de blocos
+    # visitados depois)
+    if leader:
+        def find(arg: Operand) -> Operand:
+            while arg in leader:
+                arg = leader[arg]
+            return arg
+        for bb in ssa.ir.bb_sequence:
+            for instr in bb.phi_instrs:
+                paths = cast(PhiInstr, instr).paths
+                for pred, value in paths.items():
+                    paths[pred] = find(value)
+            for instr in bb.body_instrs + ([bb.goto_instr] if bb.goto_instr else []):
+                for attr in ('arg1', 'arg2'):
+                    arg = getattr(instr, attr)
+                    if arg in leader:
+                        setattr(instr, attr, find(arg))
+    return changed
+
+
+
+
+# Operações que podem interromper a execução (divisão por zero)
+_TRAPPING = {Operator.DIV, Operator.MOD, Operator.POW}
+
+
+def _insert_preheader(ssa: SSA, loop: Loop) -> BasicBlock:
+    # Bloco novo entre os predecessores externos e o cabeçalho; os caminhos
+    # externos das PHIs do cabeçalho passam a vir dele (juntados em uma PHI
+    # no pré-cabeçalho se houver mais de um predecessor externo)
+    header = loop.header
+    assert header.label_instr is not None
+    EMPTY = Operand.EMPTY
+    outside = [p for p in header.predecessors if p not in loop.blocks]
+    label = Label()
+    pre = ssa.ir.label_bb_map[label]
+    pre.label_instr = Instr(Operator.LABEL, EMPTY, EMPTY, label)
+    pre.goto_instr = Instr(Operator.GOTO, EMPTY, EMPTY, header.label_instr.result)
+    pre.successors = [header]
+    pre.predecessors = outside
+    for pred in outside:
+        retarget(pred, header, pre)
+    header.predecessors = [p for p in header.predecessors if p in loop.blocks] + [pre]
+    for instr in header.phi_instrs:
+        phi = cast(PhiInstr, instr)
+        incoming = {p: phi.paths.pop(p) for p in outside if p in phi.paths}
+        if len(set(incoming.values())) == 1:
+            phi.paths[pre] = incoming.popitem()[1]
+        elif incoming:
+            merge = PhiInstr()
+            merge.result = TempVersion(Temp(cast(TempVersion, phi.result).type), 1)
+            merge.paths = incoming
+            pre.phi_instrs.append(merge)
+            phi.paths[pre] = merge.result
+    sequence = ssa.ir.bb_sequence
+    sequence.insert(sequence.index(header), pre)
+    return pre
+
+
+def _is_invariant(arg: Operand, loop: Loop, invariant: set[Operand],
+                  def_block: dict[Operand, BasicBlock]) -> bool:
+    # Constante, versão definida fora do laço ou já marcada como invariante
+    if isinstance(arg, TempVersion):
+        return arg in invariant or def_block.get(arg) not in loop.blocks
+    return not isinstance(arg, Temp)
+
+
+def _is_safe_to_hoist(instr: Instr, loop: Loop, bb: BasicBlock, k: int) -> bool:
+    # instr é a k-ésima instrução do corpo de bb
+    if instr.op not in _TRAPPING:
+        return True
+    arg2 = instr.arg2
+    if isinstance(arg2, Const):
+        if instr.op == Operator.POW:
+            if arg2.value >= 0:
+                return True
+        # Em inteiro, INT_MIN / -1 (e % -1) também interrompe o idiv
+        elif arg2.value != 0 and (arg2.type.is_float or arg2.value != -1):
+            return True
+    return bb is loop.header and not any(
+        i.op in (Operator.PRINT, Operator.READ) for i in bb.body_instrs[:k])
+
+
+@staticmethod
+def loop_invariant_code_motion(ssa: SSA) -> bool:
+    # Instruções sem efeitos colaterais cujos operandos não mudam no laço
+    # vão para o pré-cabeçalho (criado se preciso), dos laços internos para
+    # os externos. As que podem interromper a execução (DIV, MOD, POW) só
+    # saem se o divisor/expoente for uma constante segura ou se estiverem
+    # no cabeçalho antes de qualquer E/S: o cabeçalho de um enquanto
+    # executa sempre que o laço é alcançado
+    ir = ssa.ir
+    forest = LoopForest.of(ir)
+    def_block: dict[Operand, BasicBlock] = {}
+    for bb in ir.bb_sequence:
+        for instr in bb:
+            if isinstance(instr.result, TempVersion):
+                def_block[instr.result] = bb
+    changed = created = False
+
+    for loop in sorted(forest.loops.values(), key=lambda loop: -loop.depth):
+        if all(p in loop.blocks for p in loop.header.predecessors):
+            continue
+        invariant: set[Operand] = set()
+        blocks = [bb for bb in ir.bb_sequence if bb in loop.blocks]
+        hoisted: list[Instr] = []
+        found = True
+        while found:
+            found = False
+            for bb in blocks:
+                for k, instr in enumerate(bb.body_instrs):
+                    op = instr.op
+                    if instr.result in invariant or \
+                            op != Operator.MOVE and op not in Interpreter.OP_UNARY \
+                            and op not in Interpreter.OP_BINARY:
+                        continue
+                    if _is_invariant(instr.arg1, loop, invariant, def_block) and \
+                            _is_invariant(instr.arg2, loop, invariant, def_block) and \
+                            _is_safe_to_hoist(instr, loop, bb, k):
+                        invariant.add(instr.result)
+                        hoisted.append(instr)
+                        bb.discard(instr)
+                        found = True
+        if not hoisted:
+            continue
+
+        pre = loop.preheader
+        if pre is None:
+            pre = _insert_preheader(ssa, loop)
+            created = True
+            parent = loop.parent
+            while parent is not None:
+                parent.blocks.add(pre)
+                parent = parent.parent
+        for bb in blocks:
+            bb.compact()
+        pre.body_instrs.extend(hoisted)
+        for instr in hoisted:
+            def_block[instr.result] = pre
+        changed = True
+
+    if created:
+        ssa.dominators.rebuild(ir.bb_sequence)
+        ir.invalidate_cfg()
+    return changed
+
+
+
+
+@staticmethod
+def strength_reduction(ssa: SSA) -> bool:
+    # Redução de força sobre as variáveis de indução básicas (inteiras) de
+    # cada laço com pré-cabeçalho e uma única aresta de retorno:
+    #   t = i * k  (k invariante)  vira uma PHI r, com r = init * k na entrada
+    #                              e r + step * k ao voltar
+    #   t = i ^ 2  e  t = i * i    viram r, com r = init² na entrada e
+    #                              r + 2 * step * i + step² ao voltar (a
+    #                              multiplicação que sobra é reduzida na
+    #                              rodada seguinte)
+    # Com número de iterações conhecido e sem estouro de 32 bits, o teste de
+    # saída i <op> n passa a ser r <op> n * k (k > 0), e i morre se só
+    # servia ao próprio incremento
+    ir = ssa.ir
+    forest = LoopForest(ir, ssa.dominators)
+    ir.analyses['loops'] = forest
+    def_block: dict[Operand, BasicBlock] = {}
+    for bb in ir.bb_sequence:
+        for instr in bb:
+            if isinstance(instr.result, TempVersion):
+                def_block[instr.result] = bb
+    changed = False
+
+    def new_temp() -> TempVersion:
+        return TempVersion(Temp(Type.INT), 1)
+
+    for loop in forest.loops.values():
+        pre = loop.preheader
+        if pre is None or len(loop.latches) != 1:
+            continue
+        latch = loop.latches[0]
+        ivs = {iv: ind for iv, ind in loop.ivs.items()
+               if iv.type == Type.INT and isinstance(ind.init, (Const, TempVersion))}
+        reduced: dict[TempVersion, tuple[int, TempVersion]] = {}
+
+        # 1. Multiplicações por recorrências aditivas
+        for bb in [bb for bb in ir.bb_sequence if bb in loop.blocks]:
+            for instr in bb.body_instrs:
+                op, arg1, arg2 = instr.op, instr.arg1, instr.arg2
+                if op == Operator.POW and isinstance(arg2, Const) and arg2.value == 2:
+                    op, arg2 = Operator.MUL, arg1
+                if op != Operator.MUL:
+                    continue
+                if arg2 in ivs and arg1 not in ivs:
+                    arg1, arg2 = arg2, arg1
+                ind = ivs.get(cast(TempVersion, arg1))
+                if ind is None or arg2 is not arg1 and \
+                        not _is_invariant(arg2, loop, set(), def_block):
+                    continue
+                step = cast(int, ind.step.value)
+                r, r0, r_next = new_temp(), new_temp(), new_temp()
+                if arg2 is arg1:
+                    # (i + s)² = i² + 2si + s²
+                    u, v = new_temp(), new_temp()
+                    pre.body_instrs.append(Instr(Operator.MUL, ind.init, ind.init, r0))
+                    normalize = Interpreter.normalize
+                    twice = Const(Type.INT, normalize(2 * step))
+                    square = Const(Type.INT, normalize(step * step))
+                    latch.body_instrs += [Instr(Operator.MUL, ind.iv, twice, u),
+                                          Instr(Operator.SUM, u, square, v),
+                                          Instr(Operator.SUM, r, v, r_next)]
+                else:
+                    sk = new_temp()
+                    pre.body_instrs += [Instr(Operator.MUL, ind.init, arg2, r0),
+                                        Instr(Operator.MUL, ind.step, arg2, sk)]
+                    latch.body_instrs.append(Instr(Operator.SUM, r, sk, r_next))
+                    if isinstance(arg2, Const) and arg2.value > 0 and \
+                            ind.iv not in reduced:
+                        reduced[ind.iv] = (cast(int, arg2.value), r)
+                phi = PhiInstr()
+                phi.result = r
+                phi.paths = {pre: r0, latch: r_next}
+                loop.header.phi_instrs.append(phi)
+                instr.op = Operator.MOVE
+                instr.arg1 = r
+                instr.arg2 = Operand.EMPTY
+                changed = True
+
+        # 2. Substituição do teste de saída
+        trip = loop.trip_count
+        if trip is None or trip.compare is None or trip.count is None or \
+                trip.iv not in reduced:
+            continue
+        compare = trip.compare
+        k, r = reduced[trip.iv]
+        init = cast(int, cast(Const, trip.init).value)
+        bound = cast(int, cast(Const, trip.bound).value)
+        last = init + trip.count * cast(int, cast(Const, trip.step).value)
+        if not all(Type.MIN_INT <= value <= Type.MAX_INT
+                   for value in (init * k, last * k, bound * k, last)):
+            continue
+        args = (compare.arg1, compare.arg2)
+        if trip.iv not in args or trip.bound not in args:
+            continue
+        iv_attr, bound_attr = ('arg1', 'arg2') if compare.arg1 is trip.iv \
+            else ('arg2', 'arg1')
+        setattr(compare, iv_attr, r)
+        setattr(compare, bound_attr, Const(Type.INT, bound * k))
+
+        # i morre se os únicos usos que restaram são o incremento e a PHI
+        ind = ivs[trip.iv]
+        uses = {instr for bb in ir.bb_sequence for instr in bb
+                if any(arg is ind.iv or arg is ind.next for arg in
+                       (cast(PhiInstr, instr).paths.values() if instr.op == Operator.PHI
+                        else (instr.arg1, instr.arg2)))}
+        if uses == {ind.increment, ind.phi}:
+            increment_bb = def_block[ind.next]
+            loop.header.discard(ind.phi)
+            increment_bb.discard(ind.increment)
+            loop.header.compact()
+            increment_bb.compact()
+    return changed
+
+
+
+
+# Simplificação algébrica: regras por operador que recebem a instrução e as
+# definições das versões e devolvem uma instrução equivalente (com o mesmo
+# resultado) ou None. Em REAL só entram as identidades exatas em IEEE 754:
+# x + 0, x - (-0.0), x * 0, x - x e x == x mudam com -0.0, NaN ou infinito, e
+# negações ficam de fora porque o backend só nega inteiros
+_Defs = dict[Operand, Instr]
+
+
+def _is(arg: Operand, value: int) -> bool:
+    # Constante numérica (verdade e falso não contam como 1 e 0)
+    return isinstance(arg, Const) and not isinstance(arg.value, bool) and \
+        arg.value == value
+
+
+def _exact(arg: Operand) -> bool:
+    return not cast(Const | TempVersion, arg).type.is_float
+
+
+def _move(instr: Instr, arg: Operand) -> Instr:
+    return Instr(Operator.MOVE, arg, Operand.EMPTY, instr.result)
+
+
+def _constant(instr: Instr, value: Operand.RUNTIME_TYPES) -> Instr:
+    type = cast(TempVersion, instr.result).type
+    return _move(instr, Const(type, float(value) if type.is_float else value))
+
+
+def _sum_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    a, b = instr.arg1, instr.arg2
+    if _exact(a):
+        if _is(b, 0):
+            return _move(instr, a)
+        if _is(a, 0):
+            return _move(instr, b)
+    return None
+
+
+def _sub_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    a, b = instr.arg1, instr.arg2
+    # x - (-0.0) é x + 0.0, que leva -0.0 a 0.0
+    if _is(b, 0) and math.copysign(1.0, cast(Const, b).value) > 0:
+        return _move(instr, a)
+    if _exact(a):
+        if a is b:
+            return _constant(instr, 0)
+        if _is(a, 0):
+            return Instr(Operator.MINUS, b, Operand.EMPTY, instr.result)
+    return None
+
+
+def _mul_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    for x, k in ((instr.arg1, instr.arg2), (instr.arg2, instr.arg1)):
+        if _is(k, 1):
+            return _move(instr, x)
+        if _exact(x):
+            if _is(k, 0):
+                return _constant(instr, 0)
+            if _is(k, -1):
+                return Instr(Operator.MINUS, x, Operand.EMPTY, instr.result)
+    return None
+
+
+def _div_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    a, b = instr.arg1, instr.arg2
+    if _is(b, 1):
+        return _move(instr, a)
+    if _is(b, -1) and _exact(a):
+        return Instr(Operator.MINUS, a, Operand.EMPTY, instr.result)
+    return None
+
+
+def _mod_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    if _exact(instr.arg1) and (_is(instr.arg2, 1) or _is(instr.arg2, -1)):
+        return _constant(instr, 0)
+    return None
+
+
+def _pow_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    a, b = instr.arg1, instr.arg2
+    if _is(b, 0):
+        return _constant(instr, 1)
+    if _is(b, 1):
+        return _move(instr, a)
+    if _is(b, 2):
+        return Instr(Operator.MUL, a, a, instr.result)
+    return None
+
+
+def _equality_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    # b == verdade é b, b == falso é !b (e o contrário para !=)
+    a, b = instr.arg1, instr.arg2
+    same = instr.op == Operator.EQ
+    for x, k in ((a, b), (b, a)):
+        if isinstance(k, Const) and isinstance(k.value, bool) and \
+                not isinstance(x, Const):
+            if k.value == same:
+                return _move(instr, x)
+            return Instr(Operator.NOT, x, Operand.EMPTY, instr.result)
+    if a is b and _exact(a):
+        return _constant(instr, same)
+    return None
+
+
+def _order_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    if instr.arg1 is instr.arg2 and _exact(instr.arg1):
+        return _constant(instr, instr.op in (Operator.LE, Operator.GE))
+    return None
+
+
+def _not_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    # !!b é b; a negação de uma comparação exata é a comparação inversa
+    d = defs.get(instr.arg1)
+    if d is None:
+        return None
+    if d.op == Operator.NOT:
+        return _move(instr, d.arg1)
+    if d.op in TripCount.INVERSE and _exact(d.arg1):
+        return Instr(TripCount.INVERSE[d.op], d.arg1, d.arg2, instr.result)
+    return None
+
+
+def _minus_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    d = defs.get(instr.arg1)
+    if d is not None and d.op == Operator.MINUS:
+        return _move(instr, d.arg1)
+    return None
+
+
+def _plus_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    return _move(instr, instr.arg1)
+
+
+def _if_rule(instr: Instr, defs: _Defs) -> Instr | None:
+    # if !b goto A else goto B é if b goto B else goto A
+    d = defs.get(instr.arg1)
+    if d is not None and d.op == Operator.NOT:
+        return Instr(Operator.IF, d.arg1, instr.result, instr.arg2)
+    return None
+
+
+_RULES = {
+    Operator.SUM: _sum_rule, Operator.SUB: _sub_rule, Operator.MUL: _mul_rule,
+    Operator.DIV: _div_rule, Operator.MOD: _mod_rule, Operator.POW: _pow_rule,
+    Operator.EQ: _equality_rule, Operator.NE: _equality_rule,
+    Operator.LT: _order_rule, Operator.LE: _order_rule,
+    Operator.GT: _order_rule, Operator.GE: _order_rule,
+    Operator.NOT: _not_rule, Operator.MINUS: _minus_rule, Operator.PLUS: _plus_rule,
+    Operator.IF: _if_rule,
+}
+
+
+@staticmethod
+def algebraic_simplification(ssa: SSA) -> bool:
+    # Uma varredura; as regras que olham a definição de um argumento veem a
+    # instrução já reescrita, que calcula o mesmo valor
+    changed = False
+    defs: _Defs = {instr.result: instr for bb in ssa.ir.bb_sequence for instr in bb
+                   if isinstance(instr.result, TempVersion)}
+    for bb in ssa.ir.bb_sequence:
+        for instr in bb:
+            rule = _RULES.get(instr.op)
+            new = rule(instr, defs) if rule is not None else None
+            if new is not None:
+                instr.op, instr.arg1, instr.arg2, instr.result = \
+                    new.op, new.arg1, new.arg2, new.result
+                changed = True
+    return changed
+
+
+
+
+@staticmethod
+def jump_threading(ssa: SSA) -> bool:
+    # Arestas cujo destino já se sabe são redirecionadas ao bloco final:
+    #   desvio sobre PHI   J só tem a PHI c e if c; de um predecessor em que
+    #                      c é constante, o desvio vai direto ao lado que J
+    #                      tomaria. É a junção do & e do |, que atribuem
+    #                      verdade ou falso de cada lado e desviam pelo valor
+    #   bloco vazio        J só tem o GOTO; os predecessores vão direto ao
+    #                      destino
+    # Nos dois casos J não define nada além de c, que só o IF e as PHIs dos
+    # destinos usam, então os destinos continuam dominados pelas definições
+    # que usam. Arestas de retorno ficam como estão, para não criar laços
+    # irredutíveis; J sem predecessores sai
+    ir = ssa.ir
+    dominates = ssa.dominators.dominates
+    defs: dict[Operand, Instr] = {}
+    uses: dict[Operand, list[Instr]] = {}
+    for bb in ir.bb_sequence:
+        for instr in bb:
+            if isinstance(instr.result, TempVersion):
+                defs[instr.result] = instr
+            args = cast(PhiInstr, instr).paths.values() if instr.op == Operator.PHI \
+                else (instr.arg1, instr.arg2)
+            for arg in args:
+                uses.setdefault(arg, []).append(instr)
+
+    changed = False
+    removed: set[BasicBlock] = set()
+    for join in ir.bb_sequence:
+        branch = join.goto_instr
+        if join is ir.bb_entry or branch is None or join.body_instrs:
+            continue
+        cond: Operand | None = None
+        if branch.op == Operator.GOTO and not join.phi_instrs:
+            target = ir.bb_from_label(cast(Label, branch.result))
+            targets = dict.fromkeys(join.predecessors, target)
+        elif branch.op == Operator.IF and len(join.phi_instrs) == 1 and \
+                join.phi_instrs[0].result is branch.arg1:
+            phi = cast(PhiInstr, join.phi_instrs[0])
+            cond = phi.result
+            on_true = ir.bb_from_label(cast(Label, branch.arg2))
+            on_false = ir.bb_from_label(cast(Label, branch.result))
+            if any(use is not branch and use not in on_true.phi_instrs and
+                   use not in on_false.phi_instrs for use in uses.get(cond, [])):
+                continue
+            targets = {}
+            for pred, value in phi.paths.items():
+                known = _known_constant(value, defs)
+                if known is not None:
+                    targets[pred] = on_true if known.value else on_false
+        else:
+            continue
+
+        for pred, target in targets.items():
+            if target is join or target in pred.successors or dominates(join, pred):
+                continue
+            retarget(pred, join, target)
+            join.predecessors.remove(pred)
+            target.predecessors.append(pred)
+            for instr in target.phi_instrs:
+                # Sem caminho de J, o valor também fica indefinido pelo novo
+                paths = cast(PhiInstr, instr).paths
+                if join in paths:
+                    value = paths[join]
+                    paths[pred] = cast(PhiInstr, join.phi_instrs[0]).paths[pred] \
+                        if value is cond else value
+            for instr in join.phi_instrs:
+                del cast(PhiInstr, instr).paths[pred]
+            changed = True
+        if not join.predecessors:
+            removed.add(join)
+            for succ in join.successors:
+                succ.predecessors.remove(join)
+                for instr in succ.phi_instrs:
+                    cast(PhiInstr, instr).paths.pop(join, None)
+    if changed:
+        ir.bb_sequence = [bb for bb in ir.bb_sequence if bb not in removed]
+        ssa.dominators.rebuild(ir.bb_sequence)
+        ir.invalidate_cfg()
+    return changed
+
+
+def _known_constant(value: Operand, defs: dict[Operand, Instr]) -> Const | None:
+    if isinstance(value, Const):
+        return value
+    d = defs.get(value)
+    if d is not None and d.op == Operator.MOVE and isinstance(d.arg1, Const):
+        return d.arg1
+    return None
+
+
 
 
 @staticmethod
@@ -65,12 +933,17 @@ def constant_folding(ssa: SSA) -> bool:
             arg1 = instr.arg1
             arg2 = instr.arg2
             if isinstance(arg1, Const):
-                if op in Interpreter.OP_UNARY:
-                    value = Interpreter.OP_UNARY[op](arg1.value)
-                elif isinstance(arg2, Const):
-                    value = Interpreter.OP_BINARY[op](arg1.value, arg2.value)
-                else:
+                try:
+                    if op in Interpreter.OP_UNARY:
+                        value = Interpreter.OP_UNARY[op](arg1.value)
+                    elif isinstance(arg2, Const):
+                        value = Interpreter.OP_BINARY[op](arg1.value, arg2.value)
+                    else:
+                        continue
+                except ZeroDivisionError:
+                    # Fica para a execução, que reporta o erro
                     continue
+                value = Interpreter.normalize(value)
 
                 assert(isinstance(instr.result, TempVersion))
                 instr.arg1 = Const(instr.result.type, value)
@@ -95,12 +968,17 @@ def branch_folding(ssa: SSA) -> bool:
             bb_dead = ssa.ir.bb_from_label(cast(Label, dead_label))
             bb_dead.predecessors.remove(bb)
             bb.successors.remove(bb_dead)
+            ssa.dominators.delete_edge(bb, bb_dead)
+            for phi in bb_dead.phi_instrs:
+                cast(PhiInstr, phi).paths.pop(bb, None)
             # Transforma o IF em um GOTO para o bloco correto
             instr.op = Operator.GOTO
             instr.arg1 = Operand.EMPTY
             instr.arg2 = Operand.EMPTY
             instr.result = keep_label
             changed = True
+    if changed:
+        ssa.ir.invalidate_cfg()
     return changed
 
 
@@ -132,8 +1010,13 @@ def unreachable_code_elimination(ssa: SSA) -> bool:
         else:
             for succ in bb.successors:
                 succ.predecessors.remove(bb)
+                for phi in succ.phi_instrs:
+                    cast(PhiInstr, phi).paths.pop(bb, None)
+            ssa.dominators.delete_block(bb)
             changed = True # Se o label não está na lista, o bloco morre
     ssa.ir.bb_sequence = new_bb_sequence
+    if changed:
+        ssa.ir.invalidate_cfg()
     return changed
 
 
@@ -142,20 +1025,27 @@ def unreachable_code_elimination(ssa: SSA) -> bool:
 @staticmethod
 def phi_simplification(ssa: SSA) -> bool:
     changed = False
+    live_blocks = set(ssa.ir.bb_sequence)
     for bb in ssa.ir.bb_sequence:
-        for instr in bb.phi_instrs[:]:
+        for instr in bb.phi_instrs:
             #Remove dos PHIs os BBs que não existem mais
             assert(isinstance(instr, PhiInstr))
             for path_bb in list(instr.paths):
-                if path_bb not in ssa.ir.bb_sequence:
+                if path_bb not in live_blocks:
                     changed = True
                     del instr.paths[path_bb]
-            #PHIs com valor único são transformados em MOVEs
+            #PHIs com valor único são transformados em MOVEs (com caminhos
+            #ausentes, só se o valor for constante: a definição poderia não
+            #dominar o bloco)
             if len(instr.paths) == 1:
+                value = list(instr.paths.values())[0]
+                if len(bb.predecessors) > 1 and not isinstance(value, Const):
+                    continue
                 instr.op = Operator.MOVE
-                instr.arg1 = list(instr.paths.values())[0]
-                bb.phi_instrs.remove(instr)
-                bb.body_instrs.insert(0, instr)
+                instr.arg1 = value
+                bb.discard(instr)
+                bb.prepend(instr)
+        bb.compact()
     return changed
 
 
@@ -186,25 +1076,125 @@ def dead_code_elimination(ssa: SSA) -> bool:
 
     # 2. Remoção
     for bb in ssa.ir.bb_sequence:
-        for instr in list(bb):
+        for instr in bb:
             res = instr.result
             if isinstance(res, TempVersion) and use_count.get(res, 0) == 0:
                 changed = True
-                if instr.op == Operator.PHI:
-                    bb.phi_instrs.remove(instr)
-                else:
-                    bb.body_instrs.remove(instr)
+                bb.discard(instr)
+        bb.compact()
+    return changed
+
+
+
+
+@staticmethod
+def aggressive_dead_code_elimination(ssa: SSA) -> bool:
+    # Marcação e varredura: vivas são as instruções com efeito (PRINT, READ,
+    # desvios) e, para trás, as definições de seus argumentos e dos caminhos
+    # das PHIs vivas. Ciclos de PHIs que só alimentam uns aos outros morrem
+    # de uma vez. Desvios que só levam a blocos vazios até a mesma junção
+    # viram GOTO, e suas condições morrem na varredura seguinte
+    changed = _sweep(ssa)
+    while _remove_empty_branches(ssa):
+        changed = True
+        _sweep(ssa)
     return changed
 
 
+def _sweep(ssa: SSA) -> bool:
+    defs: dict[Operand, Instr] = {}
+    live: set[Instr] = set()
+    worklist: list[Instr] = []
+    for bb in ssa.ir.bb_sequence:
+        for instr in bb:
+            if isinstance(instr.result, TempVersion) and instr.op != Operator.READ:
+                defs[instr.result] = instr
+            else:
+                live.add(instr)
+                worklist.append(instr)
+    while worklist:
+        instr = worklist.pop()
+        args = cast(PhiInstr, instr).paths.values() if instr.op == Operator.PHI \
+            else (instr.arg1, instr.arg2)
+        for arg in args:
+            d = defs.get(arg)
+            if d is not None and d not in live:
+                live.add(d)
+                worklist.append(d)
+
+    changed = False
+    for bb in ssa.ir.bb_sequence:
+        for instr in bb:
+            if instr not in live:
+                bb.discard(instr)
+                changed = True
+        bb.compact()
+    return changed
+
+
+def _remove_empty_branches(ssa: SSA) -> bool:
+    # IF cujos dois lados chegam à mesma junção J, cada um direto ou por um
+    # bloco vazio (só o GOTO) exclusivo do desvio, com os mesmos valores
+    # nas PHIs de J: o desvio vira GOTO J e os blocos vazios saem
+    ir = ssa.ir
+    changed = False
+    removed: set[BasicBlock] = set()
+    for bb in ir.bb_sequence:
+        branch = bb.goto_instr
+        if bb in removed or branch is None or branch.op != Operator.IF:
+            continue
+        sides: list[tuple[BasicBlock, BasicBlock]] = []
+        for label in (branch.arg2, branch.result):
+            arm = ir.bb_from_label(cast(Label, label))
+            goto = arm.goto_instr
+            if not arm.phi_instrs and not arm.body_instrs and arm.predecessors == [bb] \
+                    and goto is not None and goto.op == Operator.GOTO:
+                sides.append((arm, ir.bb_from_label(cast(Label, goto.result))))
+            else:
+                sides.append((bb, arm))
+        (pred1, join), (pred2, join2) = sides
+        if join is not join2 or any(not _same_value(cast(PhiInstr, phi).paths[pred1],
+                                                    cast(PhiInstr, phi).paths[pred2])
+                                    for phi in join.phi_instrs):
+            continue
+        assert join.label_instr is not None
+        values = [cast(PhiInstr, phi).paths[pred1] for phi in join.phi_instrs]
+        for arm in {pred1, pred2} - {bb}:
+            removed.add(arm)
+            join.predecessors.remove(arm)
+            for phi in join.phi_instrs:
+                del cast(PhiInstr, phi).paths[arm]
+        if bb not in join.predecessors:
+            join.predecessors.append(bb)
+        for phi, value in zip(join.phi_instrs, values, strict=True):
+            cast(PhiInstr, phi).paths[bb] = value
+        bb.successors = [join]
+        bb.goto_instr = Instr(Operator.GOTO, Operand.EMPTY, Operand.EMPTY,
+                              join.label_instr.result)
+        changed = True
+    if not changed:
+        return False
+    ir.bb_sequence = [bb for bb in ir.bb_sequence if bb not in removed]
+    ssa.dominators.rebuild(ir.bb_sequence)
+    ir.invalidate_cfg()
+    return True
+
+
+def _same_value(a: Operand, b: Operand) -> bool:
+    return a is b or (isinstance(a, Const) and isinstance(b, Const) and
+                      a.type == b.type and a.value == b.value)
+
+
 
 
 @staticmethod
 def merge_blocks(ssa: SSA) -> bool:
     changed = False
-    i = 0
-    while i < len(ssa.ir.bb_sequence):
-        bb = ssa.ir.bb_sequence[i]
+    merged: set[BasicBlock] = set()
+    final: BasicBlock | None = None
+    for bb in ssa.ir.bb_sequence:
+        if bb in merged:
+            continue
         if len(bb.successors) == 1:
             succ = bb.successors[0]
             if len(succ.predecessors) == 1 and succ != bb:
@@ -224,8 +1214,17 @@ def merge_blocks(ssa: SSA) -> bool:
                 for s in bb.successors:
                     s.predecessors = [bb if p == succ else p for p in s.predecessors]
                 
-                ssa.ir.bb_sequence.remove(succ)
+                ssa.dominators.merge_block(bb, succ)
+                merged.add(succ)
+                if bb.goto_instr is None:
+                    final = bb
                 changed = True
-                #continue 
-        i += 1
+    # Blocos absorvidos saem da sequência de uma só vez; o bloco que absorveu
+    # o final (sem desvio) passa a ser o último, já que o código cai dele no
+    # epílogo
+    if merged:
+        sequence = [bb for bb in ssa.ir.bb_sequence
+                    if bb not in merged and bb is not final]
+        ssa.ir.bb_sequence = sequence + ([final] if final is not None else [])
+        ssa.ir.invalidate_cfg()
     return changed
\ No newline at end of file
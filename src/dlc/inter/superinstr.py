@@ -0,0 +1,139 @@
+from enum import Enum
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.instr import Instr
+from dlc.inter.operand import Label, Operand, Temp
+from dlc.inter.operator import Operator
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.ssa_operand import TempVersion
+
+
+class SuperOp(Enum):
+    CMP_BRANCH = 'cmp_branch'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+
+class SuperInstr:
+    def __init__(self, op: SuperOp, base_op: Operator, arg1: Operand,
+                 arg2: Operand, label_true: Label, label_false: Label) -> None:
+        self.op = op
+        self.base_op = base_op
+        self.arg1 = arg1
+        self.arg2 = arg2
+        self.result = Operand.EMPTY
+        self.label_true = label_true
+        self.label_false = label_false
+
+    def __str__(self) -> str:
+        return (f'{self.op} {self.arg1} {self.base_op} {self.arg2} '
+                f'{Operator.GOTO} {self.label_true} '
+                f'else {Operator.GOTO} {self.label_false}')
+
+    def __repr__(self) -> str:
+        return f'<SuperInstr: {self.op}>'
+
+
+
+Code = dict[BasicBlock, list[Instr | SuperInstr]]
+
+# Pares mais frequentes nos perfis (Profile.op_pairs) das cargas de trabalho:
+#   LOAD/MOVE -> operação       encaminhamento do operando (load+arith)
+#   operação -> STORE/MOVE      escrita direta no destino (arith+store)
+#   relacional -> IF            compara e desvia (cmp+branch)
+REL_OPS = (Operator.EQ, Operator.NE, Operator.LT,
+           Operator.LE, Operator.GT, Operator.GE)
+
+COMPUTE_OPS = (Operator.SUM, Operator.SUB, Operator.MUL, Operator.DIV,
+               Operator.MOD, Operator.POW, Operator.PLUS, Operator.MINUS,
+               Operator.NOT, Operator.CONVERT) + REL_OPS
+
+
+def is_var(arg: Operand) -> bool:
+    return isinstance(arg, (Temp, TempVersion))
+
+
+def use_counts(code: Code) -> dict[Operand, int]:
+    uses: dict[Operand, int] = {}
+    for instrs in code.values():
+        for instr in instrs:
+            args = list(instr.paths.values()) if isinstance(instr, PhiInstr) \
+                else [instr.arg1, instr.arg2]
+            for arg in args:
+                if is_var(arg):
+                    uses[arg] = uses.get(arg, 0) + 1
+    return uses
+
+
+def _replace_args(instr: Instr, old: Operand, new: Operand) -> Instr:
+    copy = Instr(instr.op, instr.arg1, instr.arg2, instr.result)
+    if copy.arg1 is old:
+        copy.arg1 = new
+    if copy.arg2 is old:
+        copy.arg2 = new
+    return copy
+
+
+def forward_operands(instrs: list[Instr], uses: dict[Operand, int]) -> list[Instr]:
+    # t = load/move x; ...; y = t op z  =>  y = x op z
+    instrs = list(instrs)
+    dead: set[int] = set()
+    for k, instr in enumerate(instrs):
+        temp = instr.result
+        if instr.op not in (Operator.LOAD, Operator.MOVE) or \
+                not is_var(temp) or uses.get(temp) != 1:
+            continue
+        src = instr.arg1
+        for j in range(k + 1, len(instrs)):
+            consumer = instrs[j]
+            if consumer.arg1 is temp or consumer.arg2 is temp:
+                if not isinstance(consumer, PhiInstr):
+                    instrs[j] = _replace_args(consumer, temp, src)
+                    dead.add(k)
+                break
+            # A origem não pode ser redefinida antes do uso
+            if consumer.result is src or consumer.result is temp:
+                break
+    return [instr for k, instr in enumerate(instrs) if k not in dead]
+
+
+def forward_results(instrs: list[Instr], uses: dict[Operand, int]) -> list[Instr]:
+    # t = x op y; v = store/move t  =>  v = x op y
+    fused: list[Instr] = []
+    for instr in instrs:
+        prev = fused[-1] if fused else None
+        if prev is not None and \
+                instr.op in (Operator.STORE, Operator.MOVE) and \
+                prev.op in COMPUTE_OPS and is_var(instr.result) and \
+                instr.arg1 is prev.result and uses.get(prev.result) == 1:
+            fused[-1] = Instr(prev.op, prev.arg1, prev.arg2, instr.result)
+        else:
+            fused.append(instr)
+    return fused
+
+
+def fuse_compare_branch(instrs: list[Instr], uses: dict[Operand, int]) \
+        -> list[Instr | SuperInstr]:
+    # t = x rel y; if t goto A else goto B  =>  cmp_branch x rel y, A, B
+    if len(instrs) < 2:
+        return list(instrs)
+    cmp, branch = instrs[-2], instrs[-1]
+    if branch.op == Operator.IF and cmp.op in REL_OPS and \
+            branch.arg1 is cmp.result and uses.get(cmp.result) == 1:
+        assert isinstance(branch.arg2, Label) and isinstance(branch.result, Label)
+        super_instr = SuperInstr(SuperOp.CMP_BRANCH, cmp.op, cmp.arg1, cmp.arg2,
+                                 branch.arg2, branch.result)
+        return [*instrs[:-2], super_instr]
+    return list(instrs)
+
+
+def fuse_superinstructions(code: dict[BasicBlock, list[Instr]]) -> Code:
+    uses = use_counts(dict(code))
+    fused: Code = {}
+    for bb, instrs in code.items():
+        instrs = forward_operands(instrs, uses)
+        instrs = forward_results(instrs, uses)
+        fused[bb] = fuse_compare_branch(instrs, uses)
+    return fused
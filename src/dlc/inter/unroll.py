@@ -0,0 +1,280 @@
+from typing import cast
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.instr import Instr
+from dlc.inter.loops import Loop, LoopForest, TripCount
+from dlc.inter.operand import Const, Label, Operand, Temp
+from dlc.inter.operator import Operator
+from dlc.inter.out_of_ssa import retarget
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_operand import TempVersion
+from dlc.semantic.type import Type
+
+# Desenrolamento e descascamento dos laços mais internos, na forma gerada
+# para o enquanto (cabeçalho com o teste e única saída, um único latch):
+#   completo    número de iterações constante: o laço é descascado tantas
+#               vezes quantas iterações tiver, e a SCCP apaga o que sobra
+#   parcial     i <op> n com passo constante: um laço principal com fator
+#               cópias do corpo e um só teste (i <op> n - (fator-1)*passo)
+#               roda antes do laço original, que fica com o resto
+#   peeling     a primeira iteração sai do laço quando uma PHI (que não é
+#               variável de indução) começa com uma constante testada no
+#               corpo: nela a SCCP resolve o desvio
+# Cada cópia de iteração que sai do laço desvia para o cabeçalho original,
+# que refaz o teste com os mesmos valores e sai: a saída continua única e
+# os valores usados depois do laço não precisam de PHIs novas.
+
+
+class UnrollCost:
+    # Limites em instruções (PHIs, corpo e desvio de cada bloco do laço)
+    def __init__(self, full_size: int = 160, partial_size: int = 96,
+                 factor: int = 4, peel_size: int = 40, budget: int = 400) -> None:
+        # Tamanho máximo do laço completamente desenrolado
+        self.full_size = full_size
+        # Tamanho máximo das cópias do laço principal no desenrolamento parcial
+        self.partial_size = partial_size
+        self.factor = factor
+        # Tamanho máximo de um laço cuja primeira iteração é descascada
+        self.peel_size = peel_size
+        # Crescimento máximo da função inteira
+        self.budget = budget
+
+
+def loop_size(loop: Loop) -> int:
+    return sum(len(bb.phi_instrs) + len(bb.body_instrs) + 1 for bb in loop.blocks)
+
+
+def unroll_loops(ssa: SSA, cost: UnrollCost | None = None) -> bool:
+    cost = cost if cost is not None else UnrollCost()
+    ir = ssa.ir
+    forest = LoopForest(ir, ssa.dominators)
+    budget = cost.budget
+    changed = False
+    for loop in forest.loops.values():
+        if not _is_simple(loop):
+            continue
+        size = loop_size(loop)
+        trip = loop.trip_count
+        count = trip.count if trip is not None else None
+        if count is not None and count > 0 and \
+                size * count <= min(cost.full_size, budget):
+            _peel(ssa, loop, count)
+            budget -= size * count
+        elif trip is not None and cost.factor > 1 and \
+                size * cost.factor <= min(cost.partial_size, budget) and \
+                _unroll_partial(ssa, loop, trip, cost.factor):
+            budget -= size * cost.factor
+        elif size <= min(cost.peel_size, budget) and _worth_peeling(loop):
+            _peel(ssa, loop, 1)
+            budget -= size
+        else:
+            continue
+        changed = True
+    if changed:
+        ssa.dominators.rebuild(ir.bb_sequence)
+        ir.invalidate_cfg()
+    return changed
+
+
+def _is_simple(loop: Loop) -> bool:
+    header = loop.header
+    if loop.children or loop.preheader is None or len(loop.latches) != 1 or \
+            loop.latches[0] is header or [bb for bb, _ in loop.exits] != [header]:
+        return False
+    if header.goto_instr is None or header.goto_instr.op != Operator.IF:
+        return False
+    return all(len(cast(PhiInstr, phi).paths) == len(header.predecessors)
+               for phi in header.phi_instrs)
+
+
+def _worth_peeling(loop: Loop) -> bool:
+    # Alguma PHI que começa constante e não é variável de indução decide um
+    # desvio fora do cabeçalho
+    pre = cast(BasicBlock, loop.preheader)
+    candidates = {phi.result for phi in loop.header.phi_instrs
+                  if phi.result not in loop.ivs and
+                  isinstance(cast(PhiInstr, phi).paths[pre], Const)}
+    conds: set[Operand] = set()
+    for bb in loop.blocks:
+        if bb is not loop.header and bb.goto_instr and bb.goto_instr.op == Operator.IF:
+            conds.add(bb.goto_instr.arg1)
+    for bb in loop.blocks:
+        for instr in bb.body_instrs:
+            if instr.result in conds and \
+                    (instr.arg1 in candidates or instr.arg2 in candidates):
+                return True
+    return bool(conds & candidates)
+
+
+def _clone_iteration(ssa: SSA, loop: Loop, seed: dict[Operand, Operand], exit_test: bool
+                     ) -> tuple[BasicBlock, BasicBlock, dict[Operand, Operand]]:
+    # Cópia dos blocos do laço com as PHIs do cabeçalho trocadas pelos
+    # valores de seed. O latch da cópia desvia para o cabeçalho original e a
+    # saída continua a original; sem exit_test, o cabeçalho da cópia vai
+    # direto para o corpo. Retorna o cabeçalho e o latch da cópia e o
+    # mapeamento dos valores
+    ir = ssa.ir
+    header = loop.header
+    EMPTY = Operand.EMPTY
+    blocks = [bb for bb in ir.bb_sequence if bb in loop.blocks]
+    clones: dict[BasicBlock, BasicBlock] = {}
+    for bb in blocks:
+        label = Label()
+        clone = ir.label_bb_map[label]
+        clone.label_instr = Instr(Operator.LABEL, EMPTY, EMPTY, label)
+        clones[bb] = clone
+    values: dict[Operand, Operand] = dict(seed)
+    for bb in blocks:
+        for instr in bb:
+            res = instr.result
+            if isinstance(res, TempVersion) and res not in values:
+                values[res] = TempVersion(Temp(res.type), 1)
+
+    def target(label: Operand) -> Operand:
+        bb = ir.bb_from_label(cast(Label, label))
+        if bb is header or bb not in clones:
+            return label
+        return cast(Instr, clones[bb].label_instr).result
+
+    for bb in blocks:
+        clone = clones[bb]
+        if bb is not header:
+            for instr in bb.phi_instrs:
+                phi = PhiInstr()
+                phi.result = values[instr.result]
+                phi.paths = {clones[p]: values.get(v, v)
+                             for p, v in cast(PhiInstr, instr).paths.items()}
+                clone.phi_instrs.append(phi)
+        for instr in bb.body_instrs:
+            clone.body_instrs.append(Instr(instr.op, values.get(instr.arg1, instr.arg1),
+                                           values.get(instr.arg2, instr.arg2),
+                                           values.get(instr.result, instr.result)))
+        branch = cast(Instr, bb.goto_instr)
+        if branch.op == Operator.GOTO:
+            clone.goto_instr = Instr(Operator.GOTO, EMPTY, EMPTY, target(branch.result))
+        elif bb is header and not exit_test:
+            inside = branch.arg2 \
+                if ir.bb_from_label(cast(Label, branch.arg2)) in loop.blocks \
+                else branch.result
+            clone.goto_instr = Instr(Operator.GOTO, EMPTY, EMPTY, target(inside))
+        else:
+            clone.goto_instr = Instr(Operator.IF, values.get(branch.arg1, branch.arg1),
+                                     target(branch.arg2), target(branch.result))
+        for label in (clone.goto_instr.arg2, clone.goto_instr.result):
+            if isinstance(label, Label):
+                clone.add_successor(ir.bb_from_label(label))
+
+    sequence = ir.bb_sequence
+    position = sequence.index(header)
+    sequence[position:position] = [clones[bb] for bb in blocks]
+    return clones[header], clones[loop.latches[0]], values
+
+
+def _redirect(pred: BasicBlock, old: BasicBlock, new: BasicBlock) -> None:
+    retarget(pred, old, new)
+    old.predecessors.remove(pred)
+    new.predecessors.append(pred)
+
+
+def _peel(ssa: SSA, loop: Loop, times: int) -> None:
+    # Cópias encadeadas: pré-cabeçalho -> 1 -> 2 ... -> laço original; o
+    # teste de cada cópia, falhando, leva ao cabeçalho original
+    header, latch = loop.header, loop.latches[0]
+    exit_bb = loop.exits[0][1]
+    phis = [cast(PhiInstr, phi) for phi in header.phi_instrs]
+    entry = cast(BasicBlock, loop.preheader)
+    current = {phi.result: phi.paths[entry] for phi in phis}
+    for _ in range(times):
+        copy_header, copy_latch, values = _clone_iteration(ssa, loop, current, True)
+        _redirect(entry, header, copy_header)
+        _redirect(copy_header, exit_bb, header)
+        for phi in phis:
+            phi.paths.pop(entry, None)
+            phi.paths[copy_header] = current[phi.result]
+        current = {phi.result: values.get(phi.paths[latch], phi.paths[latch])
+                   for phi in phis}
+        entry = copy_latch
+    for phi in phis:
+        phi.paths[entry] = current[phi.result]
+
+
+def _unroll_partial(ssa: SSA, loop: Loop, trip: TripCount, factor: int) -> bool:
+    # Laço principal com fator cópias e o teste iv <op> n - (fator-1)*passo,
+    # que garante que todas as cópias executariam. Se n não é constante, o
+    # pré-cabeçalho confere que o novo limite não estourou, senão vai direto
+    # para o laço original
+    step = cast(Const, trip.step).value
+    op = trip.op
+    if not isinstance(step, int) or trip.iv.type != Type.INT or \
+            not (op in (Operator.LT, Operator.LE) and step > 0 or
+                 op in (Operator.GT, Operator.GE) and step < 0):
+        return False
+    distance = (factor - 1) * step
+    bound = trip.bound
+    if isinstance(bound, Const):
+        limit = cast(int, bound.value) - distance
+        if not Type.MIN_INT <= limit <= Type.MAX_INT:
+            return False
+    elif not isinstance(bound, TempVersion):
+        return False
+
+    header, latch = loop.header, loop.latches[0]
+    pre = cast(BasicBlock, loop.preheader)
+    exit_bb = loop.exits[0][1]
+    phis = [cast(PhiInstr, phi) for phi in header.phi_instrs]
+    fresh: dict[Operand, Operand] = {
+        phi.result: TempVersion(Temp(cast(TempVersion, phi.result).type), 1)
+        for phi in phis}
+    main_header, main_latch, values = _clone_iteration(ssa, loop, fresh, True)
+    for _ in range(factor - 1):
+        current = {phi.result: values.get(phi.paths[latch], phi.paths[latch])
+                   for phi in phis}
+        copy_header, copy_latch, values = _clone_iteration(ssa, loop, current, False)
+        _redirect(main_latch, header, copy_header)
+        main_latch = copy_latch
+    _redirect(main_latch, header, main_header)
+    for phi in phis:
+        merge = PhiInstr()
+        merge.result = fresh[phi.result]
+        merge.paths = {pre: phi.paths[pre],
+                       main_latch: values.get(phi.paths[latch], phi.paths[latch])}
+        main_header.phi_instrs.append(merge)
+
+    # Teste do laço principal; falhando, o laço original continua
+    new_bound: Operand
+    if isinstance(bound, Const):
+        new_bound = Const(Type.INT, cast(int, bound.value) - distance)
+    else:
+        new_bound = TempVersion(Temp(Type.INT), 1)
+        ok = TempVersion(Temp(Type.BOOL), 1)
+        pre.body_instrs.append(Instr(Operator.SUB, bound, Const(Type.INT, distance),
+                                     new_bound))
+        pre.body_instrs.append(Instr(Operator.LT if step > 0 else Operator.GT,
+                                     new_bound, bound, ok))
+    cond = TempVersion(Temp(Type.BOOL), 1)
+    main_header.body_instrs.append(Instr(op, fresh[trip.iv], new_bound, cond))
+    branch = cast(Instr, main_header.goto_instr)
+    assert exit_bb.label_instr is not None and header.label_instr is not None
+    exit_label = exit_bb.label_instr.result
+    branch.arg1 = cond
+    branch.arg2 = branch.result if branch.arg2 is exit_label else branch.arg2
+    branch.result = header.label_instr.result
+    main_header.successors[main_header.successors.index(exit_bb)] = header
+    exit_bb.predecessors.remove(main_header)
+    header.predecessors.append(main_header)
+    for phi in phis:
+        phi.paths[main_header] = fresh[phi.result]
+
+    # Entrada
+    assert main_header.label_instr is not None
+    if isinstance(bound, Const):
+        _redirect(pre, header, main_header)
+        for phi in phis:
+            del phi.paths[pre]
+    else:
+        pre.goto_instr = Instr(Operator.IF, ok, main_header.label_instr.result,
+                               header.label_instr.result)
+        pre.successors = [main_header, header]
+        main_header.predecessors.append(pre)
+    return True
@@ -0,0 +1,154 @@
+from typing import cast
+
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.dominators import Dominators
+from dlc.inter.ir import IR
+from dlc.inter.operand import Label, Operand, Temp
+from dlc.inter.operator import Operator
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_operand import TempVersion
+
+# Verificação estrutural da IR e da SSA. Os problemas encontrados são
+# acumulados e levantados juntos em um único RuntimeError.
+#   barato      O(n), para rodar após cada passe: labels e desvios, simetria
+#               de sucessores/predecessores, caminhos das PHIs, definição
+#               única e dominância das definições sobre os usos, consultada
+#               na árvore de dominadores mantida pela SSA
+#   exaustivo   para testes: a árvore mantida é comparada com um recálculo
+#               completo, que é então usado nas consultas de dominância
+
+MAX_PROBLEMS = 20
+
+
+def check_ir(ir: IR) -> list[str]:
+    problems: list[str] = []
+    blocks: set[BasicBlock] = set()
+    for bb in ir.bb_sequence:
+        if bb in blocks:
+            problems.append(f'{bb}: repetido na sequência de blocos')
+        blocks.add(bb)
+    if ir.bb_entry not in blocks:
+        problems.append(f'{ir.bb_entry}: bloco de entrada fora da sequência')
+
+    for bb in ir.bb_sequence:
+        # Labels
+        label = bb.label_instr.result if bb.label_instr else None
+        if not isinstance(label, Label):
+            problems.append(f'{bb}: sem LABEL')
+        elif ir.label_bb_map.get(label) is not bb:
+            problems.append(f'{bb}: {label} não mapeia para o bloco')
+        # Desvios e sucessores
+        targets: list[BasicBlock] = []
+        instr = bb.goto_instr
+        if instr is None and bb is not ir.bb_sequence[-1]:
+            problems.append(f'{bb}: sem desvio, mas não é o último bloco da sequência')
+        if instr is not None:
+            args = (instr.result,) if instr.op == Operator.GOTO \
+                else (instr.arg2, instr.result)
+            for arg in args:
+                target = ir.label_bb_map.get(cast(Label, arg)) \
+                    if isinstance(arg, Label) else None
+                if target is None:
+                    problems.append(f'{bb}: desvio para {arg}, sem bloco')
+                else:
+                    targets.append(target)
+        if set(targets) != set(bb.successors):
+            problems.append(f'{bb}: sucessores {bb.successors} '
+                            f'diferem dos desvios {targets}')
+        for succ in bb.successors:
+            if succ not in blocks:
+                problems.append(f'{bb}: sucessor {succ} fora da sequência')
+            elif bb not in succ.predecessors:
+                problems.append(f'{bb}: ausente dos predecessores de {succ}')
+        for pred in bb.predecessors:
+            if pred not in blocks:
+                problems.append(f'{bb}: predecessor {pred} fora da sequência')
+            elif bb not in pred.successors:
+                problems.append(f'{bb}: ausente dos sucessores de {pred}')
+        # PHIs
+        for phi in bb.phi_instrs:
+            if not isinstance(phi, PhiInstr) or phi.op != Operator.PHI:
+                problems.append(f'{bb}: {phi} entre as PHIs')
+                continue
+            for path in phi.paths:
+                if path not in bb.predecessors:
+                    problems.append(f'{bb}: {phi} tem caminho de {path}, '
+                                    'que não é predecessor')
+        for instr in bb.body_instrs:
+            if instr.op in (Operator.LABEL, Operator.GOTO, Operator.IF, Operator.PHI):
+                problems.append(f'{bb}: {instr} no corpo do bloco')
+    return problems
+
+
+def check_ssa(ssa: SSA, exhaustive: bool = False) -> list[str]:
+    problems = check_ir(ssa.ir)
+    dominators = ssa.dominators
+    if exhaustive:
+        try:
+            dominators.verify()
+        except RuntimeError as e:
+            problems.append(str(e))
+        dominators = Dominators(ssa.ir.bb_entry, ssa.ir.bb_sequence)
+
+    # Definições: posição -1 para as PHIs, que valem na entrada do bloco
+    defs: dict[Operand, tuple[BasicBlock, int]] = {}
+    for bb in ssa.ir.bb_sequence:
+        for instr in bb.phi_instrs:
+            _define(defs, instr.result, bb, -1, problems)
+        for k, instr in enumerate(bb.body_instrs):
+            _define(defs, instr.result, bb, k, problems)
+
+    # Usos: a definição vem antes no mesmo bloco ou domina o bloco; nas PHIs
+    # o uso fica no fim do predecessor. Blocos inalcançáveis ficam de fora
+    def check_use(arg: Operand, bb: BasicBlock, k: int, where: object) -> None:
+        site = defs.get(arg)
+        if site is None:
+            if isinstance(arg, TempVersion):
+                problems.append(f'{bb}: {where} usa {arg}, que não é definida')
+            return
+        def_bb, def_k = site
+        if def_bb is bb and def_k >= k or \
+                def_bb is not bb and not dominators.dominates(def_bb, bb):
+            problems.append(f'{bb}: {where} usa {arg}, cuja definição não a domina')
+
+    reachable = set(dominators.rpo)
+    for bb in ssa.ir.bb_sequence:
+        if bb not in reachable:
+            continue
+        for phi in bb.phi_instrs:
+            for path, value in cast(PhiInstr, phi).paths.items():
+                if path in reachable:
+                    check_use(value, path, len(path.body_instrs), phi)
+        instrs = bb.body_instrs + ([bb.goto_instr] if bb.goto_instr else [])
+        for k, instr in enumerate(instrs):
+            for arg in (instr.arg1, instr.arg2):
+                check_use(arg, bb, k, instr)
+    return problems
+
+
+def _define(defs: dict[Operand, tuple[BasicBlock, int]], result: Operand,
+            bb: BasicBlock, k: int, problems: list[str]) -> None:
+    if isinstance(result, Temp):
+        problems.append(f'{bb}: {result} definida fora da SSA')
+    elif isinstance(result, TempVersion):
+        if result in defs:
+            problems.append(f'{bb}: {result} definida mais de uma vez '
+                            f'(também em {defs[result][0]})')
+        defs[result] = (bb, k)
+
+
+def verify_ir(ir: IR) -> None:
+    _raise(check_ir(ir))
+
+
+def verify_ssa(ssa: SSA, exhaustive: bool = False) -> None:
+    _raise(check_ssa(ssa, exhaustive))
+
+
+def _raise(problems: list[str]) -> None:
+    if problems:
+        shown = problems[:MAX_PROBLEMS]
+        if len(problems) > MAX_PROBLEMS:
+            shown.append(f'... e mais {len(problems) - MAX_PROBLEMS}')
+        raise RuntimeError('IR inconsistente:\n  ' + '\n  '.join(shown))
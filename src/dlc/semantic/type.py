@@ -57,6 +57,10 @@ class Type:
     def __repr__(self) -> str:
         return f'<Type: {self.name}>'
 
+    def __reduce__(self) -> tuple[object, tuple[type, str]]:
+        # Tipos são singletons: a desserialização devolve a mesma instância
+        return (getattr, (Type, self.name.upper()))
+
     @staticmethod
     def tag_to_type(tag: Tag) -> Type:
         match tag:
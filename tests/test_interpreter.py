@@ -0,0 +1,296 @@
+import asyncio
+import json
+from collections.abc import Iterable
+from io import StringIO
+from typing import Any
+
+import pytest
+
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import AsyncInterpreterIO, InterpreterIO
+from dlc.inter.ir import IR
+from dlc.inter.parallel import ParallelInterpreter, dumps_ir, loads_ir
+from dlc.inter.phi_instr import PhiInstr
+from dlc.inter.profiler import Profile
+from dlc.inter.snapshot import Snapshot
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_opt import optimize_ssa
+from dlc.lex.lexer import Lexer
+from dlc.semantic.checker import Checker
+from dlc.syntax.parser import Parser
+
+primo = '''
+programa primo inicio
+    inteiro num, i;
+    booleano eh_primo;
+    leia(num);
+    i = 2;
+    se (num <= 1) eh_primo = falso senao eh_primo = verdade;
+    enquanto (i < num & eh_primo == verdade) inicio
+        se (num % i == 0)
+            eh_primo = falso;
+        i = i + 1;
+    fim;
+    escreva(eh_primo);
+fim.
+'''
+
+def build_ir(source: str) -> IR:
+    parser = Parser(Lexer(StringIO(source)))
+    Checker(parser.ast)
+    return IR(parser.ast)
+
+
+def build_optimized_ir(source: str) -> IR:
+    ssa = SSA(build_ir(source))
+    optimize_ssa(ssa)
+    return ssa.ir
+
+
+def run(ir: IR, inputs: Iterable[Any]) -> list[str]:
+    outputs: list[str] = []
+    Interpreter(ir, InterpreterIO(inputs, outputs)).interpret()
+    return outputs
+
+
+def test_programmatic_io():
+    ir = build_ir(primo)
+    assert run(ir, ['7']) == ['1']
+    assert run(ir, ['9']) == ['0']
+
+
+def test_stream_io_is_buffered():
+    source = '''programa p inicio
+        inteiro i, n;
+        leia(n);
+        i = 0;
+        enquanto (i < n) inicio escreva(i); i = i + 1; fim;
+    fim.'''
+    out = StringIO()
+    io = InterpreterIO(StringIO('5\n'), out, buffer_size=2)
+    Interpreter(build_ir(source), io).interpret()
+    assert out.getvalue() == ''.join(f'output: {i}\n' for i in range(5))
+
+
+def test_invalid_and_missing_input():
+    outputs: list[str] = []
+    io = InterpreterIO(['x'], outputs)
+    Interpreter(build_ir(primo), io).interpret()
+    assert outputs == [] and len(io.errors) == 1
+    io = InterpreterIO([], outputs)
+    Interpreter(build_ir(primo), io).interpret()
+    assert len(io.errors) == 1
+
+
+def test_numpy_inputs():
+    np = pytest.importorskip('numpy')
+    ir = build_ir(primo)
+    assert run(ir, np.array([13])) == ['1']
+
+
+def test_profile():
+    source = '''programa p inicio
+        inteiro i, j;
+        i = 0;
+        enquanto (i < 10) inicio
+            j = 0;
+            enquanto (j < 5) j = j + 1;
+            i = i + 1;
+        fim;
+    fim.'''
+    ir = build_ir(source)
+    interpreter = Interpreter(ir, InterpreterIO([], []), profile=True)
+    interpreter.interpret()
+    profile = interpreter.profile
+    assert profile is not None
+    assert profile.instr_count == interpreter.instr_count
+    loops = profile.hot_loops()
+    assert len(loops) == 2
+    # laço interno: 10 * (5 + 1) execuções do cabeçalho
+    assert loops[0][2] == 60 and loops[1][2] == 11
+    assert loops[0][1] < loops[1][1]
+    data = json.loads(profile.to_json())
+    assert data['instructions'] == interpreter.instr_count
+    assert data['loops'][0]['count'] == 60
+    header = data['loops'][0]['header']
+    assert data['blocks'][header] == 60
+    assert sum(n for edge, n in data['edges'].items()
+               if edge.endswith(f'->{header}')) == 60
+
+
+def test_profile_stops_mid_block():
+    # A divisão por zero encerra o bloco: as escritas depois dela não contam
+    source = '''programa p inicio
+        inteiro x, y;
+        leia(x); y = 10 / x; escreva(y); escreva(x);
+    fim.'''
+    interpreter = Interpreter(build_ir(source), InterpreterIO(['0'], []), profile=True)
+    interpreter.interpret()
+    profile = interpreter.profile
+    assert profile is not None
+    assert interpreter.io.errors
+    assert profile.instr_count == interpreter.instr_count
+    assert all(op.name != 'PRINT' for op in profile.op_counts)
+    assert all('PRINT' not in (a.name, b.name) for (a, b), _ in profile.op_pairs())
+
+
+def test_superinstructions():
+    for ir in (build_ir(primo), build_optimized_ir(primo)):
+        for n in ('1', '29', '91'):
+            plain = Interpreter(ir, InterpreterIO([n], []))
+            fused = Interpreter(ir, InterpreterIO([n], []), superinstructions=True)
+            plain.interpret()
+            fused.interpret()
+            assert fused.io.outputs == plain.io.outputs
+            assert fused.instr_count < plain.instr_count
+
+
+def test_budget_snapshot_resume():
+    source = '''programa p inicio
+        inteiro i, soma;
+        i = 0; soma = 0;
+        enquanto (i < 300) inicio
+            soma = soma + i;
+            se (i % 50 == 0) escreva(soma);
+            i = i + 1;
+        fim;
+        escreva(soma);
+    fim.'''
+    for ir in (build_ir(source), build_optimized_ir(source)):
+        expected = run(ir, [])
+        # Fatias de 500 instruções, cada uma retomada em uma cópia da IR
+        data = dumps_ir(ir)
+        outputs: list[str] = []
+        snapshot = None
+        slices = 0
+        while True:
+            interpreter = Interpreter(loads_ir(data), InterpreterIO([], outputs),
+                                      budget=500)
+            snapshot = interpreter.interpret(snapshot)
+            if snapshot is None:
+                break
+            snapshot = Snapshot.from_json(snapshot.to_json())
+            slices += 1
+        assert outputs == expected
+        assert slices > 2
+
+
+def test_budget_stops_infinite_loop_and_samples():
+    source = '''programa p inicio
+        inteiro i;
+        i = 0;
+        enquanto (verdade) i = i + 1;
+    fim.'''
+    ir = build_ir(source)
+    interpreter = Interpreter(ir, InterpreterIO([], []), budget=10_000,
+                              sample_every=1000)
+    snapshot = interpreter.interpret()
+    assert snapshot is not None
+    assert 10_000 <= interpreter.instr_count < 10_100
+    assert 9 <= len(interpreter.samples) <= 10
+    assert snapshot.block in {Profile.label_of(bb) for bb in ir.bb_sequence}
+
+
+def test_pickled_ir_roundtrip():
+    body = ''.join(f'se (a > {k}) a = a - 1;\n' for k in range(500))
+    source = f'programa p inicio inteiro a; leia(a); {body} escreva(a); fim.'
+    ir = build_optimized_ir(source)
+    assert run(loads_ir(dumps_ir(ir)), ['42']) == run(ir, ['42'])
+
+
+def test_parallel_interpreter_order():
+    numbers = list(range(2, 20))
+    results = ParallelInterpreter(build_optimized_ir(primo), max_workers=2) \
+        .run([[str(n)] for n in numbers])
+    assert [r.index for r in results] == list(range(len(numbers)))
+    primes = {2, 3, 5, 7, 11, 13, 17, 19}
+    assert [r.outputs for r in results] == \
+        [['1' if n in primes else '0'] for n in numbers]
+    assert all(r.instr_count > 0 for r in results)
+
+
+def test_async_sessions_share_event_loop():
+    source = '''programa p inicio
+        inteiro n, i;
+        leia(n);
+        enquanto (n > 0) inicio
+            i = 0;
+            enquanto (i < 2000) i = i + 1;
+            escreva(n);
+            leia(n);
+        fim;
+    fim.'''
+    ir = build_optimized_ir(source)
+
+    async def session(k: int) -> list[str]:
+        inputs: asyncio.Queue[str | None] = asyncio.Queue()
+        outputs: asyncio.Queue[str] = asyncio.Queue()
+        io = AsyncInterpreterIO(inputs, outputs, buffer_size=1)
+        task = asyncio.create_task(Interpreter(ir, io).interpret_async(yield_every=500))
+        received = []
+        for n in (k + 1, k + 2, 0):
+            await inputs.put(str(n))
+            if n:
+                received.append(await outputs.get())
+        await task
+        return received
+
+    async def main() -> list[list[str]]:
+        return await asyncio.gather(*(session(k) for k in range(20)))
+
+    results = asyncio.run(main())
+    assert results == [[str(k + 1), str(k + 2)] for k in range(20)]
+
+
+def test_async_streams():
+    async def main() -> tuple[bytes, bytes]:
+        async def handle(reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter) -> None:
+            io = AsyncInterpreterIO(reader, writer)
+            await Interpreter(build_ir(primo), io).interpret_async()
+            writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        replies = []
+        for line in (b'7\n', b'x\n'):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(line)
+            await writer.drain()
+            replies.append(await reader.read())
+            writer.close()
+        server.close()
+        await server.wait_closed()
+        return replies[0], replies[1]
+
+    ok, invalid = asyncio.run(main())
+    assert ok == b'output: 1\n'
+    assert invalid == 'Entrada de dados inválida! Interpretação encerrada.\n'.encode()
+
+
+def test_phi_copies_are_parallel():
+    # Após a propagação de cópias as PHIs do laço trocam a e b entre si
+    source = '''programa p inicio
+        inteiro a, b, t, i;
+        a = 1; b = 2; i = 0;
+        enquanto (i < 3) inicio
+            t = a; a = b; b = t;
+            escreva(a * 10 + b);
+            i = i + 1;
+        fim;
+    fim.'''
+    assert run(build_ir(source), []) == ['21', '12', '21']
+    ir = build_optimized_ir(source)
+    assert any(isinstance(instr, PhiInstr) for instr in ir)
+    assert run(SSA(build_ir(source)).ir, []) == run(ir, []) == ['21', '12', '21']
+
+
+def test_simplified_phi_runs_as_move():
+    # O desvio morto deixa PHIs de um só caminho, que viram MOVEs
+    source = '''programa p inicio
+        inteiro x, y;
+        leia(x); y = 3;
+        se (falso) inicio x = 2; y = 5; fim;
+        escreva(x); escreva(y);
+    fim.'''
+    assert run(build_optimized_ir(source), ['4']) == ['4', '3']
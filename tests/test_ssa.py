@@ -0,0 +1,649 @@
+import random
+import sys
+from collections.abc import Callable
+from io import StringIO
+from itertools import pairwise
+
+import pytest
+
+from dlc.codegen.codegen_x64 import CodeGeneratorX64
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.dominators import Dominators
+from dlc.inter.instr import Instr
+from dlc.inter.interpreter import Interpreter
+from dlc.inter.interpreter_io import InterpreterIO
+from dlc.inter.ir import IR
+from dlc.inter.layout import layout_blocks
+from dlc.inter.loops import LoopForest, TripCount
+from dlc.inter.operand import Const, Label, Operand, Temp
+from dlc.inter.operator import Operator
+from dlc.inter.out_of_ssa import out_of_ssa, sequentialize
+from dlc.inter.ssa import SSA
+from dlc.inter.ssa_operand import TempVersion
+from dlc.inter.ssa_opt import (
+    loop_invariant_code_motion,
+    optimize_ssa,
+    sparse_conditional_constant_propagation,
+)
+from dlc.inter.unroll import UnrollCost
+from dlc.inter.verifier import check_ssa, verify_ssa
+from dlc.lex.lexer import Lexer
+from dlc.semantic.checker import Checker
+from dlc.semantic.type import Type
+from dlc.syntax.parser import Parser
+
+nested = '''
+programa p inicio
+    inteiro a, i;
+    leia(a);
+    i = 0;
+    enquanto (i < a) inicio
+        se (i % 2 == 0) inicio
+            enquanto (a > 10) a = a - 3;
+        fim senao
+            se (a < 0) a = 0;
+        i = i + 1;
+    fim;
+    escreva(a);
+fim.
+'''
+
+def build_ir(source: str) -> IR:
+    parser = Parser(Lexer(StringIO(source)))
+    Checker(parser.ast)
+    return IR(parser.ast)
+
+
+def random_cfg(n: int, seed: int) -> list[BasicBlock]:
+    rng = random.Random(seed)
+    blocks = [BasicBlock() for _ in range(n)]
+    for k in range(n - 1):
+        blocks[k].add_successor(blocks[k + 1])
+        for _ in range(rng.randint(0, 2)):
+            blocks[k].add_successor(blocks[rng.randrange(1, n)])
+    return blocks
+
+
+def execute(ir: IR, inputs: list[str]) -> tuple[list[str], list[str]]:
+    io = InterpreterIO(inputs, [])
+    Interpreter(ir, io).interpret()
+    return io.outputs, io.errors
+
+
+def assert_same_output(source: str, inputs_list: list[list[str]], level: int = 1,
+                       cost: UnrollCost | None = None) -> list[SSA]:
+    # Em cada modo de SSA, o programa otimizado (e verificado) tem as mesmas
+    # saídas e erros que a IR original; devolve as SSAs otimizadas
+    expected = [execute(build_ir(source), inputs) for inputs in inputs_list]
+    optimized = []
+    for mode in SSA.MODES:
+        ssa = SSA(build_ir(source), mode=mode)
+        optimize_ssa(ssa, verify=True, level=level, cost=cost)
+        verify_ssa(ssa, exhaustive=True)
+        assert [execute(ssa.ir, inputs) for inputs in inputs_list] == expected
+        optimized.append(ssa)
+    return optimized
+
+
+def test_dominator_algorithms_agree():
+    ir = build_ir(nested)
+    graphs = [(ir.bb_entry, ir.bb_sequence)]
+    graphs += [(blocks[0], blocks) for blocks in
+               (random_cfg(n, seed) for seed, n in enumerate((5, 20, 60, 150)))]
+    for entry, blocks in graphs:
+        reference = Dominators(entry, blocks, 'iterative')
+        for algorithm in Dominators.ALGORITHMS:
+            doms = Dominators(entry, blocks, algorithm)
+            assert doms.idom == reference.idom
+            for bb in blocks:
+                assert doms.dominators(bb) == \
+                    {d for d in blocks if doms.dominates(d, bb)}
+
+
+
+def test_incremental_dominators():
+    # Edições aleatórias, cada uma conferida contra o recálculo completo
+    for seed in range(60):
+        rng = random.Random(seed)
+        blocks = random_cfg(rng.randint(2, 30), seed)
+        doms = Dominators(blocks[0], blocks, verify=True)
+        for _ in range(40):
+            a, b = rng.choice(blocks), rng.choice(blocks)
+            if rng.random() < 0.5 and b not in a.successors:
+                a.add_successor(b)
+                doms.insert_edge(a, b)
+            elif a.successors:
+                b = rng.choice(a.successors)
+                a.successors.remove(b)
+                b.predecessors.remove(a)
+                doms.delete_edge(a, b)
+        # Blocos novos a -> b -> alvo e a fusão de b em a
+        a, b = BasicBlock(), BasicBlock()
+        for src, dst in ((blocks[0], a), (a, b), (b, rng.choice(blocks))):
+            src.add_successor(dst)
+            doms.insert_edge(src, dst)
+        assert doms.idom[b] is a
+        a.successors = b.successors
+        for succ in a.successors:
+            succ.predecessors = [a if p is b else p for p in succ.predecessors]
+        doms.merge_block(a, b)
+        # Blocos inalcançáveis podem sair
+        for dead in [d for d in blocks[1:] if doms.idom[d] is None]:
+            for succ in dead.successors:
+                succ.predecessors.remove(dead)
+            dead.successors = []
+            doms.delete_block(dead)
+    # Os passes que editam o CFG mantêm a árvore da SSA
+    ssa = SSA(build_ir(nested.replace('i % 2 == 0', 'falso')))
+    optimize_ssa(ssa)
+    ssa.dominators.verify()
+    assert set(ssa.idom) == set(ssa.ir.bb_sequence)
+
+
+def test_ssa_dominators():
+    ssa = SSA(build_ir(nested))
+    entry = ssa.ir.bb_entry
+    assert ssa.idom[entry] is None
+    assert all(entry in ssa.dom[bb] for bb in ssa.ir.bb_sequence)
+    for bb, parent in ssa.idom.items():
+        if parent is not None:
+            assert bb in ssa.dom_tree[parent]
+            assert ssa.dom[bb] == ssa.dom[parent] | {bb}
+
+
+def test_ssa_dominator_backends():
+    results = []
+    for algorithm in Dominators.ALGORITHMS:
+        ssa = SSA(build_ir(nested), dom_algorithm=algorithm)
+        index = {bb: k for k, bb in enumerate(ssa.ir.bb_sequence)}
+        idom = {index[bb]: index[d] if d else None for bb, d in ssa.idom.items()}
+        phis = [len(bb.phi_instrs) for bb in ssa.ir.bb_sequence]
+        results.append((idom, phis))
+    assert all(result == results[0] for result in results)
+
+
+def test_rename_deep_dominator_tree():
+    # Cadeia de 200 mil blocos: a árvore de dominadores tem a mesma altura
+    ir = build_ir('programa p inicio inteiro a; leia(a); fim.')
+    var = next(instr.result for instr in ir if instr.op == Operator.ALLOCA)
+    one = Const(Type.INT, 1)
+    EMPTY = Operand.EMPTY
+    for _ in range(200_000):
+        label = Label()
+        ir.add_instr(Instr(Operator.GOTO, EMPTY, EMPTY, label))
+        ir.add_instr(Instr(Operator.LABEL, EMPTY, EMPTY, label))
+        temp = Temp(Type.INT)
+        ir.add_instr(Instr(Operator.LOAD, var, EMPTY, temp))
+        ir.add_instr(Instr(Operator.SUM, temp, one, temp))
+        ir.add_instr(Instr(Operator.STORE, temp, EMPTY, var))
+    temp = Temp(Type.INT)
+    ir.add_instr(Instr(Operator.LOAD, var, EMPTY, temp))
+    ir.add_instr(Instr(Operator.PRINT, temp, EMPTY, EMPTY))
+
+    ssa = SSA(ir)
+    assert sys.getrecursionlimit() < 200_000
+    last = ssa.ir.bb_sequence[-1].body_instrs[-2]
+    assert isinstance(last.arg1, TempVersion)
+    assert last.arg1.origin is var and last.arg1.version == 200_001
+
+
+def test_ssa_modes():
+    # x só é definida dentro do laço e lida depois dele
+    loop = '''programa p inicio
+        inteiro i, x;
+        i = 0;
+        enquanto (i < 3) inicio x = i * 2; i = i + 1; fim;
+        escreva(x);
+    fim.'''
+    phis = {}
+    for mode in ('semi-pruned', 'pruned'):
+        for source, inputs, expected in ((loop, [], ['4']), (nested, ['25'], ['10'])):
+            ssa = SSA(build_ir(source), mode=mode)
+            outputs: list[str] = []
+            Interpreter(ssa.ir, InterpreterIO(inputs, outputs)).interpret()
+            assert outputs == expected
+        phis[mode] = sum(len(bb.phi_instrs) for bb in ssa.ir.bb_sequence)
+    assert phis['pruned'] <= phis['semi-pruned']
+
+
+def test_block_tombstones_and_compaction():
+    bb = BasicBlock()
+    EMPTY = Operand.EMPTY
+    instrs = [Instr(Operator.PRINT, Const(Type.INT, k), EMPTY, EMPTY) for k in range(6)]
+    bb.body_instrs.extend(instrs)
+    for instr in instrs[::2]:
+        bb.discard(instr)
+    bb.prepend(instrs[0])
+    bb.prepend(instrs[4])
+    assert bb.body_instrs == instrs
+    bb.compact()
+    # Como insert(0, ...): a última inserção fica na frente; discard seguido
+    # de prepend move a instrução
+    assert bb.body_instrs == [instrs[4], instrs[0], instrs[1], instrs[3], instrs[5]]
+
+
+def test_sequentialize_parallel_copies():
+    a, b, c, d = (TempVersion(Temp(Type.INT), 1) for _ in range(4))
+    temps: list[Operand] = []
+    def new_temp(type: Type) -> Operand:
+        temps.append(TempVersion(Temp(type), 1))
+        return temps[-1]
+
+    def simulate(moves: list[tuple[Operand, Operand]]) -> dict[Operand, Operand]:
+        values: dict[Operand, Operand] = {v: v for v in (a, b, c, d)}
+        for dest, src in moves:
+            values[dest] = values.get(src, src)
+        return values
+
+    # Ciclo a <-> b com d lendo a: um temporário, um MOVE por cópia
+    copies: list[tuple[Operand, Operand]] = [(a, b), (b, a), (d, a),
+                                             (c, Const(Type.INT, 7))]
+    moves = sequentialize(copies, new_temp)
+    values = simulate(moves)
+    assert (values[a], values[b], values[d]) == (b, a, a)
+    assert isinstance(values[c], Const)
+    assert len(temps) == 1 and len(moves) == len(copies) + 1
+
+
+def test_out_of_ssa():
+    swap = '''programa p inicio
+        inteiro a, b, t, i;
+        a = 1; b = 2; i = 0;
+        enquanto (i < 3) inicio
+            t = a; a = b; b = t;
+            escreva(a * 10 + b);
+            i = i + 1;
+        fim;
+    fim.'''
+    for source, inputs in ((swap, []), (nested, ['25'])):
+        for optimize in (False, True):
+            ssa = SSA(build_ir(source), mode='pruned')
+            if optimize:
+                optimize_ssa(ssa)
+            expected: list[str] = []
+            Interpreter(ssa.ir, InterpreterIO(inputs, expected)).interpret()
+            out_of_ssa(ssa)
+            assert not any(instr.op == Operator.PHI for instr in ssa.ir)
+            outputs: list[str] = []
+            Interpreter(ssa.ir, InterpreterIO(inputs, outputs)).interpret()
+            assert outputs == expected
+
+
+def test_loop_forest():
+    ssa = SSA(build_ir(nested), mode='pruned')
+    forest = LoopForest.of(ssa.ir)
+    assert LoopForest.of(ssa.ir) is forest and forest.valid
+    outer, inner = forest.loops.values()
+    assert forest.roots == [outer] and outer.children == [inner]
+    assert inner.parent is outer and inner.blocks < outer.blocks
+    assert (outer.depth, inner.depth) == (1, 2)
+    assert forest.depth(inner.header) == 2 and forest.depth(ssa.ir.bb_entry) == 0
+    for loop in (outer, inner):
+        assert loop.preheader is not None and loop.preheader not in loop
+        assert [bb for bb, _ in loop.exits] == [loop.header]
+    # i < a não serve (a muda no laço); a > 10 tem limite constante e passo -3
+    assert outer.trip_count is None
+    trip = inner.trip_count
+    assert trip is not None and trip.op == Operator.GT and trip.count is None
+    assert isinstance(trip.bound, Const) and trip.bound.value == 10
+    assert isinstance(trip.step, Const) and trip.step.value == -3
+    # Mudanças no CFG (aqui, o desvio constante) descartam a análise guardada
+    ssa = SSA(build_ir(nested.replace('i % 2 == 0', 'falso')), mode='pruned')
+    forest = LoopForest.of(ssa.ir)
+    assert len(forest.loops) == 2
+    optimize_ssa(ssa)
+    assert not forest.valid and LoopForest.of(ssa.ir) is not forest
+    assert len(LoopForest.of(ssa.ir).loops) == 1
+
+
+def test_trip_count():
+    def count(init: int, op: Operator, bound: int, step: int) -> int | None:
+        iv = TempVersion(Temp(Type.INT), 1)
+        trip = TripCount(iv, Const(Type.INT, init), Const(Type.INT, step),
+                         op, Const(Type.INT, bound))
+        return trip.count
+    def simulate(init: int, op: Operator, bound: int, step: int) -> int:
+        n, i = 0, init
+        while Interpreter.OP_BINARY[op](i, bound):
+            n, i = n + 1, i + step
+        return n
+    for init, op, bound, step in ((0, Operator.LT, 10, 3), (0, Operator.LE, 9, 3),
+                                  (20, Operator.GT, 0, -3), (20, Operator.GE, 2, -3),
+                                  (0, Operator.NE, 10, 2), (5, Operator.LT, 1, 1)):
+        assert count(init, op, bound, step) == simulate(init, op, bound, step)
+    assert count(0, Operator.LT, 10, -1) is None
+    assert count(0, Operator.NE, 9, 2) is None
+
+
+def test_sccp():
+    # b é sempre 1: o senao nunca executa e a PHI do laço só vê constantes
+    # pelas arestas executáveis; a soma passa do limite de 32 bits e a
+    # divisão por zero fica para a execução
+    source = '''
+    programa p inicio
+        inteiro a, b, i, m;
+        leia(a);
+        b = 1; i = 0; m = 2147483647;
+        enquanto (i < a) inicio
+            se (b == 1) b = 1 senao b = 2;
+            i = i + 1;
+        fim;
+        escreva(b); escreva(m + b);
+        se (a > 100) escreva(a / (b - 1));
+    fim.
+    '''
+    assert execute(build_ir(source), ['101']) == \
+        (['1', '-2147483648'], ['Divisão por zero!'])
+    for ssa in assert_same_output(source, [['5'], ['101']]):
+        prints = [instr for bb in ssa.ir.bb_sequence for instr in bb
+                  if instr.op == Operator.PRINT]
+        assert [instr.arg1.value for instr in prints[:2]] == [1, -2147483648]
+        assert sum(1 for bb in ssa.ir.bb_sequence for instr in bb
+                   if instr.op == Operator.IF) == 2
+
+
+def test_gvn():
+    # b * a e b > a repetem a * b e a < b; os dois lados do se copiam o
+    # mesmo valor, então a PHI de c também some
+    source = '''
+    programa p inicio
+        inteiro a, b, c, x;
+        leia(a); leia(b);
+        x = a * b;
+        se (a < b) c = b * a senao c = a * b;
+        se (b > a) escreva(x + c) senao escreva(a * b);
+    fim.
+    '''
+    for ssa in assert_same_output(source, [['2', '3'], ['3', '2']]):
+        ops = [instr.op for bb in ssa.ir.bb_sequence for instr in bb]
+        assert ops.count(Operator.MUL) == 1 and ops.count(Operator.LT) == 1
+        assert Operator.GT not in ops and Operator.PHI not in ops
+
+
+def test_licm():
+    # a / b está no cabeçalho (executa sempre que o laço é alcançado) e sai;
+    # i % b não sai do laço interno, que pode nem executar com b = 0;
+    # convert a e 3.1415 * a saem dos dois laços
+    source = '''
+    programa p inicio
+        inteiro a, b, i, j; real r;
+        leia(a); leia(b);
+        i = 0; r = 0.5;
+        enquanto (i < a / b) inicio
+            j = 0;
+            enquanto (j < a) inicio
+                r = r + 3.1415 * a + i % b;
+                j = j + 1;
+            fim;
+            i = i + 1;
+        fim;
+        escreva(r);
+    fim.
+    '''
+    for ssa in assert_same_output(source, [['5', '2'], ['2', '3'], ['4', '0']]):
+        outer, inner = LoopForest.of(ssa.ir).loops.values()
+        outer_ops = [instr.op for bb in outer.blocks for instr in bb]
+        inner_ops = [instr.op for bb in inner.blocks for instr in bb]
+        assert Operator.DIV not in outer_ops and Operator.MUL not in outer_ops
+        # Só fica a conversão de i % b
+        assert outer_ops.count(Operator.CONVERT) == 1
+        assert inner_ops.count(Operator.CONVERT) == 1
+        assert Operator.MOD in inner_ops
+    # Fora do cabeçalho, a / -1 fica no laço: com a = INT_MIN o idiv
+    # interromperia a execução mesmo sem o corpo executar
+    divide = '''
+    programa p inicio
+        inteiro a, n, d, i, s;
+        leia(a); leia(n);
+        d = D; i = 0; s = 0;
+        enquanto (i < n) inicio s = s + a / d; i = i + 1; fim;
+        escreva(s);
+    fim.
+    '''
+    for divisor, hoisted in (('2', True), ('-1', False)):
+        ssa = SSA(build_ir(divide.replace('D', divisor)))
+        sparse_conditional_constant_propagation(ssa)
+        loop_invariant_code_motion(ssa)
+        loop, = LoopForest.of(ssa.ir).loops.values()
+        ops = [instr.op for bb in loop.blocks for instr in bb]
+        assert (Operator.DIV not in ops) == hoisted
+
+
+def test_strength_reduction():
+    # i * 4, i ^ 2 e i * k viram somas; o teste i < 10 passa a usar i * 4 e
+    # i some. Com k = 500000000, i * k estoura: o teste fica como estava
+    source = '''
+    programa p inicio
+        inteiro i, s, k;
+        leia(k);
+        i = 0; s = 0;
+        enquanto (i < 10) inicio
+            s = s + i * 4 + i ^ 2 + i * k;
+            i = i + 1;
+        fim;
+        escreva(s);
+    fim.
+    '''
+    for k, bound in ((4, 40), (500000000, 10)):
+        for ssa in assert_same_output(source.replace('i * 4', f'i * {k}'), [['3']]):
+            loop, = LoopForest.of(ssa.ir).loops.values()
+            ops = [instr.op for bb in loop.blocks for instr in bb]
+            assert Operator.MUL not in ops and Operator.POW not in ops
+            compare, = (instr for instr in loop.header if instr.op == Operator.LT)
+            assert isinstance(compare.arg2, Const) and compare.arg2.value == bound
+
+
+def test_algebraic_simplification():
+    # As identidades somem em inteiro e booleano; em real, r * 0 e r - r
+    # ficam (NaN e infinito), r ^ 2 vira r * r
+    source = '''
+    programa p inicio
+        inteiro x, y; real r; booleano b;
+        leia(x); leia(y); r = x; r = r / 3;
+        b = x > y;
+        escreva(x * 1 + 0 * y + (x - x) + y ^ 2 + x / 1 + y % 1 + x * -1);
+        escreva(r * 0 + (r - r) + r ^ 2 + r * 1);
+        se (b == verdade) escreva(1);
+        se (b == falso) escreva(2);
+        se ((x <= y) != falso) escreva(3);
+    fim.
+    '''
+    cases = [['5', '7'], ['7', '5'], ['-2147483648', '-1']]
+    for ssa in assert_same_output(source, cases):
+        instrs = [instr for bb in ssa.ir.bb_sequence for instr in bb]
+        ops = [instr.op for instr in instrs]
+        assert Operator.POW not in ops and Operator.MOD not in ops
+        assert Operator.DIV in ops
+        assert not {Operator.EQ, Operator.NE, Operator.NOT} & set(ops)
+        assert [instr.arg1.type for instr in instrs if instr.op == Operator.MUL] == \
+            [Type.INT, Type.REAL, Type.REAL]
+        assert sum(instr.op == Operator.SUB for instr in instrs) == 1
+    # r - (-0.0) não é r: com r = -0.0 o resultado é 0.0
+    negative_zero = '''
+    programa p inicio
+        real r, z;
+        leia(r); z = 0.5 - 0.5; z = -z;
+        escreva(r - z);
+    fim.
+    '''
+    assert execute(build_ir(negative_zero), ['-0.0']) == (['0.0000'], [])
+    assert_same_output(negative_zero, [['-0.0'], ['2.5']])
+
+
+def test_aggressive_dead_code_elimination():
+    # s e a só alimentam a si mesmas: o ciclo de PHIs e o se/senao vazio
+    # somem; leia(a) fica, porque consome a entrada
+    source = '''
+    programa p inicio
+        inteiro a, b, i, s;
+        leia(a); leia(b);
+        i = 0; s = 0;
+        enquanto (i < b) inicio
+            s = s * 2 + i;
+            se (s > 10) a = s senao a = i;
+            i = i + 1;
+        fim;
+        escreva(i);
+    fim.
+    '''
+    for ssa in assert_same_output(source, [['9', '4']]):
+        loop, = LoopForest.of(ssa.ir).loops.values()
+        assert len(loop.header.phi_instrs) == 1 and len(loop.blocks) == 2
+        assert sum(instr.op == Operator.READ for instr in ssa.ir.bb_entry) == 2
+
+
+def test_jump_threading():
+    # As junções do & e do | somem: cada teste desvia direto para o ramo
+    # certo do se, sem atribuir verdade ou falso a uma temporária
+    source = '''
+    programa p inicio
+        inteiro a, b;
+        leia(a); leia(b);
+        se (a > 1 & b > 2 | a == b) escreva(1) senao escreva(2);
+        enquanto (a < 10 & b > 0) inicio a = a + 1; b = b - 1; fim;
+        escreva(a);
+    fim.
+    '''
+    cases = [['2', '3'], ['2', '2'], ['0', '5'], ['12', '1']]
+    for ssa in assert_same_output(source, cases):
+        assert all(not bb.phi_instrs for bb in ssa.ir.bb_sequence
+                   if bb not in LoopForest.of(ssa.ir).loops)
+        assert not any(instr.op == Operator.MOVE and isinstance(instr.arg1, Const)
+                       and instr.arg1.type == Type.BOOL for instr in ssa.ir)
+        assert ssa.ir.bb_sequence[-1].goto_instr is None
+
+
+def test_unroll():
+    # O laço de 6 voltas some; o de n voltas ganha um laço principal com 4
+    # cópias antes do original, que fica com o resto; sem orçamento, nada
+    source = '''
+    programa p inicio
+        inteiro i, j, s, n;
+        leia(n);
+        i = 0; s = 0;
+        enquanto (i < 6) inicio s = s + i * i; i = i + 1; fim;
+        j = 1;
+        enquanto (j <= n) inicio s = s * 3 + j; j = j + 1; fim;
+        escreva(s);
+    fim.
+    '''
+    cases = [[str(n)] for n in range(9)]
+    costs = ((None, 2), (UnrollCost(budget=0), 2), (UnrollCost(factor=1), 1))
+    for cost, loops in costs:
+        for ssa in assert_same_output(source, cases, level=2, cost=cost):
+            forest = LoopForest.of(ssa.ir)
+            assert len(forest.loops) == loops
+            if cost is None:
+                main = next(iter(forest.loops.values()))
+                assert sum(instr.op == Operator.MUL
+                           for bb in main.blocks for instr in bb) == 4
+
+
+def test_verifier():
+    # k só é atribuída dentro do laço do meio: a PHI de k no cabeçalho do
+    # meio tem um só caminho e é usada pela PHI do laço interno
+    triple = '''
+    programa p inicio
+        inteiro a, i, j, k;
+        leia(a); i = 0;
+        enquanto (i < a) inicio
+            j = 0;
+            enquanto (j < a) inicio
+                k = 0;
+                enquanto (k < a) k = k + 1;
+                j = j + 1;
+            fim;
+            i = i + 1;
+        fim;
+        escreva(i);
+    fim.
+    '''
+    for source in (nested, triple):
+        for mode in SSA.MODES:
+            ssa = SSA(build_ir(source), mode=mode)
+            verify_ssa(ssa, exhaustive=True)
+            optimize_ssa(ssa, verify=True)
+            verify_ssa(ssa, exhaustive=True)
+
+    def broken(edit: Callable[[SSA], None]) -> list[str]:
+        ssa = SSA(build_ir(nested), mode='pruned')
+        edit(ssa)
+        return check_ssa(ssa, exhaustive=True)
+
+    def header(ssa: SSA) -> BasicBlock:
+        return next(bb for bb in ssa.ir.bb_sequence if len(bb.phi_instrs) > 0)
+
+    def drop_predecessor(ssa: SSA) -> None:
+        bb = header(ssa)
+        bb.predecessors.remove(bb.predecessors[0])
+
+    def phi_from_deleted_block(ssa: SSA) -> None:
+        phi = header(ssa).phi_instrs[0]
+        phi.paths[BasicBlock()] = phi.result
+
+    def redefine(ssa: SSA) -> None:
+        bb = ssa.ir.bb_sequence[-1]
+        bb.body_instrs.append(Instr(Operator.MOVE, Const(Type.INT, 1), Operand.EMPTY,
+                                    header(ssa).phi_instrs[0].result))
+
+    def use_before_definition(ssa: SSA) -> None:
+        instrs = ssa.ir.bb_entry.body_instrs
+        instrs.insert(0, Instr(Operator.PRINT, instrs[-1].result,
+                               Operand.EMPTY, Operand.EMPTY))
+
+    def relabel(ssa: SSA) -> None:
+        label = ssa.ir.bb_sequence[1].label_instr.result
+        ssa.ir.label_bb_map[label] = BasicBlock()
+
+    assert any('ausente dos predecessores' in p for p in broken(drop_predecessor))
+    assert any('não é predecessor' in p for p in broken(phi_from_deleted_block))
+    assert any('mais de uma vez' in p for p in broken(redefine))
+    assert any('não a domina' in p for p in broken(use_before_definition))
+    assert any('não mapeia para o bloco' in p for p in broken(relabel))
+    # Uma edição no CFG sem aviso aos dominadores só aparece no modo exaustivo
+    ssa = SSA(build_ir(nested), mode='pruned')
+    bb = header(ssa)
+    exit = bb.successors[1]
+    bb.successors.remove(exit)
+    exit.predecessors.remove(bb)
+    assert any('dominadores' in p for p in check_ssa(ssa, exhaustive=True))
+    # Erros da SSA recebida não são atribuídos ao primeiro passe
+    ssa = SSA(build_ir(nested), mode='pruned')
+    redefine(ssa)
+    with pytest.raises(RuntimeError, match='^Antes da otimização'):
+        optimize_ssa(ssa, verify=True)
+
+
+def test_block_layout():
+    ssa = SSA(build_ir(nested), mode='pruned')
+    optimize_ssa(ssa)
+    ir = ssa.ir
+
+    def run(profile: bool = False) -> Interpreter:
+        interpreter = Interpreter(ir, InterpreterIO(['25'], []), profile=profile)
+        interpreter.interpret()
+        return interpreter
+
+    def taken_jumps() -> int:
+        after = dict(pairwise(ir.bb_sequence))
+        return sum(n for (a, b), n in profile.edge_counts.items()
+                   if after.get(a) is not b)
+
+    profile = run(profile=True).profile
+    assert profile is not None
+    blocks, before = set(ir.bb_sequence), taken_jumps()
+    for source in (None, profile):
+        layout_blocks(ir, source)
+        assert set(ir.bb_sequence) == blocks and len(ir.bb_sequence) == len(blocks)
+        assert ir.bb_sequence[0] is ir.bb_entry
+        assert ir.bb_sequence[-1].goto_instr is None
+        assert run().io.outputs == ['10']
+        assert taken_jumps() < before
+        # Laços rotacionados: o teste do cabeçalho vem depois do corpo
+        for header, loop in LoopForest.of(ir).loops.items():
+            first = min(map(ir.bb_sequence.index, loop.blocks))
+            assert ir.bb_sequence.index(header) > first
+    # Nenhum jmp para o rótulo que vem logo em seguida
+    code = [line for line in CodeGeneratorX64(ssa).code if not line.startswith('\t#')]
+    for line, following in pairwise(code):
+        assert not (line.startswith('\tjmp ') and following == f'\t{line[5:]}:')